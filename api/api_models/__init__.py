@@ -1,8 +1,19 @@
-"""Pydantic models for the speaker diarization API."""
+"""Pydantic models for the speaker diarization API.
+
+Segment-heavy responses (``IdentifyResult``, ``TranscriptionResult``,
+``TranscriptionIdentifiedResult``) should not be returned through
+``response_model=``: FastAPI would run ``jsonable_encoder`` and re-validate
+the already-built model. Instead, declare the model via
+``responses={200: {"model": Model}}`` (keeps the OpenAPI schema) and return
+the bytes produced by the precompiled serializer in ``dump_json``::
+
+    return Response(content=dump_json(result), media_type="application/json")
+"""
 
 from .schemas import (
     SpeakerSegment,
     DiarizationResult,
+    DiarizationResultColumnar,
     RegisterSpeakerRequest,
     RegisterSpeakerResponse,
     Speaker,
@@ -14,11 +25,13 @@ from .schemas import (
     TranscriptSegment,
     TranscriptionResult,
     TranscriptionIdentifiedResult,
+    dump_json,
 )
 
 __all__ = [
     "SpeakerSegment",
     "DiarizationResult",
+    "DiarizationResultColumnar",
     "RegisterSpeakerRequest",
     "RegisterSpeakerResponse",
     "Speaker",
@@ -30,4 +43,5 @@ __all__ = [
     "TranscriptSegment",
     "TranscriptionResult",
     "TranscriptionIdentifiedResult",
+    "dump_json",
 ]
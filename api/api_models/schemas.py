@@ -1,8 +1,7 @@
 """Pydantic schemas for API request/response models."""
 
-from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, computed_field
 
 
 class SpeakerSegment(BaseModel):
@@ -11,17 +10,32 @@ class SpeakerSegment(BaseModel):
     speaker: str = Field(..., description="Speaker label (e.g., 'SPEAKER_00')")
     start: float = Field(..., description="Start time in seconds")
     end: float = Field(..., description="End time in seconds")
-    duration: float = Field(..., description="Duration in seconds")
     
     class Config:
-        json_schema_extra = {
-            "example": {
-                "speaker": "SPEAKER_00",
-                "start": 0.5,
-                "end": 3.2,
-                "duration": 2.7
-            }
-        }
+        frozen = True
+    
+    @computed_field(description="Duration in seconds")
+    @property
+    def duration(self) -> float:
+        return round(self.end - self.start, 3)
+    
+    @classmethod
+    def make(cls, speaker: str, start: float, end: float) -> "SpeakerSegment":
+        """Create a segment from trusted pipeline output without validation.
+        
+        Diarization output is produced internally and already has the right
+        types, so this is the constructor to use on the hot path; reserve
+        ``SpeakerSegment(...)`` for untrusted input.
+        
+        Args:
+            speaker: Speaker label
+            start: Start time in seconds
+            end: End time in seconds
+            
+        Returns:
+            SpeakerSegment instance
+        """
+        return cls.model_construct(speaker=speaker, start=start, end=end)
 
 
 class DiarizationResult(BaseModel):
@@ -32,33 +46,32 @@ class DiarizationResult(BaseModel):
     audio_duration: float = Field(..., description="Total audio duration in seconds")
     processing_time: float = Field(..., description="Processing time in seconds")
     exclusive: bool = Field(default=False, description="Whether exclusive diarization was used")
+
+
+class DiarizationResultColumnar(BaseModel):
+    """Result of speaker diarization in columnar (struct-of-arrays) layout.
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "segments": [
-                    {"speaker": "SPEAKER_00", "start": 0.5, "end": 3.2, "duration": 2.7},
-                    {"speaker": "SPEAKER_01", "start": 3.5, "end": 7.1, "duration": 3.6}
-                ],
-                "num_speakers": 2,
-                "audio_duration": 10.5,
-                "processing_time": 2.3,
-                "exclusive": False
-            }
-        }
+    Entry ``i`` of each list describes the ``i``-th segment. Avoids building
+    one object per segment for long recordings.
+    """
+    
+    speakers: list[str] = Field(..., description="Speaker label of each segment")
+    starts: list[float] = Field(..., description="Start time of each segment in seconds")
+    ends: list[float] = Field(..., description="End time of each segment in seconds")
+    durations: Optional[list[float]] = Field(
+        None,
+        description="Duration of each segment in seconds (only when include_durations is set)"
+    )
+    num_speakers: int = Field(..., description="Number of detected speakers")
+    audio_duration: float = Field(..., description="Total audio duration in seconds")
+    processing_time: float = Field(..., description="Processing time in seconds")
+    exclusive: bool = Field(default=False, description="Whether exclusive diarization was used")
 
 
 class RegisterSpeakerRequest(BaseModel):
     """Request to register a new speaker."""
     
     speaker_name: str = Field(..., description="Name/identifier for the speaker", min_length=1, max_length=100)
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "speaker_name": "John Doe"
-            }
-        }
 
 
 class RegisterSpeakerResponse(BaseModel):
@@ -68,16 +81,6 @@ class RegisterSpeakerResponse(BaseModel):
     speaker_name: str = Field(..., description="Name of the registered speaker")
     embeddings_count: int = Field(..., description="Number of embeddings stored for this speaker")
     message: str = Field(..., description="Status message")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "speaker_id": "abc123",
-                "speaker_name": "John Doe",
-                "embeddings_count": 3,
-                "message": "Speaker registered successfully with 3 embeddings"
-            }
-        }
 
 
 class Speaker(BaseModel):
@@ -86,17 +89,10 @@ class Speaker(BaseModel):
     speaker_id: str = Field(..., description="Unique ID for the speaker")
     speaker_name: str = Field(..., description="Name of the speaker")
     embeddings_count: int = Field(..., description="Number of embeddings stored")
-    created_at: datetime = Field(..., description="When the speaker was first registered")
+    created_at: int = Field(..., description="When the speaker was first registered (Unix epoch seconds)")
     
     class Config:
-        json_schema_extra = {
-            "example": {
-                "speaker_id": "abc123",
-                "speaker_name": "John Doe",
-                "embeddings_count": 5,
-                "created_at": "2024-01-15T10:30:00Z"
-            }
-        }
+        frozen = True
 
 
 class SpeakerListResponse(BaseModel):
@@ -104,21 +100,6 @@ class SpeakerListResponse(BaseModel):
     
     speakers: list[Speaker] = Field(..., description="List of registered speakers")
     total_count: int = Field(..., description="Total number of registered speakers")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "speakers": [
-                    {
-                        "speaker_id": "abc123",
-                        "speaker_name": "John Doe",
-                        "embeddings_count": 5,
-                        "created_at": "2024-01-15T10:30:00Z"
-                    }
-                ],
-                "total_count": 1
-            }
-        }
 
 
 class IdentifiedSegment(BaseModel):
@@ -129,54 +110,84 @@ class IdentifiedSegment(BaseModel):
     confidence: Optional[float] = Field(None, description="Confidence score of the match (0-1)")
     start: float = Field(..., description="Start time in seconds")
     end: float = Field(..., description="End time in seconds")
-    duration: float = Field(..., description="Duration in seconds")
     
     class Config:
-        json_schema_extra = {
-            "example": {
-                "speaker": "SPEAKER_00",
-                "identified_as": "John Doe",
-                "confidence": 0.92,
-                "start": 0.5,
-                "end": 3.2,
-                "duration": 2.7
-            }
-        }
+        frozen = True
+    
+    @computed_field(description="Duration in seconds")
+    @property
+    def duration(self) -> float:
+        return round(self.end - self.start, 3)
 
 
 class IdentifyResult(BaseModel):
-    """Result of speaker diarization with identification."""
+    """Result of speaker diarization with identification.
+    
+    The label-to-name mapping is held as a short list of pairs and only
+    turned into the ``speaker_mapping`` object when serialized.
+    """
     
     segments: list[IdentifiedSegment] = Field(..., description="List of identified speaker segments")
-    speaker_mapping: dict[str, Optional[str]] = Field(
-        ..., 
-        description="Mapping from diarization labels to identified names"
+    speaker_mapping_pairs: list[tuple[str, Optional[str]]] = Field(
+        ...,
+        exclude=True,
+        description="(diarization label, identified name) pairs; serialized as speaker_mapping"
     )
     num_speakers: int = Field(..., description="Number of detected speakers")
     num_identified: int = Field(..., description="Number of speakers matched to known identities")
     audio_duration: float = Field(..., description="Total audio duration in seconds")
     processing_time: float = Field(..., description="Processing time in seconds")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "segments": [
-                    {
-                        "speaker": "SPEAKER_00",
-                        "identified_as": "John Doe",
-                        "confidence": 0.92,
-                        "start": 0.5,
-                        "end": 3.2,
-                        "duration": 2.7
-                    }
-                ],
-                "speaker_mapping": {"SPEAKER_00": "John Doe", "SPEAKER_01": None},
-                "num_speakers": 2,
-                "num_identified": 1,
-                "audio_duration": 10.5,
-                "processing_time": 3.1
-            }
-        }
+    @computed_field(description="Mapping from diarization labels to identified names")
+    @property
+    def speaker_mapping(self) -> dict[str, Optional[str]]:
+        return dict(self.speaker_mapping_pairs)
+    
+    @classmethod
+    def from_raw(
+        cls,
+        segments: list[dict],
+        speaker_mapping: dict[str, Optional[str]],
+        speaker_confidences: dict[str, Optional[float]],
+        num_speakers: int,
+        audio_duration: float,
+        processing_time: float
+    ) -> "IdentifyResult":
+        """Build a result from trusted diarization output in a single pass.
+        
+        Every model is created with ``model_construct``, so no field
+        validation runs.
+        
+        Args:
+            segments: Diarization segment dicts with 'speaker', 'start', 'end'
+            speaker_mapping: Mapping from diarization labels to identified names
+            speaker_confidences: Mapping from diarization labels to match scores
+            num_speakers: Number of detected speakers
+            audio_duration: Total audio duration in seconds
+            processing_time: Processing time in seconds
+            
+        Returns:
+            Fully built IdentifyResult
+        """
+        identified_segments = [
+            IdentifiedSegment.model_construct(
+                speaker=segment["speaker"],
+                identified_as=speaker_mapping.get(segment["speaker"]),
+                confidence=speaker_confidences.get(segment["speaker"]),
+                start=segment["start"],
+                end=segment["end"]
+            )
+            for segment in segments
+        ]
+        
+        return cls.model_construct(
+            segments=identified_segments,
+            speaker_mapping_pairs=list(speaker_mapping.items()),
+            num_speakers=num_speakers,
+            num_identified=sum(1 for name in speaker_mapping.values() if name is not None),
+            audio_duration=audio_duration,
+            processing_time=processing_time
+        )
 
 
 class HealthResponse(BaseModel):
@@ -187,17 +198,6 @@ class HealthResponse(BaseModel):
     models_loaded: bool = Field(..., description="Whether ML models are loaded")
     qdrant_connected: bool = Field(..., description="Whether Qdrant is connected")
     device: str = Field(..., description="Compute device being used")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "status": "healthy",
-                "version": "1.0.0",
-                "models_loaded": True,
-                "qdrant_connected": True,
-                "device": "cuda"
-            }
-        }
 
 
 class ErrorResponse(BaseModel):
@@ -206,15 +206,6 @@ class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error type")
     message: str = Field(..., description="Error message")
     detail: Optional[str] = Field(None, description="Additional error details")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "error": "ValidationError",
-                "message": "Invalid audio file format",
-                "detail": "Supported formats: WAV, MP3, FLAC, OGG"
-            }
-        }
 
 
 # ============== Transcription Schemas ==============
@@ -227,21 +218,15 @@ class TranscriptSegment(BaseModel):
     confidence: Optional[float] = Field(None, description="Speaker identification confidence (0-1)")
     start: float = Field(..., description="Start time in seconds")
     end: float = Field(..., description="End time in seconds")
-    duration: float = Field(..., description="Duration in seconds")
     text: str = Field(..., description="Transcribed text for this segment")
     
     class Config:
-        json_schema_extra = {
-            "example": {
-                "speaker": "SPEAKER_00",
-                "identified_as": "MKBHD",
-                "confidence": 0.85,
-                "start": 0.0,
-                "end": 5.2,
-                "duration": 5.2,
-                "text": "Hey what's up guys, MKBHD here"
-            }
-        }
+        frozen = True
+    
+    @computed_field(description="Duration in seconds")
+    @property
+    def duration(self) -> float:
+        return round(self.end - self.start, 3)
 
 
 class TranscriptionResult(BaseModel):
@@ -253,28 +238,6 @@ class TranscriptionResult(BaseModel):
     duration: float = Field(..., description="Total audio duration in seconds")
     language: Optional[str] = Field(None, description="Detected language code")
     processing_time: float = Field(..., description="Total processing time in seconds")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "text": "Hey what's up guys, MKBHD here. Today we're talking about...",
-                "segments": [
-                    {
-                        "speaker": "SPEAKER_00",
-                        "identified_as": "MKBHD",
-                        "confidence": 0.85,
-                        "start": 0.0,
-                        "end": 5.2,
-                        "duration": 5.2,
-                        "text": "Hey what's up guys, MKBHD here"
-                    }
-                ],
-                "num_speakers": 2,
-                "duration": 120.5,
-                "language": "en",
-                "processing_time": 15.3
-            }
-        }
 
 
 class TranscriptionIdentifiedResult(BaseModel):
@@ -282,9 +245,10 @@ class TranscriptionIdentifiedResult(BaseModel):
     
     text: str = Field(..., description="Full transcript text")
     segments: list[TranscriptSegment] = Field(..., description="List of identified speaker segments")
-    speaker_mapping: dict[str, Optional[str]] = Field(
-        ..., 
-        description="Mapping from diarization labels to identified names"
+    speaker_mapping_pairs: list[tuple[str, Optional[str]]] = Field(
+        ...,
+        exclude=True,
+        description="(diarization label, identified name) pairs; serialized as speaker_mapping"
     )
     num_speakers: int = Field(..., description="Number of detected speakers")
     num_identified: int = Field(..., description="Number of speakers matched to known identities")
@@ -292,35 +256,36 @@ class TranscriptionIdentifiedResult(BaseModel):
     language: Optional[str] = Field(None, description="Detected language code")
     processing_time: float = Field(..., description="Total processing time in seconds")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "text": "Hey what's up guys, MKBHD here. That's awesome!",
-                "segments": [
-                    {
-                        "speaker": "SPEAKER_00",
-                        "identified_as": "MKBHD",
-                        "confidence": 0.85,
-                        "start": 0.0,
-                        "end": 3.2,
-                        "duration": 3.2,
-                        "text": "Hey what's up guys, MKBHD here"
-                    },
-                    {
-                        "speaker": "SPEAKER_01",
-                        "identified_as": "AE",
-                        "confidence": 0.78,
-                        "start": 3.5,
-                        "end": 5.0,
-                        "duration": 1.5,
-                        "text": "That's awesome!"
-                    }
-                ],
-                "speaker_mapping": {"SPEAKER_00": "MKBHD", "SPEAKER_01": "AE"},
-                "num_speakers": 2,
-                "num_identified": 2,
-                "duration": 120.5,
-                "language": "en",
-                "processing_time": 18.5
-            }
-        }
+    @computed_field(description="Mapping from diarization labels to identified names")
+    @property
+    def speaker_mapping(self) -> dict[str, Optional[str]]:
+        return dict(self.speaker_mapping_pairs)
+
+
+# ============== Serialization ==============
+
+# Serializers are compiled once at import time and reused for every response
+_ADAPTERS = {
+    model: TypeAdapter(model)
+    for model in (
+        DiarizationResult,
+        IdentifyResult,
+        TranscriptionResult,
+        TranscriptionIdentifiedResult,
+        SpeakerListResponse,
+        HealthResponse,
+    )
+}
+
+
+def dump_json(model_instance: BaseModel, **kwargs) -> bytes:
+    """Serialize a response model to JSON bytes using its precompiled adapter.
+    
+    Args:
+        model_instance: Instance of one of the registered response models
+        **kwargs: Extra options forwarded to ``TypeAdapter.dump_json`` (e.g. ``exclude``)
+        
+    Returns:
+        UTF-8 encoded JSON document
+    """
+    return _ADAPTERS[type(model_instance)].dump_json(model_instance, **kwargs)
@@ -0,0 +1,153 @@
+"""OpenAPI examples for the API schemas.
+
+Kept separate from ``schemas.py`` so the example payloads are only loaded
+when the OpenAPI document is generated, not on every model import.
+"""
+
+
+EXAMPLES = {
+    "SpeakerSegment": {
+        "speaker": "SPEAKER_00",
+        "start": 0.5,
+        "end": 3.2,
+        "duration": 2.7
+    },
+    "DiarizationResult": {
+        "segments": [
+            {"speaker": "SPEAKER_00", "start": 0.5, "end": 3.2, "duration": 2.7},
+            {"speaker": "SPEAKER_01", "start": 3.5, "end": 7.1, "duration": 3.6}
+        ],
+        "num_speakers": 2,
+        "audio_duration": 10.5,
+        "processing_time": 2.3,
+        "exclusive": False
+    },
+    "DiarizationResultColumnar": {
+        "speakers": ["SPEAKER_00", "SPEAKER_01"],
+        "starts": [0.5, 3.5],
+        "ends": [3.2, 7.1],
+        "num_speakers": 2,
+        "audio_duration": 10.5,
+        "processing_time": 2.3,
+        "exclusive": False
+    },
+    "RegisterSpeakerRequest": {
+        "speaker_name": "John Doe"
+    },
+    "RegisterSpeakerResponse": {
+        "speaker_id": "abc123",
+        "speaker_name": "John Doe",
+        "embeddings_count": 3,
+        "message": "Speaker registered successfully with 3 embeddings"
+    },
+    "Speaker": {
+        "speaker_id": "abc123",
+        "speaker_name": "John Doe",
+        "embeddings_count": 5,
+        "created_at": 1705314600
+    },
+    "SpeakerListResponse": {
+        "speakers": [
+            {
+                "speaker_id": "abc123",
+                "speaker_name": "John Doe",
+                "embeddings_count": 5,
+                "created_at": 1705314600
+            }
+        ],
+        "total_count": 1
+    },
+    "IdentifiedSegment": {
+        "speaker": "SPEAKER_00",
+        "identified_as": "John Doe",
+        "confidence": 0.92,
+        "start": 0.5,
+        "end": 3.2,
+        "duration": 2.7
+    },
+    "IdentifyResult": {
+        "segments": [
+            {
+                "speaker": "SPEAKER_00",
+                "identified_as": "John Doe",
+                "confidence": 0.92,
+                "start": 0.5,
+                "end": 3.2,
+                "duration": 2.7
+            }
+        ],
+        "speaker_mapping": {"SPEAKER_00": "John Doe", "SPEAKER_01": None},
+        "num_speakers": 2,
+        "num_identified": 1,
+        "audio_duration": 10.5,
+        "processing_time": 3.1
+    },
+    "HealthResponse": {
+        "status": "healthy",
+        "version": "1.0.0",
+        "models_loaded": True,
+        "qdrant_connected": True,
+        "device": "cuda"
+    },
+    "ErrorResponse": {
+        "error": "ValidationError",
+        "message": "Invalid audio file format",
+        "detail": "Supported formats: WAV, MP3, FLAC, OGG"
+    },
+    "TranscriptSegment": {
+        "speaker": "SPEAKER_00",
+        "identified_as": "MKBHD",
+        "confidence": 0.85,
+        "start": 0.0,
+        "end": 5.2,
+        "duration": 5.2,
+        "text": "Hey what's up guys, MKBHD here"
+    },
+    "TranscriptionResult": {
+        "text": "Hey what's up guys, MKBHD here. Today we're talking about...",
+        "segments": [
+            {
+                "speaker": "SPEAKER_00",
+                "identified_as": "MKBHD",
+                "confidence": 0.85,
+                "start": 0.0,
+                "end": 5.2,
+                "duration": 5.2,
+                "text": "Hey what's up guys, MKBHD here"
+            }
+        ],
+        "num_speakers": 2,
+        "duration": 120.5,
+        "language": "en",
+        "processing_time": 15.3
+    },
+    "TranscriptionIdentifiedResult": {
+        "text": "Hey what's up guys, MKBHD here. That's awesome!",
+        "segments": [
+            {
+                "speaker": "SPEAKER_00",
+                "identified_as": "MKBHD",
+                "confidence": 0.85,
+                "start": 0.0,
+                "end": 3.2,
+                "duration": 3.2,
+                "text": "Hey what's up guys, MKBHD here"
+            },
+            {
+                "speaker": "SPEAKER_01",
+                "identified_as": "AE",
+                "confidence": 0.78,
+                "start": 3.5,
+                "end": 5.0,
+                "duration": 1.5,
+                "text": "That's awesome!"
+            }
+        ],
+        "speaker_mapping": {"SPEAKER_00": "MKBHD", "SPEAKER_01": "AE"},
+        "num_speakers": 2,
+        "num_identified": 2,
+        "duration": 120.5,
+        "language": "en",
+        "processing_time": 18.5
+    },
+}
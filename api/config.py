@@ -1,8 +1,11 @@
 """Configuration management for the speaker diarization API."""
 
-import os
-from functools import lru_cache
-from pydantic_settings import BaseSettings
+from typing import Final
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+MAX_UPLOAD_SIZE: Final[int] = 500 * 1024 * 1024  # 500MB
 
 
 class Settings(BaseSettings):
@@ -19,22 +22,49 @@ class Settings(BaseSettings):
     # Qdrant settings
     qdrant_host: str = "qdrant"
     qdrant_port: int = 6333
+    qdrant_grpc_port: int = 6334
+    qdrant_prefer_grpc: bool = True  # protobuf over HTTP/2 instead of REST JSON
+    qdrant_pool_size: int = 32  # concurrent connections per Qdrant client
     collection_name: str = "speaker_embeddings"
     embedding_dimension: int = 256  # wespeaker embedding size
+    bulk_upload_threshold: int = 10000  # batches larger than this go through upload_collection; smaller ones are upserted
+    bulk_upload_parallel: int = 4  # upload_collection worker processes
+    bulk_upload_batch_size: int = 512  # points per upload_collection request
+    indexing_threshold: int = 20000  # HNSW indexing threshold restored after a bulk load if Qdrant reports none or 0
+    scroll_batch_size: int = 1024  # points per scroll page when listing speakers
     
     # API settings
     api_host: str = "0.0.0.0"
     api_port: int = 8000
-    max_upload_size: int = 500 * 1024 * 1024  # 500MB
+    max_upload_size: int = MAX_UPLOAD_SIZE
     upload_dir: str = "/app/uploads"
     
     # Processing settings
     device: str = "auto"  # auto, cuda, or cpu
     min_speakers: int | None = None
     max_speakers: int | None = None
+    gpu_concurrency: int = 1  # concurrent diarization/embedding calls on the device
+    embedding_batch_size: int = 32  # segments per padded embedding forward pass
+    embedding_batch_wait_ms: float = 5.0  # how long a whole-file embedding waits to share a batch
+    use_bf16: bool = False  # bfloat16 autocast for batched speaker embeddings on supporting GPUs
+    compile_embedding_model: bool = False  # torch.compile the batched embedding forward pass (CUDA only)
+    release_cuda_cache: bool = True  # empty the CUDA cache after each diarization/embedding call
+    
+    # Result caching (keyed by upload content hash; 0 disables)
+    result_cache_size: int = 128  # cached diarization results
+    embedding_cache_size: int = 4096  # cached per-segment embeddings
+    transcription_cache_size: int = 64  # cached Whisper transcriptions
+    segmentation_cache_dir: str | None = None  # on-disk segmentation activations; None disables
+    transcription_cache_dir: str | None = None  # on-disk Whisper transcriptions, kept across restarts; None disables
     
     # Speaker recognition settings
     similarity_threshold: float = 0.7  # cosine similarity threshold for speaker matching
+    query_cache_size: int = 1024  # cached Qdrant speaker searches (0 disables)
+    query_cache_similarity: float = 0.98  # cosine similarity for a query to reuse a cached search
+    query_cache_ttl: float = 300.0  # seconds a cached search stays valid
+    voting_early_exit_chunk: int = 4  # embeddings per speaker searched before an early exit (0 disables)
+    voting_early_exit_score: float = 0.85  # average score the leading candidate needs to exit early
+    voting_early_exit_margin: float = 0.1  # lead over the runner-up needed to exit early
     
     # Whisper STT settings
     whisper_api_url: str = "http://192.168.8.116:8000/v1"
@@ -42,14 +72,24 @@ class Settings(BaseSettings):
     whisper_model: str = "Systran/faster-distil-whisper-large-v3"
     whisper_language: str | None = None  # None for auto-detect
     whisper_timeout: int = 300  # 5 minutes timeout for long audio
+    whisper_max_connections: int = 64  # pooled connections to the Whisper API
+    whisper_max_retries: int = 3  # retries of connection errors and 429/5xx responses
+    whisper_chunk_seconds: float = 0.0  # split longer audio into concurrent chunk requests (0 disables)
+    whisper_chunk_concurrency: int = 4  # chunk requests in flight per transcription
+    whisper_upload_format: str = ""  # re-encode lossless uploads as 16 kHz mono: flac, wav, opus ("" sends the original file)
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        extra = "ignore"
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+        frozen=True
+    )
+
+
+# Settings are immutable after startup, so a module-level instance is shared
+settings: Settings = Settings()
 
 
-@lru_cache()
 def get_settings() -> Settings:
-    """Get cached settings instance."""
-    return Settings()
+    """Get the shared settings instance."""
+    return settings
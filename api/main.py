@@ -1,35 +1,58 @@
 """FastAPI application for speaker diarization with speaker recognition."""
 
+import asyncio
+import hashlib
+import io
 import logging
+import mmap
 import os
 import shutil
+import sys
 import time
 import uuid
+from collections import defaultdict
 from contextlib import asynccontextmanager
-from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from tempfile import SpooledTemporaryFile
+from typing import Any, BinaryIO, Iterator, Optional, Union
 
-from fastapi import FastAPI, File, Form, HTTPException, Query, UploadFile
+import anyio
+import numpy as np
+
+from fastapi import BackgroundTasks, FastAPI, File, Form, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.openapi.utils import get_openapi
 
 from config import Settings, get_settings
+from orjson_response import ORJSONResponse, iter_json_with_text, iter_ndjson
 from api_models import (
     DiarizationResult,
+    DiarizationResultColumnar,
     ErrorResponse,
     HealthResponse,
-    IdentifiedSegment,
     IdentifyResult,
     RegisterSpeakerResponse,
     Speaker,
     SpeakerListResponse,
-    SpeakerSegment,
     TranscriptSegment,
     TranscriptionResult,
     TranscriptionIdentifiedResult,
+    dump_json,
+)
+from services import (
+    DiarizationService,
+    EmbeddingBatcher,
+    EmbeddingService,
+    SegmentBatch,
+    SpeakerDBService,
+    TranscriptMerger,
+    WhisperError,
+    WhisperService,
+    configure_torch_backends,
 )
-from services import DiarizationService, EmbeddingService, SpeakerDBService, WhisperService, TranscriptMerger
+from services.audio import AudioSource, can_read_directly, decode_audio
 
 
 # Configure logging
@@ -44,13 +67,16 @@ logger = logging.getLogger(__name__)
 settings: Settings = None
 diarization_service: DiarizationService = None
 embedding_service: EmbeddingService = None
+embedding_batcher: EmbeddingBatcher = None
 speaker_db_service: SpeakerDBService = None
+whisper_service: WhisperService = None
+inference_semaphore: asyncio.Semaphore = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown."""
-    global settings, diarization_service, embedding_service, speaker_db_service
+    global settings, diarization_service, embedding_service, embedding_batcher, speaker_db_service, whisper_service, inference_semaphore
     
     logger.info("Starting speaker diarization API...")
     
@@ -60,10 +86,26 @@ async def lifespan(app: FastAPI):
     # Ensure upload directory exists
     Path(settings.upload_dir).mkdir(parents=True, exist_ok=True)
     
+    # Allow TF32 tensor-core math for float32 model calls
+    configure_torch_backends()
+    
     # Initialize services
     diarization_service = DiarizationService(settings)
     embedding_service = EmbeddingService(settings)
     speaker_db_service = SpeakerDBService(settings)
+    whisper_service = WhisperService(settings)
+    
+    # Bound concurrent model calls to what the device can actually run in parallel
+    inference_semaphore = asyncio.Semaphore(settings.gpu_concurrency)
+    
+    # Concurrent whole-file embedding requests share forward passes
+    embedding_batcher = EmbeddingBatcher(
+        embedding_service,
+        max_batch_size=settings.embedding_batch_size,
+        max_wait_ms=settings.embedding_batch_wait_ms,
+        runner=run_inference
+    )
+    embedding_batcher.start()
     
     # Pre-initialize models (optional, can be done lazily)
     try:
@@ -71,6 +113,7 @@ async def lifespan(app: FastAPI):
         diarization_service.initialize()
         embedding_service.initialize()
         speaker_db_service.initialize()
+        whisper_service.initialize()
         logger.info("All services initialized successfully")
     except Exception as e:
         logger.warning(f"Delayed model loading due to: {e}")
@@ -79,6 +122,9 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     logger.info("Shutting down speaker diarization API...")
+    await embedding_batcher.aclose()
+    await speaker_db_service.aclose()
+    await whisper_service.aclose()
 
 
 # Create FastAPI app
@@ -86,9 +132,37 @@ app = FastAPI(
     title="Speaker Diarization API",
     description="API for speaker diarization using pyannote community-1 model with speaker recognition via Qdrant",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+
+def custom_openapi() -> dict:
+    """Build the OpenAPI schema once, attaching model examples on demand."""
+    if app.openapi_schema:
+        return app.openapi_schema
+    
+    # Examples are only needed for the docs, so they are imported lazily here
+    from api_models.schemas_examples import EXAMPLES
+    
+    openapi_schema = get_openapi(
+        title=app.title,
+        version=app.version,
+        description=app.description,
+        routes=app.routes
+    )
+    
+    component_schemas = openapi_schema.get("components", {}).get("schemas", {})
+    for name, example in EXAMPLES.items():
+        if name in component_schemas:
+            component_schemas[name]["example"] = example
+    
+    app.openapi_schema = openapi_schema
+    return app.openapi_schema
+
+
+app.openapi = custom_openapi
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -102,6 +176,9 @@ app.add_middleware(
 # Supported audio formats
 SUPPORTED_FORMATS = {".wav", ".mp3", ".flac", ".ogg", ".m4a", ".webm"}
 
+# Upload copy chunk size (1 MiB, in line with typical kernel readahead)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 def validate_audio_file(file: UploadFile) -> None:
     """Validate uploaded audio file."""
@@ -114,32 +191,415 @@ def validate_audio_file(file: UploadFile) -> None:
             status_code=400,
             detail=f"Unsupported audio format: {ext}. Supported: {', '.join(SUPPORTED_FORMATS)}"
         )
+    
+    if file.size is not None and file.size > settings.max_upload_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large: {file.size} bytes. Maximum: {settings.max_upload_size} bytes"
+        )
 
 
-async def save_upload_file(file: UploadFile) -> str:
-    """Save uploaded file to temporary directory."""
+async def save_upload_file(file: UploadFile, hasher: Optional[Any] = None) -> str:
+    """Save uploaded file to temporary directory.
+    
+    All file work (open, hash, copy) runs in one worker thread call, so large
+    uploads and slow upload directories (network filesystems) never block
+    the event loop. Uploads already spilled to disk are copied with
+    os.sendfile; in-memory ones are written straight from their buffer.
+    
+    Args:
+        file: Uploaded file
+        hasher: Optional hashlib object fed every chunk as it is written
+        
+    Returns:
+        Path of the saved file
+    """
     ext = Path(file.filename).suffix.lower()
     filename = f"{uuid.uuid4()}{ext}"
     filepath = Path(settings.upload_dir) / filename
     
-    with open(filepath, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    # Uploads Starlette has already spilled to a temp file are copied in-kernel
+    src_fd = disk_fileno(file.file)
+    if src_fd is not None:
+        await anyio.to_thread.run_sync(copy_fd_to_path, src_fd, filepath, hasher, file.file)
+        return str(filepath)
     
+    await anyio.to_thread.run_sync(write_file_object, file.file, filepath, hasher)
     return str(filepath)
 
 
-def cleanup_file(filepath: str) -> None:
+def memory_buffer(f: BinaryIO) -> Optional[io.BytesIO]:
+    """Get the BytesIO holding an in-memory file's contents, if any.
+    
+    Covers BytesIO itself and a SpooledTemporaryFile that has not rolled
+    over to disk. The spooled file's private ``_rolled``/``_file`` attributes
+    are read with getattr, so if the stdlib changes them this returns None
+    and callers fall back to the public read/fileno path.
+    """
+    if isinstance(f, io.BytesIO):
+        return f
+    if not isinstance(f, SpooledTemporaryFile) or getattr(f, "_rolled", True):
+        return None
+    buffer = getattr(f, "_file", None)
+    return buffer if isinstance(buffer, io.BytesIO) else None
+
+
+def disk_fileno(f: BinaryIO) -> Optional[int]:
+    """Get the descriptor of a file object backed by a real file, if any.
+    
+    A SpooledTemporaryFile still held in memory reports None, since calling
+    fileno() on it would force it to disk.
+    """
+    if not hasattr(os, "sendfile"):
+        return None
+    if memory_buffer(f) is not None:
+        return None
+    try:
+        return f.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def copy_fd_to_path(src_fd: int, filepath: Path, hasher: Optional[Any], f: BinaryIO) -> None:
+    """Copy a file to a new path with os.sendfile, optionally hashing it first.
+    
+    Args:
+        src_fd: Descriptor of the source file
+        filepath: Destination path
+        hasher: Optional hashlib object fed the file contents
+        f: File object owning src_fd, used for hashing and left rewound
+    """
+    if hasher is not None:
+        update_hash_from_file(hasher, f)
+    
+    size = os.fstat(src_fd).st_size
+    dst_fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    finally:
+        os.close(dst_fd)
+
+
+def write_file_object(f: BinaryIO, filepath: Path, hasher: Optional[Any]) -> None:
+    """Write an in-memory upload to a new path, optionally hashing it first.
+    
+    Args:
+        f: Open binary file, written from the start and left rewound
+        filepath: Destination path
+        hasher: Optional hashlib object fed the file contents
+    """
+    if hasher is not None:
+        update_hash_from_file(hasher, f)
+    
+    f.seek(0)
+    buffer = memory_buffer(f)
+    with open(filepath, "wb") as out:
+        if buffer is not None:
+            with buffer.getbuffer() as view:
+                out.write(view)
+        else:
+            shutil.copyfileobj(f, out, UPLOAD_CHUNK_SIZE)
+    f.seek(0)
+
+
+def hash_file_object(f: BinaryIO) -> str:
+    """Hash an open binary file from the start, leaving it rewound."""
+    hasher = hashlib.blake2b(digest_size=16)
+    update_hash_from_file(hasher, f)
+    return hasher.hexdigest()
+
+
+def update_hash_from_file(hasher: Any, f: BinaryIO) -> None:
+    """Feed a whole open binary file to a hasher without copying it into bytes objects.
+    
+    In-memory uploads are hashed through a view of their buffer and files
+    on disk through a read-only mmap, so hashlib (which releases the GIL for
+    large inputs) reads the data in place. Other file objects are read in
+    UPLOAD_CHUNK_SIZE pieces. The file is left rewound.
+    
+    Args:
+        hasher: hashlib object to update
+        f: Open binary file
+    """
+    f.seek(0)
+    buffer = memory_buffer(f)
+    
+    if buffer is not None:
+        with buffer.getbuffer() as view:
+            hasher.update(view)
+        return
+    
+    try:
+        f.flush()
+        fd = f.fileno()
+        if os.fstat(fd).st_size == 0:
+            return
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+            hasher.update(mapped)
+        return
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        pass
+    
+    f.seek(0)
+    while chunk := f.read(UPLOAD_CHUNK_SIZE):
+        hasher.update(chunk)
+    f.seek(0)
+
+
+async def open_audio_source(file: UploadFile) -> tuple[AudioSource, Optional[str], str]:
+    """Get an audio source for the services from an upload.
+    
+    Formats torchaudio can decode from a file-like object are read straight
+    from the upload's spooled buffer; others (m4a/webm) are saved to disk.
+    Either way the bytes are hashed, so repeated uploads of the same audio
+    can be served from the services' result caches.
+    
+    Args:
+        file: Uploaded audio file
+        
+    Returns:
+        Tuple of (audio source, saved file path or None if nothing was written,
+        BLAKE2b hex digest of the upload)
+    """
+    if can_read_directly(file.filename):
+        audio_hash = await anyio.to_thread.run_sync(hash_file_object, file.file)
+        return file.file, None, audio_hash
+    
+    hasher = hashlib.blake2b(digest_size=16)
+    filepath = await save_upload_file(file, hasher)
+    return filepath, filepath, hasher.hexdigest()
+
+
+async def cleanup_file(filepath: str) -> None:
     """Remove temporary file."""
     try:
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        await anyio.to_thread.run_sync(partial(Path(filepath).unlink, missing_ok=True))
     except Exception as e:
         logger.warning(f"Failed to cleanup file {filepath}: {e}")
 
 
+async def release_upload(filepath: str, background_tasks: BackgroundTasks) -> None:
+    """Clean up a saved upload from an endpoint's ``finally`` block.
+    
+    On success the file is removed after the response has been sent.
+    Background tasks are dropped when the endpoint raises, so on the error
+    path the file is removed right away instead.
+    """
+    if sys.exc_info()[0] is None:
+        background_tasks.add_task(cleanup_file, filepath)
+    else:
+        await cleanup_file(filepath)
+
+
+async def run_inference(func, /, *args, **kwargs):
+    """Run a blocking model call in a worker thread, gated by the inference semaphore.
+    
+    Concurrent requests queue here instead of all dispatching to the device at
+    once. Only the model call itself holds a slot; decoding, Qdrant calls and
+    serialization run outside it.
+    
+    Args:
+        func: Blocking service method to call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        Whatever func returns
+    """
+    async with inference_semaphore:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+async def decode_upload(audio: AudioSource) -> dict:
+    """Decode an upload in a worker thread, outside the inference semaphore.
+    
+    While one request holds the device, the next one decodes and resamples
+    here, so its model call can start as soon as a slot frees up instead of
+    decoding inside the slot.
+    
+    Args:
+        audio: Audio source from open_audio_source
+        
+    Returns:
+        Decoded audio dict accepted by the diarization and embedding services
+    """
+    return await asyncio.to_thread(decode_audio, audio, diarization_service.device)
+
+
+def build_transcript_segments(merged_segments: list[dict]) -> list[TranscriptSegment]:
+    """Build response segments from trusted merger output without validation.
+    
+    Args:
+        merged_segments: Segment dicts from TranscriptMerger
+        
+    Returns:
+        List of TranscriptSegment, written into a pre-sized list
+    """
+    segments = [None] * len(merged_segments)
+    for i, seg in enumerate(merged_segments):
+        segments[i] = TranscriptSegment.model_construct(
+            speaker=seg["speaker"],
+            identified_as=seg.get("identified_as"),
+            confidence=seg.get("confidence"),
+            start=seg["start"],
+            end=seg["end"],
+            text=seg["text"]
+        )
+    return segments
+
+
+def transcript_segment_dict(seg: dict) -> dict:
+    """Get a merger segment in the TranscriptSegment response shape.
+    
+    Every merger segment already carries its rounded duration, so it is
+    passed through rather than recomputed.
+    """
+    return {
+        "speaker": seg["speaker"],
+        "identified_as": seg.get("identified_as"),
+        "confidence": seg.get("confidence"),
+        "start": seg["start"],
+        "end": seg["end"],
+        "duration": seg["duration"],
+        "text": seg["text"]
+    }
+
+
+def iter_transcript_stream(
+    items: Iterator[dict],
+    start_time: float,
+    extra_summary: Optional[dict] = None
+) -> Iterator[dict]:
+    """Shape streamed merger output into NDJSON records.
+    
+    Args:
+        items: Output of TranscriptMerger.iter_merge_transcription_with_diarization
+        start_time: Request start time, used for the summary's processing_time
+        extra_summary: Additional fields to add to the final summary record
+        
+    Yields:
+        {"segment": {...}} records, then one {"summary": {...}} record
+    """
+    for item in items:
+        if "segment" in item:
+            yield {"segment": transcript_segment_dict(item["segment"])}
+        else:
+            summary = item["summary"]
+            if extra_summary:
+                summary.update(extra_summary)
+            summary["processing_time"] = round(time.perf_counter() - start_time, 3)
+            yield {"summary": summary}
+
+
+async def transcribe_and_diarize(
+    audio: AudioSource,
+    audio_hash: str,
+    filename: str,
+    num_speakers: Optional[int],
+    min_speakers: Optional[int],
+    max_speakers: Optional[int],
+    language: Optional[str]
+) -> tuple[dict, dict, dict]:
+    """Run diarization and Whisper transcription concurrently on one upload.
+    
+    Args:
+        audio: Audio source from open_audio_source
+        audio_hash: Content hash of the upload
+        filename: Original filename, forwarded to Whisper
+        num_speakers: Optional exact number of speakers
+        min_speakers: Optional minimum number of speakers
+        max_speakers: Optional maximum number of speakers
+        language: Optional language code for Whisper
+        
+    Returns:
+        Tuple of (decoded audio, diarization result, Whisper result)
+    """
+    # Decode for diarization (and embeddings) up front so Whisper has the
+    # encoded upload handle to itself
+    decoded = await decode_upload(audio)
+    
+    # Whisper is a remote service, so it does not take an inference slot
+    logger.info("Running diarization and Whisper transcription...")
+    diarization_result, whisper_result = await asyncio.gather(
+        run_inference(
+            diarization_service.diarize,
+            audio_path=decoded,
+            num_speakers=num_speakers,
+            min_speakers=min_speakers,
+            max_speakers=max_speakers,
+            exclusive=True,
+            audio_hash=audio_hash
+        ),
+        whisper_service.transcribe_upload(
+            audio_path=audio,
+            decoded=decoded,
+            language=language,
+            filename=filename,
+            audio_hash=audio_hash
+        )
+    )
+    return decoded, diarization_result, whisper_result
+
+
+async def identify_diarized_speakers(
+    decoded: dict,
+    diarization_result: dict,
+    audio_hash: str,
+    similarity_threshold: Optional[float]
+) -> tuple[dict, dict]:
+    """Match each diarized speaker against the registered voices.
+    
+    Args:
+        decoded: Decoded audio the diarization ran on
+        diarization_result: Diarization result with 'segments'
+        audio_hash: Content hash of the upload
+        similarity_threshold: Optional minimum similarity for a match
+        
+    Returns:
+        Tuple of (speaker label -> name or None, speaker label -> score or None)
+    """
+    logger.info("Identifying speakers...")
+    segments = diarization_result["segments"]
+    
+    # Group in one vectorized pass: label index per segment, then segment
+    # indices ordered by speaker (stable, so each speaker's stay in time order)
+    labels, inverse = np.unique([segment["speaker"] for segment in segments], return_inverse=True)
+    speakers = labels.tolist()
+    order = np.argsort(inverse, kind="stable").tolist()
+    inverse = inverse.tolist()
+    
+    tagged_embeddings = await run_inference(
+        embedding_service.extract_embeddings_for_tagged_segments,
+        audio_path=decoded,
+        tagged_segments=[(speakers[inverse[i]], segments[i]) for i in order],
+        min_duration=0.5,
+        audio_hash=audio_hash
+    )
+    speaker_embeddings = defaultdict(list)
+    for speaker, embedding in tagged_embeddings:
+        speaker_embeddings[speaker].append(embedding)
+    
+    # Identify every speaker with batched Qdrant queries, voting per speaker
+    matches = await speaker_db_service.aidentify_speakers_batch(
+        embeddings_per_speaker={speaker: speaker_embeddings.get(speaker, []) for speaker in speakers},
+        score_threshold=similarity_threshold
+    )
+    speaker_mapping = {}
+    speaker_confidences = {}
+    for speaker, match in matches.items():
+        speaker_mapping[speaker] = match["speaker_name"] if match else None
+        speaker_confidences[speaker] = match["score"] if match else None
+    return speaker_mapping, speaker_confidences
+
+
 # ============== Health Endpoints ==============
 
-@app.get("/health", response_model=HealthResponse, tags=["Health"])
+@app.get("/health", responses={200: {"model": HealthResponse}}, tags=["Health"])
 async def health_check():
     """Check the health status of the API and its dependencies."""
     models_loaded = (
@@ -152,13 +612,15 @@ async def health_check():
     
     status = "healthy" if (models_loaded and qdrant_connected) else "degraded"
     
-    return HealthResponse(
+    result = HealthResponse(
         status=status,
         version="1.0.0",
         models_loaded=models_loaded,
         qdrant_connected=qdrant_connected,
         device=device
     )
+    
+    return Response(content=dump_json(result), media_type="application/json")
 
 
 @app.get("/", tags=["Health"])
@@ -175,13 +637,20 @@ async def root():
 
 # ============== Diarization Endpoints ==============
 
-@app.post("/diarize", response_model=DiarizationResult, tags=["Diarization"])
+@app.post(
+    "/diarize",
+    responses={200: {"model": Union[DiarizationResult, DiarizationResultColumnar]}},
+    tags=["Diarization"]
+)
 async def diarize_audio(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Audio file to diarize"),
     num_speakers: Optional[int] = Form(None, description="Exact number of speakers (if known)"),
     min_speakers: Optional[int] = Form(None, description="Minimum number of speakers"),
     max_speakers: Optional[int] = Form(None, description="Maximum number of speakers"),
-    exclusive: bool = Form(False, description="Return exclusive diarization (no overlapping segments)")
+    exclusive: bool = Form(False, description="Return exclusive diarization (no overlapping segments)"),
+    columnar: bool = Form(False, description="Return segments as parallel arrays instead of a list of objects"),
+    include_durations: bool = Form(False, description="With columnar, also return a durations array")
 ):
     """
     Perform speaker diarization on an uploaded audio file.
@@ -193,33 +662,48 @@ async def diarize_audio(
     - **min_speakers**: Optional minimum number of speakers
     - **max_speakers**: Optional maximum number of speakers  
     - **exclusive**: If true, returns non-overlapping segments (useful for transcript alignment)
+    - **columnar**: If true, returns `speakers`/`starts`/`ends` arrays (compact for long audio)
+    - **include_durations**: With `columnar`, also return a `durations` array (otherwise `ends - starts`)
     """
     validate_audio_file(file)
     filepath = None
     
     try:
-        # Save uploaded file
-        filepath = await save_upload_file(file)
+        # Read directly from the upload buffer when possible, otherwise save to disk
+        audio, filepath, audio_hash = await open_audio_source(file)
+        decoded = await decode_upload(audio)
         
         # Run diarization
-        result = diarization_service.diarize(
-            audio_path=filepath,
+        result = await run_inference(
+            diarization_service.diarize,
+            audio_path=decoded,
             num_speakers=num_speakers,
             min_speakers=min_speakers,
             max_speakers=max_speakers,
-            exclusive=exclusive
+            exclusive=exclusive,
+            audio_hash=audio_hash
         )
         
-        # Convert to response model
-        segments = [SpeakerSegment(**seg) for seg in result["segments"]]
+        if columnar:
+            # Struct-of-arrays layout: one orjson pass over numpy columns, no per-segment objects
+            batch = SegmentBatch.from_segments(result["segments"])
+            return ORJSONResponse({
+                **batch.to_columnar(include_durations=include_durations),
+                "num_speakers": result["num_speakers"],
+                "audio_duration": result["audio_duration"],
+                "processing_time": result["processing_time"],
+                "exclusive": result["exclusive"]
+            })
         
-        return DiarizationResult(
-            segments=segments,
-            num_speakers=result["num_speakers"],
-            audio_duration=result["audio_duration"],
-            processing_time=result["processing_time"],
-            exclusive=result["exclusive"]
-        )
+        # Service segments already match SpeakerSegment's shape, so serialize the
+        # dicts directly instead of building one model per segment
+        return ORJSONResponse({
+            "segments": result["segments"],
+            "num_speakers": result["num_speakers"],
+            "audio_duration": result["audio_duration"],
+            "processing_time": result["processing_time"],
+            "exclusive": result["exclusive"]
+        })
         
     except Exception as e:
         logger.error(f"Diarization failed: {e}")
@@ -227,15 +711,16 @@ async def diarize_audio(
     
     finally:
         if filepath:
-            cleanup_file(filepath)
+            await release_upload(filepath, background_tasks)
 
 
 # ============== Speaker Registration Endpoints ==============
 
 @app.post("/speakers/register", response_model=RegisterSpeakerResponse, tags=["Speaker Recognition"])
 async def register_speaker(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Audio file containing the speaker's voice"),
-    speaker_name: str = Form(..., description="Name/identifier for the speaker"),
+    speaker_name: str = Form(..., description="Name/identifier for the speaker", min_length=1, max_length=100),
     extract_segments: bool = Form(False, description="Extract embeddings from multiple segments")
 ):
     """
@@ -252,19 +737,25 @@ async def register_speaker(
     filepath = None
     
     try:
-        # Save uploaded file
-        filepath = await save_upload_file(file)
+        # Read directly from the upload buffer when possible, otherwise save to disk
+        audio, filepath, audio_hash = await open_audio_source(file)
         
         if extract_segments:
+            # Decode once for both the diarization and the embedding pass
+            decoded = await decode_upload(audio)
+            
             # Run diarization to find speech segments
-            diarization_result = diarization_service.diarize(
-                audio_path=filepath,
-                num_speakers=1  # Assume single speaker for registration
+            diarization_result = await run_inference(
+                diarization_service.diarize,
+                audio_path=decoded,
+                num_speakers=1,  # Assume single speaker for registration
+                audio_hash=audio_hash
             )
             
             # Extract embeddings from each segment
-            segment_embeddings = embedding_service.extract_embeddings_for_segments(
-                audio_path=filepath,
+            segment_embeddings = await run_inference(
+                embedding_service.extract_embeddings_for_segments,
+                audio_path=decoded,
                 segments=diarization_result["segments"],
                 min_duration=1.0  # Minimum 1 second for good embedding
             )
@@ -277,7 +768,7 @@ async def register_speaker(
             
             # Add all embeddings to database
             embeddings = [emb for _, emb in segment_embeddings]
-            speaker_id = speaker_db_service.add_speaker_embeddings_batch(
+            speaker_id = await speaker_db_service.aadd_speaker_embeddings_batch(
                 speaker_name=speaker_name,
                 embeddings=embeddings,
                 audio_source=file.filename
@@ -286,9 +777,9 @@ async def register_speaker(
             embeddings_count = len(embeddings)
         else:
             # Extract single embedding from whole file
-            embedding = embedding_service.extract_embedding(filepath)
+            embedding = await embedding_batcher.embed(audio)
             
-            speaker_id = speaker_db_service.add_speaker_embedding(
+            speaker_id = await speaker_db_service.aadd_speaker_embedding(
                 speaker_name=speaker_name,
                 embedding=embedding,
                 audio_source=file.filename
@@ -311,10 +802,10 @@ async def register_speaker(
     
     finally:
         if filepath:
-            cleanup_file(filepath)
+            await release_upload(filepath, background_tasks)
 
 
-@app.get("/speakers", response_model=SpeakerListResponse, tags=["Speaker Recognition"])
+@app.get("/speakers", responses={200: {"model": SpeakerListResponse}}, tags=["Speaker Recognition"])
 async def list_speakers():
     """
     List all registered speakers in the database.
@@ -322,7 +813,7 @@ async def list_speakers():
     Returns speaker information including number of stored embeddings.
     """
     try:
-        speakers_data = speaker_db_service.get_all_speakers()
+        speakers_data = await speaker_db_service.aget_all_speakers()
         
         speakers = []
         for s in speakers_data:
@@ -330,14 +821,16 @@ async def list_speakers():
                 speaker_id=s["speaker_id"],
                 speaker_name=s["speaker_name"],
                 embeddings_count=s["embeddings_count"],
-                created_at=datetime.fromisoformat(s["created_at"]) if s.get("created_at") else datetime.utcnow()
+                created_at=s.get("created_at") or int(time.time())
             ))
         
-        return SpeakerListResponse(
+        result = SpeakerListResponse(
             speakers=speakers,
             total_count=len(speakers)
         )
         
+        return Response(content=dump_json(result), media_type="application/json")
+        
     except Exception as e:
         logger.error(f"Failed to list speakers: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -349,7 +842,7 @@ async def get_speaker(speaker_id: str):
     Get information about a specific registered speaker.
     """
     try:
-        speaker_data = speaker_db_service.get_speaker_by_id(speaker_id)
+        speaker_data = await speaker_db_service.aget_speaker_by_id(speaker_id)
         
         if not speaker_data:
             raise HTTPException(status_code=404, detail="Speaker not found")
@@ -358,7 +851,7 @@ async def get_speaker(speaker_id: str):
             speaker_id=speaker_data["speaker_id"],
             speaker_name=speaker_data["speaker_name"],
             embeddings_count=speaker_data["embeddings_count"],
-            created_at=datetime.fromisoformat(speaker_data["created_at"]) if speaker_data.get("created_at") else datetime.utcnow()
+            created_at=speaker_data.get("created_at") or int(time.time())
         )
         
     except HTTPException:
@@ -374,7 +867,7 @@ async def delete_speaker(speaker_id: str):
     Delete a registered speaker and all their embeddings.
     """
     try:
-        deleted = speaker_db_service.delete_speaker(speaker_id)
+        deleted = await speaker_db_service.adelete_speaker(speaker_id)
         
         if not deleted:
             raise HTTPException(status_code=404, detail="Speaker not found")
@@ -390,8 +883,9 @@ async def delete_speaker(speaker_id: str):
 
 # ============== Speaker Identification Endpoints ==============
 
-@app.post("/identify", response_model=IdentifyResult, tags=["Speaker Recognition"])
+@app.post("/identify", responses={200: {"model": IdentifyResult}}, tags=["Speaker Recognition"])
 async def identify_speakers(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Audio file to diarize and identify"),
     num_speakers: Optional[int] = Form(None, description="Exact number of speakers (if known)"),
     min_speakers: Optional[int] = Form(None, description="Minimum number of speakers"),
@@ -413,96 +907,60 @@ async def identify_speakers(
     filepath = None
     
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
+        
+        # Read directly from the upload buffer when possible, otherwise save to disk
+        audio, filepath, audio_hash = await open_audio_source(file)
         
-        # Save uploaded file
-        filepath = await save_upload_file(file)
+        # Decode once; diarization and every per-speaker embedding pass share it
+        decoded = await decode_upload(audio)
         
         # Run diarization
-        diarization_result = diarization_service.diarize(
-            audio_path=filepath,
+        diarization_result = await run_inference(
+            diarization_service.diarize,
+            audio_path=decoded,
             num_speakers=num_speakers,
             min_speakers=min_speakers,
             max_speakers=max_speakers,
-            exclusive=True  # Use exclusive for cleaner speaker identification
+            exclusive=True,  # Use exclusive for cleaner speaker identification
+            audio_hash=audio_hash
         )
         
-        # Group segments by speaker
-        speaker_segments = {}
-        for segment in diarization_result["segments"]:
-            speaker = segment["speaker"]
-            if speaker not in speaker_segments:
-                speaker_segments[speaker] = []
-            speaker_segments[speaker].append(segment)
-        
-        # Identify each speaker
-        speaker_mapping = {}
-        speaker_confidences = {}
-        
-        for speaker, segments in speaker_segments.items():
-            # Extract embeddings for this speaker's segments
-            segment_embeddings = embedding_service.extract_embeddings_for_segments(
-                audio_path=filepath,
-                segments=segments,
-                min_duration=0.5
-            )
-            
-            if segment_embeddings:
-                embeddings = [emb for _, emb in segment_embeddings]
-                
-                # Try to identify using voting
-                match = speaker_db_service.identify_speaker_by_voting(
-                    embeddings=embeddings,
-                    score_threshold=similarity_threshold
-                )
-                
-                if match:
-                    speaker_mapping[speaker] = match["speaker_name"]
-                    speaker_confidences[speaker] = match["score"]
-                else:
-                    speaker_mapping[speaker] = None
-                    speaker_confidences[speaker] = None
-            else:
-                speaker_mapping[speaker] = None
-                speaker_confidences[speaker] = None
-        
-        # Build result segments
-        identified_segments = []
-        for segment in diarization_result["segments"]:
-            speaker = segment["speaker"]
-            identified_segments.append(IdentifiedSegment(
-                speaker=speaker,
-                identified_as=speaker_mapping.get(speaker),
-                confidence=speaker_confidences.get(speaker),
-                start=segment["start"],
-                end=segment["end"],
-                duration=segment["duration"]
-            ))
+        # Match each diarized speaker against the registered voices
+        speaker_mapping, speaker_confidences = await identify_diarized_speakers(
+            decoded, diarization_result, audio_hash, similarity_threshold
+        )
         
-        processing_time = time.time() - start_time
-        num_identified = sum(1 for v in speaker_mapping.values() if v is not None)
+        processing_time = time.perf_counter() - start_time
         
-        return IdentifyResult(
-            segments=identified_segments,
+        result = IdentifyResult.from_raw(
+            segments=diarization_result["segments"],
             speaker_mapping=speaker_mapping,
+            speaker_confidences=speaker_confidences,
             num_speakers=diarization_result["num_speakers"],
-            num_identified=num_identified,
             audio_duration=diarization_result["audio_duration"],
             processing_time=round(processing_time, 3)
         )
         
+        # Serialize with the precompiled adapter, skipping response-model re-validation
+        return Response(
+            content=dump_json(result),
+            media_type="application/json"
+        )
+        
     except Exception as e:
         logger.error(f"Speaker identification failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     
     finally:
         if filepath:
-            cleanup_file(filepath)
+            await release_upload(filepath, background_tasks)
 
 
 @app.post("/speakers/add-sample/{speaker_id}", response_model=RegisterSpeakerResponse, tags=["Speaker Recognition"])
 async def add_speaker_sample(
     speaker_id: str,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Additional audio sample for the speaker"),
     extract_segments: bool = Form(False, description="Extract embeddings from multiple segments")
 ):
@@ -516,22 +974,28 @@ async def add_speaker_sample(
     
     try:
         # Check if speaker exists
-        speaker = speaker_db_service.get_speaker_by_id(speaker_id)
+        speaker = await speaker_db_service.aget_speaker_by_id(speaker_id)
         if not speaker:
             raise HTTPException(status_code=404, detail="Speaker not found")
         
-        # Save uploaded file
-        filepath = await save_upload_file(file)
+        # Read directly from the upload buffer when possible, otherwise save to disk
+        audio, filepath, audio_hash = await open_audio_source(file)
         
         if extract_segments:
+            # Decode once for both the diarization and the embedding pass
+            decoded = await decode_upload(audio)
+            
             # Run diarization to find speech segments
-            diarization_result = diarization_service.diarize(
-                audio_path=filepath,
-                num_speakers=1
+            diarization_result = await run_inference(
+                diarization_service.diarize,
+                audio_path=decoded,
+                num_speakers=1,
+                audio_hash=audio_hash
             )
             
-            segment_embeddings = embedding_service.extract_embeddings_for_segments(
-                audio_path=filepath,
+            segment_embeddings = await run_inference(
+                embedding_service.extract_embeddings_for_segments,
+                audio_path=decoded,
                 segments=diarization_result["segments"],
                 min_duration=1.0
             )
@@ -543,7 +1007,7 @@ async def add_speaker_sample(
                 )
             
             embeddings = [emb for _, emb in segment_embeddings]
-            speaker_db_service.add_speaker_embeddings_batch(
+            await speaker_db_service.aadd_speaker_embeddings_batch(
                 speaker_name=speaker["speaker_name"],
                 embeddings=embeddings,
                 speaker_id=speaker_id,
@@ -552,9 +1016,9 @@ async def add_speaker_sample(
             
             new_embeddings = len(embeddings)
         else:
-            embedding = embedding_service.extract_embedding(filepath)
+            embedding = await embedding_batcher.embed(audio)
             
-            speaker_db_service.add_speaker_embedding(
+            await speaker_db_service.aadd_speaker_embedding(
                 speaker_name=speaker["speaker_name"],
                 embedding=embedding,
                 speaker_id=speaker_id,
@@ -564,7 +1028,7 @@ async def add_speaker_sample(
             new_embeddings = 1
         
         # Get updated speaker info
-        updated_speaker = speaker_db_service.get_speaker_by_id(speaker_id)
+        updated_speaker = await speaker_db_service.aget_speaker_by_id(speaker_id)
         
         return RegisterSpeakerResponse(
             speaker_id=speaker_id,
@@ -581,13 +1045,14 @@ async def add_speaker_sample(
     
     finally:
         if filepath:
-            cleanup_file(filepath)
+            await release_upload(filepath, background_tasks)
 
 
 # ============== Transcription Endpoints ==============
 
-@app.post("/transcribe-diarized", response_model=TranscriptionResult, tags=["Transcription"])
+@app.post("/transcribe-diarized", responses={200: {"model": TranscriptionResult}}, tags=["Transcription"])
 async def transcribe_diarized(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Audio file to transcribe and diarize"),
     num_speakers: Optional[int] = Form(None, description="Exact number of speakers (if known)"),
     min_speakers: Optional[int] = Form(None, description="Minimum number of speakers"),
@@ -608,60 +1073,29 @@ async def transcribe_diarized(
     filepath = None
     
     try:
-        start_time = time.time()
-        
-        # Save uploaded file
-        filepath = await save_upload_file(file)
-        
-        # Initialize services (lazily)
-        whisper_service = WhisperService(settings)
-        whisper_service.initialize()
-        merger = TranscriptMerger()
+        start_time = time.perf_counter()
         
-        # Run diarization and transcription in parallel conceptually
-        # (but sequentially here for simplicity)
+        # Read directly from the upload buffer when possible, otherwise save to disk
+        audio, filepath, audio_hash = await open_audio_source(file)
         
-        # 1. Run diarization
-        logger.info("Running diarization...")
-        diarization_result = diarization_service.diarize(
-            audio_path=filepath,
-            num_speakers=num_speakers,
-            min_speakers=min_speakers,
-            max_speakers=max_speakers,
-            exclusive=True
-        )
-        
-        # 2. Run Whisper transcription
-        logger.info("Running Whisper transcription...")
-        whisper_result = whisper_service.transcribe_with_words(
-            audio_path=filepath,
-            language=language
+        # 1-2. Run diarization and Whisper transcription concurrently
+        _, diarization_result, whisper_result = await transcribe_and_diarize(
+            audio, audio_hash, file.filename, num_speakers, min_speakers, max_speakers, language
         )
         
         # 3. Merge results
         logger.info("Merging transcription with diarization...")
-        merged = merger.merge_transcription_with_diarization(
+        merged = TranscriptMerger().merge_transcription_with_diarization(
             whisper_result=whisper_result,
             diarization_result=diarization_result
         )
         
-        processing_time = time.time() - start_time
-        
-        # Build response segments
-        segments = [
-            TranscriptSegment(
-                speaker=seg["speaker"],
-                identified_as=seg.get("identified_as"),
-                confidence=seg.get("confidence"),
-                start=seg["start"],
-                end=seg["end"],
-                duration=seg.get("duration", seg["end"] - seg["start"]),
-                text=seg["text"]
-            )
-            for seg in merged["segments"]
-        ]
+        processing_time = time.perf_counter() - start_time
         
-        return TranscriptionResult(
+        # Build response segments (trusted merger output, so skip validation)
+        segments = build_transcript_segments(merged["segments"])
+        
+        result = TranscriptionResult(
             text=merged["text"],
             segments=segments,
             num_speakers=merged["num_speakers"],
@@ -670,17 +1104,28 @@ async def transcribe_diarized(
             processing_time=round(processing_time, 3)
         )
         
+        # Stream the (potentially huge) transcript text ahead of the remaining fields
+        return StreamingResponse(
+            iter_json_with_text(result.text, dump_json(result, exclude={"text"})),
+            media_type="application/json"
+        )
+        
+    except WhisperError as e:
+        logger.error(f"Transcription with diarization failed: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
     except Exception as e:
         logger.error(f"Transcription with diarization failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     
     finally:
         if filepath:
-            cleanup_file(filepath)
+            await release_upload(filepath, background_tasks)
 
 
-@app.post("/transcribe-identified", response_model=TranscriptionIdentifiedResult, tags=["Transcription"])
+@app.post("/transcribe-identified", responses={200: {"model": TranscriptionIdentifiedResult}}, tags=["Transcription"])
 async def transcribe_identified(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Audio file to transcribe, diarize, and identify"),
     num_speakers: Optional[int] = Form(None, description="Exact number of speakers (if known)"),
     min_speakers: Optional[int] = Form(None, description="Minimum number of speakers"),
@@ -703,100 +1148,41 @@ async def transcribe_identified(
     filepath = None
     
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        # Save uploaded file
-        filepath = await save_upload_file(file)
+        # Read directly from the upload buffer when possible, otherwise save to disk
+        audio, filepath, audio_hash = await open_audio_source(file)
         
-        # Initialize services (lazily)
-        whisper_service = WhisperService(settings)
-        whisper_service.initialize()
-        merger = TranscriptMerger()
-        
-        # 1. Run diarization
-        logger.info("Running diarization...")
-        diarization_result = diarization_service.diarize(
-            audio_path=filepath,
-            num_speakers=num_speakers,
-            min_speakers=min_speakers,
-            max_speakers=max_speakers,
-            exclusive=True
+        # 1. Run diarization, with Whisper transcription running alongside it
+        decoded, diarization_result, whisper_result = await transcribe_and_diarize(
+            audio, audio_hash, file.filename, num_speakers, min_speakers, max_speakers, language
         )
         
         # 2. Identify speakers
-        logger.info("Identifying speakers...")
-        speaker_segments = {}
-        for segment in diarization_result["segments"]:
-            speaker = segment["speaker"]
-            if speaker not in speaker_segments:
-                speaker_segments[speaker] = []
-            speaker_segments[speaker].append(segment)
-        
-        speaker_mapping = {}
-        speaker_confidences = {}
-        
-        for speaker, segments in speaker_segments.items():
-            segment_embeddings = embedding_service.extract_embeddings_for_segments(
-                audio_path=filepath,
-                segments=segments,
-                min_duration=0.5
-            )
-            
-            if segment_embeddings:
-                embeddings = [emb for _, emb in segment_embeddings]
-                match = speaker_db_service.identify_speaker_by_voting(
-                    embeddings=embeddings,
-                    score_threshold=similarity_threshold
-                )
-                
-                if match:
-                    speaker_mapping[speaker] = match["speaker_name"]
-                    speaker_confidences[speaker] = match["score"]
-                else:
-                    speaker_mapping[speaker] = None
-                    speaker_confidences[speaker] = None
-            else:
-                speaker_mapping[speaker] = None
-                speaker_confidences[speaker] = None
-        
-        # 3. Run Whisper transcription
-        logger.info("Running Whisper transcription...")
-        whisper_result = whisper_service.transcribe_with_words(
-            audio_path=filepath,
-            language=language
+        speaker_mapping, speaker_confidences = await identify_diarized_speakers(
+            decoded, diarization_result, audio_hash, similarity_threshold
         )
         
-        # 4. Merge results with speaker identification
+        # 3. Merge results with speaker identification
         logger.info("Merging transcription with diarization and identification...")
-        merged = merger.merge_transcription_with_diarization(
+        merged = TranscriptMerger().merge_transcription_with_diarization(
             whisper_result=whisper_result,
             diarization_result=diarization_result,
             speaker_mapping=speaker_mapping,
             speaker_confidences=speaker_confidences
         )
         
-        processing_time = time.time() - start_time
-        
-        # Build response segments
-        segments = [
-            TranscriptSegment(
-                speaker=seg["speaker"],
-                identified_as=seg.get("identified_as"),
-                confidence=seg.get("confidence"),
-                start=seg["start"],
-                end=seg["end"],
-                duration=seg.get("duration", seg["end"] - seg["start"]),
-                text=seg["text"]
-            )
-            for seg in merged["segments"]
-        ]
+        processing_time = time.perf_counter() - start_time
+        
+        # Build response segments (trusted merger output, so skip validation)
+        segments = build_transcript_segments(merged["segments"])
         
         num_identified = sum(1 for v in speaker_mapping.values() if v is not None)
         
-        return TranscriptionIdentifiedResult(
+        result = TranscriptionIdentifiedResult(
             text=merged["text"],
             segments=segments,
-            speaker_mapping=speaker_mapping,
+            speaker_mapping_pairs=list(speaker_mapping.items()),
             num_speakers=merged["num_speakers"],
             num_identified=num_identified,
             duration=merged["duration"],
@@ -804,13 +1190,147 @@ async def transcribe_identified(
             processing_time=round(processing_time, 3)
         )
         
+        # Stream the (potentially huge) transcript text ahead of the remaining fields
+        return StreamingResponse(
+            iter_json_with_text(result.text, dump_json(result, exclude={"text"})),
+            media_type="application/json"
+        )
+        
+    except WhisperError as e:
+        logger.error(f"Transcription with identification failed: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
     except Exception as e:
         logger.error(f"Transcription with identification failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     
     finally:
         if filepath:
-            cleanup_file(filepath)
+            await release_upload(filepath, background_tasks)
+
+
+@app.post("/transcribe-diarized/stream", tags=["Transcription"])
+async def transcribe_diarized_stream(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="Audio file to transcribe and diarize"),
+    num_speakers: Optional[int] = Form(None, description="Exact number of speakers (if known)"),
+    min_speakers: Optional[int] = Form(None, description="Minimum number of speakers"),
+    max_speakers: Optional[int] = Form(None, description="Maximum number of speakers"),
+    language: Optional[str] = Form(None, description="Language code (e.g., 'en'). Auto-detect if not specified")
+):
+    """
+    Transcribe audio with speaker diarization, streaming the result as NDJSON.
+    
+    Same processing as `/transcribe-diarized`, but segments are sent as they
+    are merged instead of in one JSON document. Each line is either
+    `{"segment": {...}}` (a `TranscriptSegment`) or, last, `{"summary": {...}}`
+    with `text`, `num_speakers`, `duration`, `language` and `processing_time`.
+    
+    - **file**: Audio file to process
+    - **num_speakers**: Optional exact number of speakers if known
+    - **language**: Optional language code (auto-detect if not specified)
+    """
+    validate_audio_file(file)
+    filepath = None
+    
+    try:
+        start_time = time.perf_counter()
+        
+        # Read directly from the upload buffer when possible, otherwise save to disk
+        audio, filepath, audio_hash = await open_audio_source(file)
+        
+        _, diarization_result, whisper_result = await transcribe_and_diarize(
+            audio, audio_hash, file.filename, num_speakers, min_speakers, max_speakers, language
+        )
+        
+        # Merging runs lazily in the response's thread pool as lines are sent
+        merged = TranscriptMerger().iter_merge_transcription_with_diarization(
+            whisper_result=whisper_result,
+            diarization_result=diarization_result
+        )
+        return StreamingResponse(
+            iter_ndjson(iter_transcript_stream(merged, start_time)),
+            media_type="application/x-ndjson"
+        )
+        
+    except WhisperError as e:
+        logger.error(f"Streaming transcription with diarization failed: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    except Exception as e:
+        logger.error(f"Streaming transcription with diarization failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        if filepath:
+            await release_upload(filepath, background_tasks)
+
+
+@app.post("/transcribe-identified/stream", tags=["Transcription"])
+async def transcribe_identified_stream(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="Audio file to transcribe, diarize, and identify"),
+    num_speakers: Optional[int] = Form(None, description="Exact number of speakers (if known)"),
+    min_speakers: Optional[int] = Form(None, description="Minimum number of speakers"),
+    max_speakers: Optional[int] = Form(None, description="Maximum number of speakers"),
+    language: Optional[str] = Form(None, description="Language code (e.g., 'en'). Auto-detect if not specified"),
+    similarity_threshold: Optional[float] = Form(None, description="Minimum similarity for speaker matching (0-1)")
+):
+    """
+    Transcribe audio with speaker diarization and identification, streaming NDJSON.
+    
+    Same processing as `/transcribe-identified`, with the line format of
+    `/transcribe-diarized/stream`. The summary line also carries
+    `speaker_mapping` and `num_identified`.
+    
+    - **file**: Audio file to process
+    - **num_speakers**: Optional exact number of speakers if known
+    - **language**: Optional language code (auto-detect if not specified)
+    - **similarity_threshold**: Minimum similarity for speaker matching (default: 0.7)
+    """
+    validate_audio_file(file)
+    filepath = None
+    
+    try:
+        start_time = time.perf_counter()
+        
+        # Read directly from the upload buffer when possible, otherwise save to disk
+        audio, filepath, audio_hash = await open_audio_source(file)
+        
+        decoded, diarization_result, whisper_result = await transcribe_and_diarize(
+            audio, audio_hash, file.filename, num_speakers, min_speakers, max_speakers, language
+        )
+        speaker_mapping, speaker_confidences = await identify_diarized_speakers(
+            decoded, diarization_result, audio_hash, similarity_threshold
+        )
+        
+        # Merging runs lazily in the response's thread pool as lines are sent
+        merged = TranscriptMerger().iter_merge_transcription_with_diarization(
+            whisper_result=whisper_result,
+            diarization_result=diarization_result,
+            speaker_mapping=speaker_mapping,
+            speaker_confidences=speaker_confidences
+        )
+        extra_summary = {
+            "speaker_mapping": speaker_mapping,
+            "num_identified": sum(1 for v in speaker_mapping.values() if v is not None)
+        }
+        return StreamingResponse(
+            iter_ndjson(iter_transcript_stream(merged, start_time, extra_summary)),
+            media_type="application/x-ndjson"
+        )
+        
+    except WhisperError as e:
+        logger.error(f"Streaming transcription with identification failed: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    except Exception as e:
+        logger.error(f"Streaming transcription with identification failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        if filepath:
+            await release_upload(filepath, background_tasks)
 
 
 # ============== Statistics Endpoints ==============
@@ -819,14 +1339,17 @@ async def transcribe_identified(
 async def get_statistics():
     """Get statistics about the speaker database and system."""
     try:
-        collection_stats = speaker_db_service.get_collection_stats()
-        speakers = speaker_db_service.get_all_speakers()
+        collection_stats = await speaker_db_service.aget_collection_stats()
+        
+        # Aggregated by Qdrant instead of scrolling every speaker into the API
+        total_embeddings = await speaker_db_service.aget_total_embeddings()
+        total_speakers = await speaker_db_service.aget_speaker_count()
         
         return {
             "database": collection_stats,
             "speakers": {
-                "total_count": len(speakers),
-                "total_embeddings": sum(s["embeddings_count"] for s in speakers)
+                "total_count": total_speakers,
+                "total_embeddings": total_embeddings
             },
             "system": {
                 "device": diarization_service.get_device(),
@@ -843,7 +1366,7 @@ async def get_statistics():
 # Error handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content=ErrorResponse(
             error="HTTPException",
@@ -856,7 +1379,7 @@ async def http_exception_handler(request, exc):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     logger.error(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content=ErrorResponse(
             error="InternalServerError",
@@ -868,4 +1391,4 @@ async def general_exception_handler(request, exc):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
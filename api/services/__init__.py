@@ -2,14 +2,32 @@
 
 from .diarization import DiarizationService
 from .embedding import EmbeddingService
+from .embedding_batcher import EmbeddingBatcher
 from .speaker_db import SpeakerDBService
-from .whisper import WhisperService
+from .whisper import (
+    WhisperService,
+    WhisperError,
+    WhisperTimeoutError,
+    WhisperBackendError,
+    WhisperClientError,
+)
 from .transcript_merger import TranscriptMerger
+from .segment_batch import SegmentBatch
+from .result_cache import ResultCache
+from .inference import configure_torch_backends
 
 __all__ = [
     "DiarizationService",
     "EmbeddingService",
+    "EmbeddingBatcher",
     "SpeakerDBService",
     "WhisperService",
+    "WhisperError",
+    "WhisperTimeoutError",
+    "WhisperBackendError",
+    "WhisperClientError",
     "TranscriptMerger",
+    "SegmentBatch",
+    "ResultCache",
+    "configure_torch_backends",
 ]
@@ -0,0 +1,179 @@
+"""Audio input helpers shared by the inference services."""
+
+import logging
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+import soundfile
+import torch
+import torchaudio
+
+
+logger = logging.getLogger(__name__)
+
+
+# A path on disk or an open binary file-like object (e.g. UploadFile.file)
+EncodedAudioSource = Union[str, BinaryIO]
+
+# Any of the above, or already decoded audio as {"waveform": Tensor, "sample_rate": int}
+AudioSource = Union[str, BinaryIO, dict]
+
+# Formats every torchaudio backend (soundfile included) can decode straight
+# from a file-like object; the rest (mp3/ogg/m4a/webm) may need ffmpeg, which
+# is given a real path on disk
+DIRECT_READ_FORMATS = {".wav", ".flac"}
+
+# Sample rate the pyannote segmentation and wespeaker embedding models expect
+MODEL_SAMPLE_RATE = 16000
+
+
+def can_read_directly(filename: str) -> bool:
+    """Check whether an upload can be decoded without saving it to disk.
+
+    Args:
+        filename: Original filename of the upload
+
+    Returns:
+        True if the format can be read from a file-like object
+    """
+    return Path(filename).suffix.lower() in DIRECT_READ_FORMATS
+
+
+def load_audio(source: AudioSource) -> tuple[torch.Tensor, int]:
+    """Decode audio from a path, a file-like object or a decoded audio dict.
+
+    File-like sources are rewound first, so the same handle can be decoded
+    by several services within one request. Decoded dicts are returned as-is.
+    WAV/FLAC (which is all open_audio_source hands over as file-like objects)
+    is read with libsndfile directly, skipping torchaudio's backend dispatch.
+
+    Args:
+        source: Path, binary file-like object or {"waveform", "sample_rate"} dict
+
+    Returns:
+        Tuple of (waveform, sample_rate)
+    """
+    if isinstance(source, dict):
+        return source["waveform"], source["sample_rate"]
+    if not isinstance(source, str):
+        source.seek(0)
+    if not isinstance(source, str) or can_read_directly(source):
+        data, sample_rate = soundfile.read(source, dtype="float32", always_2d=True)
+        return torch.from_numpy(data.T).contiguous(), sample_rate
+    return torchaudio.load(source)
+
+
+def load_and_resample(
+    source: AudioSource,
+    target_sr: int = MODEL_SAMPLE_RATE,
+    device: Optional[torch.device] = None
+) -> tuple[torch.Tensor, int]:
+    """Decode audio and convert it to mono at the models' sample rate.
+
+    pyannote otherwise downmixes and resamples on the CPU inside every model
+    call. Doing it once here, on the GPU when one is given, takes that
+    single-threaded step off the hot path. The result is returned on the CPU,
+    where pyannote crops chunks before batching them onto the device.
+
+    Args:
+        source: Path, binary file-like object or decoded audio dict
+        target_sr: Sample rate to resample to
+        device: Device to run the conversion on (e.g. the model's CUDA device)
+
+    Returns:
+        Tuple of (mono waveform of shape (1, time), target_sr)
+    """
+    waveform, sample_rate = load_audio(source)
+    return to_model_format(waveform, sample_rate, target_sr, device)
+
+
+def load_segment_and_resample(
+    source: AudioSource,
+    start: float,
+    end: float,
+    target_sr: int = MODEL_SAMPLE_RATE,
+    device: Optional[torch.device] = None
+) -> tuple[torch.Tensor, int]:
+    """Decode only the [start, end) span of audio, as mono at the models' sample rate.
+
+    Encoded sources are read with a frame offset, so a short segment of a
+    long file does not pay for decoding the whole file.
+
+    Args:
+        source: Path, binary file-like object or decoded audio dict
+        start: Start time in seconds
+        end: End time in seconds
+        target_sr: Sample rate to resample to
+        device: Device to run the conversion on (see load_and_resample)
+
+    Returns:
+        Tuple of (mono waveform of shape (1, time), target_sr)
+    """
+    if isinstance(source, dict):
+        waveform, sample_rate = source["waveform"], source["sample_rate"]
+        waveform = waveform[:, int(start * sample_rate):int(end * sample_rate)]
+    else:
+        if not isinstance(source, str):
+            source.seek(0)
+        sample_rate = torchaudio.info(source).sample_rate
+        if not isinstance(source, str):
+            source.seek(0)
+        frame_offset = int(start * sample_rate)
+        waveform, sample_rate = torchaudio.load(
+            source,
+            frame_offset=frame_offset,
+            num_frames=int(end * sample_rate) - frame_offset
+        )
+    return to_model_format(waveform, sample_rate, target_sr, device)
+
+
+def to_model_format(
+    waveform: torch.Tensor,
+    sample_rate: int,
+    target_sr: int = MODEL_SAMPLE_RATE,
+    device: Optional[torch.device] = None
+) -> tuple[torch.Tensor, int]:
+    """Downmix a waveform to mono and resample it to the models' sample rate.
+
+    Args:
+        waveform: Waveform of shape (channels, time)
+        sample_rate: Sample rate of the waveform
+        target_sr: Sample rate to resample to
+        device: Device to run the conversion on (see load_and_resample)
+
+    Returns:
+        Tuple of (mono waveform of shape (1, time), target_sr)
+    """
+    if waveform.shape[0] == 1 and sample_rate == target_sr:
+        return waveform, sample_rate
+
+    if device is not None and device.type == "cuda":
+        waveform = waveform.to(device)
+    if waveform.shape[0] > 1:
+        waveform = waveform.mean(dim=0, keepdim=True)
+    if sample_rate != target_sr:
+        waveform = torchaudio.functional.resample(waveform, sample_rate, target_sr)
+    return waveform.cpu(), target_sr
+
+
+def decode_audio(source: AudioSource, device: Optional[torch.device] = None) -> dict:
+    """Decode audio once so several pipeline stages can share the waveform.
+
+    Args:
+        source: Path, binary file-like object or already decoded dict
+        device: Device to resample on (see load_and_resample)
+
+    Returns:
+        Dict with 'waveform' and 'sample_rate', the in-memory input pyannote accepts
+    """
+    waveform, sample_rate = load_and_resample(source, device=device)
+    return {"waveform": waveform, "sample_rate": sample_rate}
+
+
+def describe_source(source: AudioSource) -> str:
+    """Get a short label for an audio source, for logging."""
+    if isinstance(source, str):
+        return source
+    if isinstance(source, dict):
+        return "<decoded audio>"
+    return "<in-memory upload>"
@@ -1,23 +1,34 @@
 """Speaker diarization service using pyannote.audio."""
 
+import hashlib
 import logging
 import os
 import time
+from collections.abc import Mapping
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
+import orjson
 import torch
 from torch.serialization import add_safe_globals
-import torchaudio
 from pyannote.audio import Pipeline
 from pyannote.audio.pipelines.utils.hook import ProgressHook
 from pyannote.audio.core.task import Problem, Resolution, Specifications, Task
+from pyannote.core import SlidingWindow, SlidingWindowFeature
 
 from config import Settings
+from .audio import AudioSource, describe_source, load_and_resample
+from .hub import resolve_model_dir
+from .inference import check_device_placement, inference_context, release_cuda_memory
+from .result_cache import ResultCache
 
 
 logger = logging.getLogger(__name__)
 
+# Key under which the audio content hash rides along in the pipeline's file dict
+AUDIO_HASH_KEY = "audio_hash"
+
 
 class DiarizationService:
     """Service for speaker diarization using pyannote community-1 model."""
@@ -31,6 +42,10 @@ class DiarizationService:
         self.settings = settings
         self.pipeline: Optional[Pipeline] = None
         self.device: Optional[torch.device] = None
+        self.result_cache: Optional[ResultCache] = (
+            ResultCache(settings.result_cache_size) if settings.result_cache_size > 0 else None
+        )
+        self.segmentation_cache_dir: Optional[Path] = None
         self._initialized = False
         
     def initialize(self) -> None:
@@ -64,15 +79,16 @@ class DiarizationService:
             # Try loading from local path first (for offline use)
             local_model_path = Path(self.settings.model_cache_dir) / "pyannote-speaker-diarization-community-1"
             
-            if local_model_path.exists():
-                logger.info(f"Loading model from local path: {local_model_path}")
-                self.pipeline = Pipeline.from_pretrained(str(local_model_path))
-            else:
-                logger.info(f"Loading model from HuggingFace: {self.settings.diarization_model}")
-                self.pipeline = Pipeline.from_pretrained(self.settings.diarization_model)
+            model_dir = resolve_model_dir(self.settings.diarization_model, local_model_path, self.settings)
+            logger.info(f"Loading model from: {model_dir}")
+            self.pipeline = Pipeline.from_pretrained(model_dir)
             
             # Move to device
             self.pipeline.to(self.device)
+            check_device_placement(self._pipeline_models(self.pipeline), self.device)
+            
+            if self.settings.segmentation_cache_dir:
+                self._enable_segmentation_cache()
             
             self._initialized = True
             logger.info("Diarization pipeline initialized successfully")
@@ -81,6 +97,79 @@ class DiarizationService:
             logger.error(f"Failed to initialize diarization pipeline: {e}")
             raise
     
+    @staticmethod
+    def _pipeline_models(pipeline, prefix: str = "") -> dict[str, torch.nn.Module]:
+        """Collect the torch models a pyannote pipeline and its sub-pipelines run.
+        
+        Args:
+            pipeline: pyannote Pipeline
+            prefix: Name prefix for models of nested pipelines
+            
+        Returns:
+            Dict mapping model names (e.g. "_segmentation") to modules
+        """
+        models = {f"{prefix}{name}": model for name, model in pipeline._models.items()}
+        for name, inference in pipeline._inferences.items():
+            # Inference wraps .model; pretrained speaker embeddings use .model_
+            model = getattr(inference, "model", None) or getattr(inference, "model_", None)
+            if isinstance(model, torch.nn.Module):
+                models[f"{prefix}{name}"] = model
+        for name, sub_pipeline in pipeline._pipelines.items():
+            models.update(DiarizationService._pipeline_models(sub_pipeline, f"{prefix}{name}."))
+        return models
+    
+    def release(self) -> None:
+        """Drop the pipeline and free its device memory.
+        
+        The next diarization call re-initializes it, so a process can hand
+        the GPU to another model in between.
+        """
+        self.pipeline = None
+        self._initialized = False
+        release_cuda_memory(self.device)
+        logger.info("Diarization pipeline released")
+    
+    def _enable_segmentation_cache(self) -> None:
+        """Route the pipeline's segmentation step through an on-disk cache.
+        
+        pyannote only reuses segmentation activations while training, so the
+        pipeline's get_segmentations is replaced on this instance. Cache files
+        live in a directory tagged with the model name and chunking, so they
+        are never reused across segmentation models.
+        """
+        segmentation = self.pipeline._segmentation
+        model_tag = hashlib.blake2b(
+            f"{self.settings.diarization_model}:{segmentation.duration}:{segmentation.step}".encode(),
+            digest_size=8
+        ).hexdigest()
+        self.segmentation_cache_dir = Path(self.settings.segmentation_cache_dir) / model_tag
+        self.segmentation_cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        compute_segmentations = self.pipeline.get_segmentations
+        chunks = SlidingWindow(start=0.0, duration=segmentation.duration, step=segmentation.step)
+        
+        def get_segmentations(file, hook=None) -> SlidingWindowFeature:
+            audio_hash = file.get(AUDIO_HASH_KEY) if isinstance(file, Mapping) else None
+            if audio_hash is None:
+                return compute_segmentations(file, hook=hook)
+            
+            cache_path = self.segmentation_cache_dir / f"{audio_hash}.npy"
+            if cache_path.exists():
+                logger.info(f"Segmentation cache hit for {audio_hash}")
+                # Copy-on-write mapping: pages load lazily and the file is never modified
+                return SlidingWindowFeature(np.load(cache_path, mmap_mode="c"), chunks)
+            
+            segmentations = compute_segmentations(file, hook=hook)
+            # Write then rename, so concurrent readers never see a partial file
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, segmentations.data)
+            os.replace(tmp_path, cache_path)
+            return segmentations
+        
+        self.pipeline.get_segmentations = get_segmentations
+        logger.info(f"Segmentation cache enabled at {self.segmentation_cache_dir}")
+    
     @property
     def is_initialized(self) -> bool:
         """Check if the service is initialized."""
@@ -88,36 +177,52 @@ class DiarizationService:
     
     def diarize(
         self,
-        audio_path: str,
+        audio_path: AudioSource,
         num_speakers: Optional[int] = None,
         min_speakers: Optional[int] = None,
         max_speakers: Optional[int] = None,
         exclusive: bool = False,
-        use_progress_hook: bool = False
+        use_progress_hook: bool = False,
+        audio_hash: Optional[str] = None
     ) -> dict:
         """Perform speaker diarization on an audio file.
         
         Args:
-            audio_path: Path to the audio file
+            audio_path: Path, open binary file-like object or decoded audio dict
             num_speakers: Exact number of speakers (if known)
             min_speakers: Minimum number of speakers
             max_speakers: Maximum number of speakers
             exclusive: If True, return exclusive diarization (no overlapping segments)
             use_progress_hook: If True, use progress hook for logging
+            audio_hash: Content hash of the audio; enables the result cache
             
         Returns:
             Dictionary with diarization results
         """
+        # The overlapping result is cached; exclusive output is derived from it,
+        # so /diarize and /identify on the same upload share one entry
+        cache_key = None
+        if audio_hash and self.result_cache is not None:
+            cache_key = f"diarize:{audio_hash}:{num_speakers}:{min_speakers}:{max_speakers}"
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Diarization cache hit for {audio_hash}")
+                result = orjson.loads(cached)
+                if exclusive:
+                    result["segments"] = self._make_exclusive(result["segments"])
+                    result["exclusive"] = True
+                return result
+        
         if not self._initialized:
             self.initialize()
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Get audio duration
-        waveform, sample_rate = torchaudio.load(audio_path)
+        waveform, sample_rate = load_and_resample(audio_path, device=self.device)
         audio_duration = waveform.shape[1] / sample_rate
         
-        logger.info(f"Processing audio: {audio_path} (duration: {audio_duration:.2f}s)")
+        logger.info(f"Processing audio: {describe_source(audio_path)} (duration: {audio_duration:.2f}s)")
         
         # Build kwargs for pipeline
         kwargs = {}
@@ -137,41 +242,46 @@ class DiarizationService:
         # Run diarization using in-memory audio to bypass torchcodec chunk issues
         # Pass waveform dict instead of file path to avoid sample count mismatches
         audio_input = {"waveform": waveform, "sample_rate": sample_rate}
-        if use_progress_hook:
-            with ProgressHook() as hook:
-                output = self.pipeline(audio_input, hook=hook, **kwargs)
-        else:
-            output = self.pipeline(audio_input, **kwargs)
-        
-        processing_time = time.time() - start_time
+        if audio_hash:
+            audio_input[AUDIO_HASH_KEY] = audio_hash
+        try:
+            with inference_context(self.device):
+                if use_progress_hook:
+                    with ProgressHook() as hook:
+                        output = self.pipeline(audio_input, hook=hook, **kwargs)
+                else:
+                    output = self.pipeline(audio_input, **kwargs)
+        finally:
+            if self.settings.release_cuda_cache:
+                release_cuda_memory(self.device)
+        
+        processing_time = time.perf_counter() - start_time
         
         # Extract segments - pyannote 4.x returns DiarizeOutput, annotation is at .speaker_diarization
-        segments = []
-        speakers = set()
         annotation = getattr(output, 'speaker_diarization', output)  # Handle both 4.x and 3.x
-
-        for turn, _, speaker in annotation.itertracks(yield_label=True):
-            segments.append({
-                "speaker": speaker,
-                "start": round(turn.start, 3),
-                "end": round(turn.end, 3),
-                "duration": round(turn.end - turn.start, 3)
-            })
-            speakers.add(speaker)
+        segments = self._segments_from_annotation(annotation)
+        speakers = annotation.labels()
         
-        # If exclusive mode requested, merge overlapping segments by keeping dominant speaker
-        if exclusive:
-            segments = self._make_exclusive(segments)
-        
-        logger.info(f"Diarization complete: {len(speakers)} speakers, {len(segments)} segments, {processing_time:.2f}s")
-        
-        return {
+        result = {
             "segments": segments,
             "num_speakers": len(speakers),
             "audio_duration": round(audio_duration, 3),
             "processing_time": round(processing_time, 3),
-            "exclusive": exclusive
+            "exclusive": False
         }
+        
+        if cache_key is not None:
+            # Stored serialized so callers can't mutate the cached copy
+            self.result_cache.put(cache_key, orjson.dumps(result))
+        
+        # If exclusive mode requested, merge overlapping segments by keeping dominant speaker
+        if exclusive:
+            result["segments"] = self._make_exclusive(segments)
+            result["exclusive"] = True
+        
+        logger.info(f"Diarization complete: {len(speakers)} speakers, {len(result['segments'])} segments, {processing_time:.2f}s")
+        
+        return result
     
     def diarize_from_memory(
         self,
@@ -181,6 +291,9 @@ class DiarizationService:
     ) -> dict:
         """Perform speaker diarization on audio loaded in memory.
         
+        Thin wrapper over ``diarize``, which already runs the pipeline on an
+        in-memory waveform; both entry points share the same code path.
+        
         Args:
             waveform: Audio waveform tensor
             sample_rate: Sample rate of the audio
@@ -189,71 +302,37 @@ class DiarizationService:
         Returns:
             Dictionary with diarization results
         """
-        if not self._initialized:
-            self.initialize()
-        
-        start_time = time.time()
-        
-        # Calculate duration
-        audio_duration = waveform.shape[-1] / sample_rate
-        
-        logger.info(f"Processing audio from memory (duration: {audio_duration:.2f}s)")
-        
-        # Build pipeline kwargs
-        pipeline_kwargs = {}
-        num_speakers = kwargs.get("num_speakers")
-        min_speakers = kwargs.get("min_speakers")
-        max_speakers = kwargs.get("max_speakers")
-        exclusive = kwargs.get("exclusive", False)
-        
-        if num_speakers is not None:
-            pipeline_kwargs["num_speakers"] = num_speakers
-        else:
-            if min_speakers is not None:
-                pipeline_kwargs["min_speakers"] = min_speakers
-            if max_speakers is not None:
-                pipeline_kwargs["max_speakers"] = max_speakers
-        
-        # Run diarization with in-memory audio
-        output = self.pipeline({"waveform": waveform, "sample_rate": sample_rate}, **pipeline_kwargs)
+        return self.diarize({"waveform": waveform, "sample_rate": sample_rate}, **kwargs)
+    
+    def _segments_from_annotation(self, annotation) -> list[dict]:
+        """Convert a pyannote Annotation into segment dictionaries.
         
-        processing_time = time.time() - start_time
+        Labels are resolved once per speaker (integer labels become
+        SPEAKER_NN) and timings are rounded in one numpy pass per column.
         
-        # Extract segments
-        if exclusive:
-            segments = []
-            speakers = set()
-            
-            for turn, speaker in output.exclusive_speaker_diarization:
-                segments.append({
-                    "speaker": f"SPEAKER_{speaker:02d}" if isinstance(speaker, int) else speaker,
-                    "start": round(turn.start, 3),
-                    "end": round(turn.end, 3),
-                    "duration": round(turn.end - turn.start, 3)
-                })
-                speakers.add(speaker)
-        else:
-            segments = []
-            speakers = set()
+        Args:
+            annotation: pyannote.core Annotation with speaker labels
             
-            for turn, _, speaker in output.itertracks(yield_label=True):
-                segments.append({
-                    "speaker": speaker,
-                    "start": round(turn.start, 3),
-                    "end": round(turn.end, 3),
-                    "duration": round(turn.end - turn.start, 3)
-                })
-                speakers.add(speaker)
-        
-        logger.info(f"Diarization complete: {len(speakers)} speakers, {len(segments)} segments, {processing_time:.2f}s")
-        
-        return {
-            "segments": segments,
-            "num_speakers": len(speakers),
-            "audio_duration": round(audio_duration, 3),
-            "processing_time": round(processing_time, 3),
-            "exclusive": exclusive
+        Returns:
+            List of segment dicts with 'speaker', 'start', 'end', 'duration'
+        """
+        tracks = list(annotation.itertracks(yield_label=True))
+        label_map = {
+            speaker: f"SPEAKER_{speaker:02d}" if isinstance(speaker, int) else speaker
+            for speaker in annotation.labels()
         }
+        starts = np.fromiter((turn.start for turn, _, _ in tracks), dtype=np.float64, count=len(tracks))
+        ends = np.fromiter((turn.end for turn, _, _ in tracks), dtype=np.float64, count=len(tracks))
+        
+        return [
+            {"speaker": label_map[speaker], "start": start, "end": end, "duration": duration}
+            for (_, _, speaker), start, end, duration in zip(
+                tracks,
+                np.round(starts, 3).tolist(),
+                np.round(ends, 3).tolist(),
+                np.round(ends - starts, 3).tolist()
+            )
+        ]
     
     def _make_exclusive(self, segments: list[dict]) -> list[dict]:
         """Convert overlapping segments to exclusive (non-overlapping) segments.
@@ -269,23 +348,33 @@ class DiarizationService:
         if not segments:
             return segments
         
-        # Sort by start time
-        sorted_segments = sorted(segments, key=lambda x: x["start"])
+        # Sort by start time (stable, like sorted())
+        starts = np.fromiter((seg["start"] for seg in segments), dtype=np.float64, count=len(segments))
+        order = np.argsort(starts, kind="stable")
+        starts = starts[order]
+        ends = np.fromiter((segments[i]["end"] for i in order), dtype=np.float64, count=len(segments))
+        
+        # Simple approach: for overlapping segments, truncate the earlier one.
+        # Each segment only ever overlaps-checks against its successor, so the
+        # whole pass is one shifted comparison
+        truncated = np.zeros(len(segments), dtype=bool)
+        truncated[:-1] = starts[1:] < ends[:-1]
+        new_ends = np.where(truncated, np.append(starts[1:], 0.0), ends)
+        new_durations = np.round(new_ends - starts, 3)
+        
+        # Truncated segments that shrink to nothing are dropped
+        keep = ~truncated | (new_durations > 0)
         
-        # Simple approach: for overlapping segments, truncate the earlier one
         exclusive = []
-        for seg in sorted_segments:
-            if not exclusive:
-                exclusive.append(seg.copy())
-            else:
-                last = exclusive[-1]
-                if seg["start"] < last["end"]:
-                    # Overlap detected - truncate the previous segment
-                    last["end"] = seg["start"]
-                    last["duration"] = round(last["end"] - last["start"], 3)
-                    if last["duration"] <= 0:
-                        exclusive.pop()
-                exclusive.append(seg.copy())
+        for i, is_truncated, end, duration in zip(
+            order[keep].tolist(), truncated[keep].tolist(),
+            new_ends[keep].tolist(), new_durations[keep].tolist()
+        ):
+            seg = segments[i].copy()
+            if is_truncated:
+                seg["end"] = end
+                seg["duration"] = duration
+            exclusive.append(seg)
         
         return exclusive
     
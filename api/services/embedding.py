@@ -2,22 +2,37 @@
 
 import logging
 import os
+import warnings
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
 import torch
 from torch.serialization import add_safe_globals
-import torchaudio
 from pyannote.audio import Model, Inference
 from pyannote.core import Segment
 from torch.torch_version import TorchVersion
 
 from config import Settings
+from .audio import (
+    MODEL_SAMPLE_RATE,
+    AudioSource,
+    describe_source,
+    load_and_resample,
+    load_segment_and_resample
+)
+from .hub import resolve_model_dir
+from .inference import check_device_placement, inference_context, release_cuda_memory
+from .result_cache import ResultCache
 
 
 logger = logging.getLogger(__name__)
 
+# Waveform lengths (seconds) and agreement required by the startup check that
+# batched embeddings match the unbatched Inference
+BATCH_CHECK_SECONDS = (0.7, 1.6, 3.1, 5.0)
+BATCH_CHECK_MIN_SIMILARITY = 0.995
+
 
 class EmbeddingService:
     """Service for extracting speaker embeddings using wespeaker model."""
@@ -31,7 +46,16 @@ class EmbeddingService:
         self.settings = settings
         self.model: Optional[Model] = None
         self.inference: Optional[Inference] = None
+        # torch.compile'd ResNet for the batched forward pass (CUDA and compile_embedding_model only)
+        self._compiled_resnet: Optional[torch.nn.Module] = None
+        # Whether segments are embedded in padded batches (see _check_batching)
+        self._batching = False
+        # Sliding-window Inference wrappers keyed by (duration, step); they share self.model
+        self._sliding_inferences: dict[tuple[float, float], Inference] = {}
         self.device: Optional[torch.device] = None
+        self.embedding_cache: Optional[ResultCache] = (
+            ResultCache(settings.embedding_cache_size) if settings.embedding_cache_size > 0 else None
+        )
         self._initialized = False
         
     def initialize(self) -> None:
@@ -65,18 +89,20 @@ class EmbeddingService:
             # Try loading from local path first (for offline use)
             local_model_path = Path(self.settings.model_cache_dir) / "pyannote-wespeaker-voxceleb-resnet34-LM"
             
-            if local_model_path.exists():
-                logger.info(f"Loading embedding model from local path: {local_model_path}")
-                self.model = Model.from_pretrained(str(local_model_path))
-            else:
-                logger.info(f"Loading embedding model from HuggingFace: {self.settings.embedding_model}")
-                self.model = Model.from_pretrained(self.settings.embedding_model)
+            model_dir = resolve_model_dir(self.settings.embedding_model, local_model_path, self.settings)
+            logger.info(f"Loading embedding model from: {model_dir}")
+            self.model = Model.from_pretrained(model_dir)
             
             # Create inference object with whole audio window
             self.inference = Inference(self.model, window="whole")
             
             # Move to device
             self.inference.to(self.device)
+            check_device_placement({"embedding": self.model}, self.device)
+            
+            if self.settings.compile_embedding_model and self.device.type == "cuda":
+                self._compile_model()
+            self._check_batching()
             
             self._initialized = True
             logger.info("Speaker embedding model initialized successfully")
@@ -85,97 +111,139 @@ class EmbeddingService:
             logger.error(f"Failed to initialize embedding model: {e}")
             raise
     
+    def _compile_model(self) -> None:
+        """Compile the model's ResNet for the batched forward pass.
+        
+        Only ``_embed_batch`` calls the compiled module, after computing the
+        filterbanks itself; pyannote's Inference keeps the plain Model, whose
+        attributes it relies on. Shapes are marked dynamic since batch size
+        and padded length vary per call.
+        """
+        try:
+            self._compiled_resnet = torch.compile(self.model.resnet, dynamic=True)
+            logger.info("Embedding model compiled with torch.compile")
+        except Exception as e:
+            logger.warning(f"torch.compile unavailable, using eager embedding model: {e}")
+            self._compiled_resnet = None
+    
+    def release(self) -> None:
+        """Drop the embedding model and free its device memory.
+        
+        The next extraction call re-initializes it, so a process can hand
+        the GPU to another model in between.
+        """
+        self.model = None
+        self.inference = None
+        self._compiled_resnet = None
+        self._batching = False
+        self._sliding_inferences.clear()
+        self._initialized = False
+        release_cuda_memory(self.device)
+        logger.info("Speaker embedding model released")
+    
     @property
     def is_initialized(self) -> bool:
         """Check if the service is initialized."""
         return self._initialized
     
-    def extract_embedding(self, audio_path: str) -> np.ndarray:
+    def extract_embedding(self, audio_path: AudioSource) -> np.ndarray:
         """Extract a single embedding from an entire audio file.
 
         Args:
-            audio_path: Path to the audio file
+            audio_path: Path, open binary file-like object or decoded audio dict
 
         Returns:
-            Embedding vector as numpy array (shape: 1 x embedding_dim)
+            Unit-norm embedding vector as numpy array (shape: embedding_dim)
         """
         if not self._initialized:
             self.initialize()
 
-        logger.info(f"Extracting embedding from: {audio_path}")
+        logger.info(f"Extracting embedding from: {describe_source(audio_path)}")
 
         # Preload audio with torchaudio to bypass torchcodec chunk issues
-        waveform, sample_rate = torchaudio.load(audio_path)
+        waveform, sample_rate = load_and_resample(audio_path, device=self.device)
         audio_input = {"waveform": waveform, "sample_rate": sample_rate}
 
-        embedding = self.inference(audio_input)
+        with inference_context(self.device):
+            embedding = self.inference(audio_input)
 
         logger.info(f"Embedding extracted, shape: {embedding.shape}")
 
-        return embedding
+        return self._normalize(embedding)
     
     def extract_embedding_from_segment(
         self,
-        audio_path: str,
+        audio_path: AudioSource,
         start: float,
         end: float
     ) -> np.ndarray:
         """Extract embedding from a specific segment of an audio file.
 
         Args:
-            audio_path: Path to the audio file
+            audio_path: Path, open binary file-like object or decoded audio dict
             start: Start time in seconds
             end: End time in seconds
 
         Returns:
-            Embedding vector as numpy array (shape: 1 x embedding_dim)
+            Unit-norm embedding vector as numpy array (shape: embedding_dim)
         """
         if not self._initialized:
             self.initialize()
 
         logger.info(f"Extracting embedding from segment [{start:.2f}s - {end:.2f}s]")
 
-        # Preload audio and slice to segment to bypass torchcodec chunk issues
-        waveform, sample_rate = torchaudio.load(audio_path)
-        start_sample = int(start * sample_rate)
-        end_sample = int(end * sample_rate)
-        segment_waveform = waveform[:, start_sample:end_sample]
+        # Decode just the segment with torchaudio to bypass torchcodec chunk issues
+        segment_waveform, sample_rate = load_segment_and_resample(audio_path, start, end, device=self.device)
 
         audio_input = {"waveform": segment_waveform, "sample_rate": sample_rate}
-        embedding = self.inference(audio_input)
+        with inference_context(self.device):
+            embedding = self.inference(audio_input)
 
-        return embedding
+        return self._normalize(embedding)
     
     def extract_sliding_embeddings(
         self,
-        audio_path: str,
+        audio_path: AudioSource,
         duration: float = 3.0,
         step: float = 1.0
     ) -> tuple[np.ndarray, list[tuple[float, float]]]:
         """Extract embeddings using a sliding window.
 
         Args:
-            audio_path: Path to the audio file
+            audio_path: Path, open binary file-like object or decoded audio dict
             duration: Window duration in seconds
             step: Step size in seconds
 
         Returns:
-            Tuple of (embeddings array, list of (start, end) tuples for each embedding)
+            Tuple of (unit-norm embeddings array, list of (start, end) tuples for each embedding)
         """
         if not self._initialized:
             self.initialize()
 
-        # Create a new inference with sliding window
-        sliding_inference = Inference(self.model, window="sliding", duration=duration, step=step)
-        sliding_inference.to(self.device)
+        # Reuse the sliding-window wrapper for this window; it shares the model's weights
+        sliding_inference = self._sliding_inferences.get((duration, step))
+        if sliding_inference is None:
+            sliding_inference = Inference(
+                self.model,
+                window="sliding",
+                duration=duration,
+                step=step,
+                device=self.device
+            )
+            self._sliding_inferences[(duration, step)] = sliding_inference
 
         logger.info(f"Extracting sliding embeddings (window={duration}s, step={step}s)")
 
         # Preload audio with torchaudio to bypass torchcodec chunk issues
-        waveform, sample_rate = torchaudio.load(audio_path)
+        waveform, sample_rate = load_and_resample(audio_path, device=self.device)
         audio_input = {"waveform": waveform, "sample_rate": sample_rate}
 
-        embeddings = sliding_inference(audio_input)
+        try:
+            with inference_context(self.device):
+                embeddings = sliding_inference(audio_input)
+        finally:
+            if self.settings.release_cuda_cache:
+                release_cuda_memory(self.device)
 
         # Get the time ranges for each embedding
         sliding_window = embeddings.sliding_window
@@ -187,18 +255,19 @@ class EmbeddingService:
 
         logger.info(f"Extracted {len(embeddings)} embeddings")
 
-        return np.array(embeddings.data), time_ranges
+        data = np.array(embeddings.data)
+        return data / (np.linalg.norm(data, axis=1, keepdims=True) + 1e-12), time_ranges
     
     def extract_embeddings_for_segments(
         self,
-        audio_path: str,
+        audio_path: AudioSource,
         segments: list[dict],
         min_duration: float = 0.5
     ) -> list[tuple[dict, np.ndarray]]:
         """Extract embeddings for a list of speaker segments.
         
         Args:
-            audio_path: Path to the audio file
+            audio_path: Path, open binary file-like object or decoded audio dict
             segments: List of segment dictionaries with 'start', 'end', 'speaker' keys
             min_duration: Minimum segment duration to extract embedding (in seconds)
             
@@ -208,30 +277,288 @@ class EmbeddingService:
         if not self._initialized:
             self.initialize()
         
-        results = []
+        # Load once; every segment is sliced from the same waveform
+        waveform, sample_rate = load_and_resample(audio_path, device=self.device)
         
+        # Checked once: the per-segment f-string is only built when DEBUG is on
+        log_skips = logger.isEnabledFor(logging.DEBUG)
+        kept = []
         for segment in segments:
             duration = segment["end"] - segment["start"]
             
             if duration < min_duration:
-                logger.debug(f"Skipping short segment: {duration:.2f}s < {min_duration}s")
+                if log_skips:
+                    logger.debug(f"Skipping short segment: {duration:.2f}s < {min_duration}s")
                 continue
             
-            try:
-                embedding = self.extract_embedding_from_segment(
-                    audio_path,
-                    segment["start"],
-                    segment["end"]
-                )
-                results.append((segment, embedding))
-            except Exception as e:
-                logger.warning(f"Failed to extract embedding for segment: {e}")
-                continue
+            kept.append(segment)
+        
+        embeddings = self._embed_spans(
+            waveform,
+            sample_rate,
+            [(segment["start"], segment["end"]) for segment in kept]
+        )
+        results = [
+            (segment, embedding)
+            for segment, embedding in zip(kept, embeddings)
+            if embedding is not None
+        ]
         
         logger.info(f"Extracted embeddings for {len(results)}/{len(segments)} segments")
         
         return results
     
+    def extract_embeddings_for_tagged_segments(
+        self,
+        audio_path: AudioSource,
+        tagged_segments: list[tuple[str, dict]],
+        min_duration: float = 0.5,
+        audio_hash: Optional[str] = None
+    ) -> list[tuple[str, np.ndarray]]:
+        """Extract embeddings for segments of several speakers in one call.
+        
+        The audio is loaded once and every segment is sliced from the same
+        waveform, instead of one extraction call (and load) per speaker.
+        
+        Args:
+            audio_path: Path, open binary file-like object or decoded audio dict
+            tagged_segments: List of (speaker_label, segment) tuples; segments have 'start' and 'end'
+            min_duration: Minimum segment duration to extract embedding (in seconds)
+            audio_hash: Content hash of the audio; enables the per-segment embedding cache
+            
+        Returns:
+            List of (speaker_label, embedding) tuples, in input order
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        waveform, sample_rate = load_and_resample(audio_path, device=self.device)
+        
+        # One slot per kept segment; cache hits are filled in right away and
+        # the misses are embedded together in padded batches
+        results: list[tuple[str, Optional[np.ndarray]]] = []
+        misses = []
+        
+        log_skips = logger.isEnabledFor(logging.DEBUG)
+        for speaker, segment in tagged_segments:
+            duration = segment["end"] - segment["start"]
+            
+            if duration < min_duration:
+                if log_skips:
+                    logger.debug(f"Skipping short segment: {duration:.2f}s < {min_duration}s")
+                continue
+            
+            cache_key = None
+            if audio_hash and self.embedding_cache is not None:
+                cache_key = f"emb:{audio_hash}:{segment['start']}:{segment['end']}"
+                cached = self.embedding_cache.get(cache_key)
+                if cached is not None:
+                    results.append((speaker, cached))
+                    continue
+            
+            misses.append((len(results), cache_key, segment))
+            results.append((speaker, None))
+        
+        embeddings = self._embed_spans(
+            waveform,
+            sample_rate,
+            [(segment["start"], segment["end"]) for _, _, segment in misses]
+        )
+        for (slot, cache_key, _), embedding in zip(misses, embeddings):
+            if embedding is None:
+                continue
+            if cache_key is not None:
+                self.embedding_cache.put(cache_key, embedding)
+            results[slot] = (results[slot][0], embedding)
+        
+        results = [(speaker, embedding) for speaker, embedding in results if embedding is not None]
+        
+        logger.info(f"Extracted embeddings for {len(results)}/{len(tagged_segments)} segments")
+        
+        return results
+    
+    def _embed_spans(
+        self,
+        waveform: torch.Tensor,
+        sample_rate: int,
+        spans: list[tuple[float, float]]
+    ) -> list[Optional[np.ndarray]]:
+        """Embed time spans of one waveform in padded batches.
+        
+        Spans are sorted by length so each batch pads as little as possible
+        (see _embed_batch for how padding is kept out of the features).
+        A batch that fails is retried one span at a time.
+        
+        Args:
+            waveform: Mono waveform at the model's sample rate, shape (1, time)
+            sample_rate: Sample rate of the waveform
+            spans: List of (start, end) times in seconds
+            
+        Returns:
+            Unit-norm embedding per span, in input order (None where extraction failed)
+        """
+        bounds = [(int(start * sample_rate), int(end * sample_rate)) for start, end in spans]
+        segments = [waveform[:, start:end] for start, end in bounds]
+        order = sorted(range(len(segments)), key=lambda i: segments[i].shape[1])
+        return self._embed_groups(segments, sample_rate, [
+            order[start:start + self.settings.embedding_batch_size]
+            for start in range(0, len(order), self.settings.embedding_batch_size)
+        ])
+    
+    def embed_waveforms(self, waveforms: list[torch.Tensor]) -> list[Optional[np.ndarray]]:
+        """Embed several whole waveforms, batching only those of equal length.
+        
+        Used by EmbeddingBatcher to serve concurrent requests. Whole files
+        are never padded: a stored reference embedding must not depend on
+        which other uploads shared its batch, and padding every file to the
+        longest one would multiply device memory. Files of identical length
+        share a forward pass; every other file runs on its own.
+        
+        Args:
+            waveforms: Mono waveforms at the models' sample rate, shape (1, time) each
+            
+        Returns:
+            Unit-norm embedding per waveform, in input order (None where extraction failed)
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        by_length: dict[int, list[int]] = {}
+        for i, waveform in enumerate(waveforms):
+            by_length.setdefault(waveform.shape[1], []).append(i)
+        
+        batch_size = self.settings.embedding_batch_size
+        return self._embed_groups(waveforms, MODEL_SAMPLE_RATE, [
+            indices[start:start + batch_size]
+            for indices in by_length.values()
+            for start in range(0, len(indices), batch_size)
+        ])
+    
+    def _embed_groups(
+        self,
+        segments: list[torch.Tensor],
+        sample_rate: int,
+        groups: list[list[int]]
+    ) -> list[Optional[np.ndarray]]:
+        """Embed segments one batch per group of indices.
+        
+        Single-segment groups, and every group when batching failed the
+        startup check (see _check_batching), go through the unbatched
+        Inference. A batch that fails is retried one segment at a time.
+        
+        Args:
+            segments: Mono waveforms at the model's sample rate, shape (1, time) each
+            sample_rate: Sample rate of the segments
+            groups: Lists of segment indices embedded together
+            
+        Returns:
+            Unit-norm embedding per segment, in input order (None where extraction failed)
+        """
+        embeddings: list[Optional[np.ndarray]] = [None] * len(segments)
+        
+        try:
+            for group in groups:
+                if self._batching and len(group) > 1:
+                    try:
+                        batch_embeddings = self._embed_batch([segments[i] for i in group])
+                        for i, embedding in zip(group, batch_embeddings):
+                            embeddings[i] = self._normalize(embedding)
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Batched embedding failed, retrying per segment: {e}")
+                
+                for i in group:
+                    try:
+                        with inference_context(self.device):
+                            embedding = self.inference({"waveform": segments[i], "sample_rate": sample_rate})
+                        embeddings[i] = self._normalize(embedding)
+                    except Exception as e:
+                        logger.warning(f"Failed to extract embedding for segment: {e}")
+        finally:
+            if segments and self.settings.release_cuda_cache:
+                release_cuda_memory(self.device)
+        
+        return embeddings
+    
+    def _embed_batch(self, segments: list[torch.Tensor]) -> np.ndarray:
+        """Run the embedding network once on a batch of waveforms.
+        
+        Filterbank features are computed per waveform, so each one is
+        mean-normalized over its own frames exactly as the unbatched
+        Inference does. Only then are the features zero-padded to the
+        longest one, and a frame mask keeps the padding out of the
+        statistics pooling.
+        
+        Args:
+            segments: Mono waveforms, shape (1, time) each
+            
+        Returns:
+            Embeddings array of shape (len(segments), embedding_dim)
+        """
+        # Filterbanks stay in float32 even when the network runs in bfloat16
+        with inference_context(self.device):
+            features = [
+                self.model.compute_fbank(segment.to(self.device, non_blocking=True).unsqueeze(0))[0]
+                for segment in segments
+            ]
+            frame_counts = torch.tensor([f.shape[0] for f in features], device=self.device)
+            batch = torch.nn.utils.rnn.pad_sequence(features, batch_first=True)
+            masks = (torch.arange(batch.shape[1], device=self.device) < frame_counts.unsqueeze(1)).float()
+        
+        with inference_context(self.device, self.settings.use_bf16), warnings.catch_warnings():
+            # Statistics pooling warns when it resizes the frame mask to its own resolution
+            warnings.simplefilter("ignore")
+            if self._compiled_resnet is not None:
+                try:
+                    embeddings = self._compiled_resnet(batch, weights=masks)[1]
+                except Exception as e:
+                    # Compilation happens on first call; fall back to eager for good
+                    logger.warning(f"Compiled embedding model failed, using eager mode: {e}")
+                    self._compiled_resnet = None
+                    embeddings = self.model.resnet(batch, weights=masks)[1]
+            else:
+                embeddings = self.model.resnet(batch, weights=masks)[1]
+        
+        # Upcast before leaving torch: numpy has no bfloat16, and similarity
+        # math downstream expects float32
+        return embeddings.float().cpu().numpy()
+    
+    def _check_batching(self) -> None:
+        """Disable batched embedding unless it reproduces the unbatched Inference.
+        
+        Embeds a few fixed pseudo-random waveforms of different lengths both
+        ways and compares them. Batching is turned off (every segment then
+        goes through Inference) when the model lacks the expected filterbank
+        and ResNet attributes or any embedding differs beyond
+        BATCH_CHECK_MIN_SIMILARITY.
+        """
+        generator = torch.Generator().manual_seed(0)
+        segments = [
+            0.1 * torch.randn(1, int(seconds * MODEL_SAMPLE_RATE), generator=generator)
+            for seconds in BATCH_CHECK_SECONDS
+        ]
+        try:
+            batched = [self._normalize(embedding) for embedding in self._embed_batch(segments)]
+            with inference_context(self.device):
+                single = [
+                    self._normalize(self.inference({"waveform": segment, "sample_rate": MODEL_SAMPLE_RATE}))
+                    for segment in segments
+                ]
+            similarity = min(float(np.dot(a, b)) for a, b in zip(batched, single))
+        except Exception as e:
+            logger.warning(f"Batched embedding unavailable, embedding segments one at a time: {e}")
+            self._batching = False
+            return
+        
+        self._batching = similarity >= BATCH_CHECK_MIN_SIMILARITY
+        if self._batching:
+            logger.info(f"Batched embedding check passed (min cosine similarity {similarity:.4f})")
+        else:
+            logger.warning(
+                f"Batched embeddings differ from unbatched ones (min cosine similarity "
+                f"{similarity:.4f}), embedding segments one at a time"
+            )
+    
     def extract_embedding_from_memory(
         self,
         waveform: torch.Tensor,
@@ -244,14 +571,52 @@ class EmbeddingService:
             sample_rate: Sample rate of the audio
             
         Returns:
-            Embedding vector as numpy array
+            Unit-norm embedding vector as numpy array
         """
         if not self._initialized:
             self.initialize()
         
-        embedding = self.inference({"waveform": waveform, "sample_rate": sample_rate})
+        with inference_context(self.device):
+            embedding = self.inference({"waveform": waveform, "sample_rate": sample_rate})
         
-        return embedding
+        return self._normalize(embedding)
+    
+    def extract_embeddings_for_segments_from_memory(
+        self,
+        waveform: torch.Tensor,
+        sample_rate: int,
+        segments: list[dict],
+        **kwargs
+    ) -> list[tuple[dict, np.ndarray]]:
+        """Extract embeddings for speaker segments of audio loaded in memory.
+        
+        Thin wrapper over ``extract_embeddings_for_segments``, which already
+        slices every segment from one in-memory waveform.
+        
+        Args:
+            waveform: Audio waveform tensor
+            sample_rate: Sample rate of the audio
+            segments: List of segment dictionaries with 'start', 'end', 'speaker' keys
+            **kwargs: Additional arguments passed to extract_embeddings_for_segments
+            
+        Returns:
+            List of (segment, embedding) tuples
+        """
+        return self.extract_embeddings_for_segments(
+            {"waveform": waveform, "sample_rate": sample_rate},
+            segments,
+            **kwargs
+        )
+    
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        """Flatten an embedding and scale it to unit L2 norm.
+        
+        Every extraction path returns normalized vectors, so cosine
+        similarity reduces to a dot product.
+        """
+        e = embedding.flatten()
+        return e / (np.linalg.norm(e) + 1e-12)
     
     def compute_similarity(
         self,
@@ -260,22 +625,37 @@ class EmbeddingService:
     ) -> float:
         """Compute cosine similarity between two embeddings.
         
+        Embeddings from this service are already unit-norm, so this is a
+        plain dot product.
+        
         Args:
-            embedding1: First embedding vector
-            embedding2: Second embedding vector
+            embedding1: First unit-norm embedding vector
+            embedding2: Second unit-norm embedding vector
             
         Returns:
             Cosine similarity score (0-1, higher means more similar)
         """
-        # Flatten if needed
-        e1 = embedding1.flatten()
-        e2 = embedding2.flatten()
-        
-        # Compute cosine similarity
-        similarity = np.dot(e1, e2) / (np.linalg.norm(e1) * np.linalg.norm(e2))
+        similarity = np.dot(embedding1.ravel(), embedding2.ravel())
         
         # Convert from [-1, 1] to [0, 1]
-        return float((similarity + 1) / 2)
+        return float((similarity + 1.0) * 0.5)
+    
+    def compute_similarity_matrix(
+        self,
+        embeddings1: np.ndarray,
+        embeddings2: np.ndarray
+    ) -> np.ndarray:
+        """Compute cosine similarity between every pair of two embedding sets.
+        
+        Args:
+            embeddings1: Unit-norm embeddings, shape (N, embedding_dim)
+            embeddings2: Unit-norm embeddings, shape (M, embedding_dim)
+            
+        Returns:
+            Similarity matrix of shape (N, M) with scores in 0-1
+        """
+        similarity = np.atleast_2d(embeddings1) @ np.atleast_2d(embeddings2).T
+        return (similarity + 1.0) * 0.5
     
     def get_embedding_dimension(self) -> int:
         """Get the dimension of the embedding vectors."""
@@ -0,0 +1,126 @@
+"""Cross-request batching for whole-file speaker embeddings."""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from .audio import AudioSource, load_and_resample
+from .embedding import EmbeddingService
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Collects concurrent whole-file embedding requests into shared forward passes.
+
+    Each request decodes its own audio and queues the waveform. A single
+    worker task waits up to ``max_wait_ms`` for more requests to arrive,
+    then embeds up to ``max_batch_size`` waveforms together and resolves
+    every caller's future with its row. Only waveforms of identical length
+    share a forward pass (see EmbeddingService.embed_waveforms), so a
+    file's embedding never depends on what else was queued with it.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        max_batch_size: int,
+        max_wait_ms: float,
+        runner: Optional[Callable[..., Awaitable]] = None
+    ):
+        """Initialize the batcher.
+
+        Args:
+            embedding_service: Service that runs the model
+            max_batch_size: Maximum waveforms per forward pass
+            max_wait_ms: How long the first queued request waits for company
+            runner: Coroutine function used to run the blocking batch call
+                (e.g. one that holds an inference semaphore); defaults to
+                asyncio.to_thread
+        """
+        self.embedding_service = embedding_service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._runner = runner or asyncio.to_thread
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the worker task; must be called from a running event loop."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        """Stop the worker and fail any requests still queued."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Embedding batcher is shut down"))
+
+    async def embed(self, audio: AudioSource) -> np.ndarray:
+        """Extract a unit-norm embedding from a whole audio source.
+
+        Args:
+            audio: Path, open binary file-like object or decoded audio dict
+
+        Returns:
+            Embedding vector as numpy array (shape: embedding_dim)
+        """
+        waveform, _ = await asyncio.to_thread(
+            load_and_resample, audio, device=self.embedding_service.device
+        )
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((waveform, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Worker loop: gather a batch, embed it, resolve the futures."""
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(items) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that gave up (e.g. disconnected) are dropped before the forward pass
+            items = [(waveform, future) for waveform, future in items if not future.done()]
+            if not items:
+                continue
+
+            try:
+                embeddings = await self._runner(
+                    self.embedding_service.embed_waveforms,
+                    [waveform for waveform, _ in items]
+                )
+            except Exception as e:
+                logger.error(f"Batched embedding of {len(items)} requests failed: {e}")
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            logger.debug(f"Embedded {len(items)} requests in one batch")
+            for (_, future), embedding in zip(items, embeddings):
+                if future.done():
+                    continue
+                if embedding is None:
+                    future.set_exception(ValueError("Could not extract an embedding from the audio"))
+                else:
+                    future.set_result(embedding)
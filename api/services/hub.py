@@ -0,0 +1,56 @@
+"""Model checkpoint resolution against the local cache and HuggingFace Hub."""
+
+import importlib.util
+import logging
+from pathlib import Path
+
+import huggingface_hub
+from huggingface_hub import snapshot_download
+from huggingface_hub.errors import LocalEntryNotFoundError
+
+from config import Settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_model_dir(repo_id: str, local_model_path: Path, settings: Settings) -> str:
+    """Get a local directory holding a model checkpoint, downloading it if needed.
+
+    A manually provisioned ``local_model_path`` wins. Otherwise the HF cache is
+    tried with ``local_files_only`` first, so a warm cache loads without any
+    network round trip, and only a cold cache downloads the whole repository
+    in one snapshot (through hf_transfer when it is installed).
+
+    Args:
+        repo_id: HuggingFace repository id (e.g. "pyannote/speaker-diarization-3.1")
+        local_model_path: Directory checked first, for offline deployments
+        settings: Application settings (cache directory and token)
+
+    Returns:
+        Path to a directory the pyannote loaders accept
+    """
+    if local_model_path.exists():
+        logger.info(f"Using local model directory: {local_model_path}")
+        return str(local_model_path)
+
+    download_kwargs = {
+        "repo_id": repo_id,
+        "cache_dir": settings.model_cache_dir,
+        "token": settings.huggingface_token or None
+    }
+
+    try:
+        model_dir = snapshot_download(local_files_only=True, **download_kwargs)
+        logger.info(f"Using cached snapshot of {repo_id}: {model_dir}")
+        return model_dir
+    except LocalEntryNotFoundError:
+        pass
+
+    # The env var is read when huggingface_hub is imported, which pyannote
+    # has already done, so the flag is set on the constants module instead
+    if importlib.util.find_spec("hf_transfer") is not None:
+        huggingface_hub.constants.HF_HUB_ENABLE_HF_TRANSFER = True
+
+    logger.info(f"Downloading {repo_id} from HuggingFace")
+    return snapshot_download(**download_kwargs)
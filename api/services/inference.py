@@ -0,0 +1,93 @@
+"""Torch execution settings shared by the model-backed services."""
+
+import gc
+import logging
+import os
+from contextlib import ExitStack
+from typing import Optional
+
+# Must be set before the CUDA caching allocator initializes. Expandable
+# segments let the allocator grow blocks in place instead of fragmenting
+# when diarization and embedding batches of varying size alternate.
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
+import torch
+
+
+logger = logging.getLogger(__name__)
+
+
+def configure_torch_backends() -> None:
+    """Set process-wide torch backend flags for inference.
+
+    Enables TF32 tensor-core math for float32 matmuls and convolutions (only
+    affects Ampere and newer GPUs). cuDNN autotuning stays off: embedding
+    batches change length with every request, so it would re-benchmark
+    kernels for nearly every call instead of reusing a tuned one.
+    """
+    torch.set_float32_matmul_precision("high")
+    torch.backends.cudnn.allow_tf32 = True
+    torch.backends.cudnn.benchmark = False
+
+
+def inference_context(device: Optional[torch.device], use_bf16: bool = False) -> ExitStack:
+    """Build the context model calls run in.
+
+    Always disables autograd tracking with ``torch.inference_mode()``. On a
+    CUDA device with bfloat16 support, ``use_bf16`` also enables bfloat16
+    autocast. Only request it around forward passes whose outputs the caller
+    upcasts itself: pyannote's Inference and pipelines call ``.numpy()`` on
+    model outputs, which fails for bfloat16 tensors.
+
+    Args:
+        device: Device the model runs on
+        use_bf16: Whether to autocast to bfloat16 when supported
+
+    Returns:
+        Context manager to wrap the model call in
+    """
+    stack = ExitStack()
+    stack.enter_context(torch.inference_mode())
+    if use_bf16 and device is not None and device.type == "cuda" and torch.cuda.is_bf16_supported():
+        stack.enter_context(torch.autocast(device_type="cuda", dtype=torch.bfloat16))
+    return stack
+
+
+def check_device_placement(modules: dict[str, torch.nn.Module], device: torch.device) -> list[str]:
+    """Warn about models whose weights are not on the expected device.
+
+    ``.to(device)`` on a pipeline does not fail when a sub-model ignores it;
+    inference then silently runs on the CPU, many times slower.
+
+    Args:
+        modules: Models keyed by a name used in the log message
+        device: Device every model should be on
+
+    Returns:
+        Names of the misplaced models
+    """
+    misplaced = []
+    for name, module in modules.items():
+        parameter = next(module.parameters(), None)
+        if parameter is None:
+            continue
+        actual = parameter.device
+        if actual.type != device.type or (device.index is not None and actual.index != device.index):
+            logger.warning(f"Model '{name}' is on {actual}, expected {device}")
+            misplaced.append(name)
+    return misplaced
+
+
+def release_cuda_memory(device: Optional[torch.device]) -> None:
+    """Return cached CUDA blocks to the driver after a model call.
+
+    Collects garbage first so tensors only kept alive by reference cycles
+    are freed before the cache is emptied. No-op off CUDA.
+
+    Args:
+        device: Device the model ran on
+    """
+    if device is None or device.type != "cuda":
+        return
+    gc.collect()
+    torch.cuda.empty_cache()
@@ -0,0 +1,115 @@
+"""In-process similarity cache for speaker search results."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import numpy as np
+
+
+class QueryCache:
+    """LRU cache of Qdrant search results keyed by query vector similarity.
+
+    A lookup hits when a cached query vector has cosine similarity of at
+    least ``min_similarity`` with the new one and was searched with the same
+    parameters (top_k, threshold). Repeated utterances of the same speaker
+    then skip the Qdrant round trip. Entries expire after ``ttl_seconds``
+    and callers clear the cache whenever the collection changes.
+    """
+
+    def __init__(self, max_entries: int, min_similarity: float, ttl_seconds: float):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached queries; least recently used are evicted
+            min_similarity: Cosine similarity a query needs to reuse a cached result
+            ttl_seconds: Age after which an entry is no longer returned
+        """
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        self.ttl_seconds = ttl_seconds
+        # Unit-norm cached query vectors, one row per slot, allocated on the
+        # first put (once the embedding dimension is known). A lookup scores
+        # every slot with a single matrix-vector product.
+        self._matrix: Optional[np.ndarray] = None
+        # Per-slot search params (as small int codes, -1 = free), insertion time and matches
+        self._param_codes = np.full(max_entries, -1, dtype=np.int32)
+        self._inserted = np.zeros(max_entries, dtype=np.float64)
+        self._matches: list[Optional[list[dict]]] = [None] * max_entries
+        self._codes: dict[Hashable, int] = {}
+        # Occupied slots from least to most recently used
+        self._lru: OrderedDict[int, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(vector: np.ndarray) -> np.ndarray:
+        vector = np.ravel(vector).astype(np.float32)
+        return vector / (np.linalg.norm(vector) + 1e-12)
+
+    def get(self, vector: np.ndarray, params: Hashable) -> Optional[list[dict]]:
+        """Get the cached matches of the most similar earlier query.
+
+        Args:
+            vector: Query embedding
+            params: Search parameters the result must have been produced with
+
+        Returns:
+            Cached list of matches, or None on a miss
+        """
+        query = self._unit(vector)
+        now = time.monotonic()
+        with self._lock:
+            code = self._codes.get(params)
+            if code is None or self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+                return None
+
+            scores = self._matrix @ query
+            usable = (self._param_codes == code) & (now - self._inserted < self.ttl_seconds)
+            scores[~usable] = -np.inf
+            slot = int(scores.argmax())
+            if scores[slot] < self.min_similarity:
+                return None
+
+            self._lru.move_to_end(slot)
+            return self._matches[slot]
+
+    def put(self, vector: np.ndarray, params: Hashable, matches: list[dict]) -> None:
+        """Store the matches of a query, evicting the least recently used entry if full.
+
+        Args:
+            vector: Query embedding
+            params: Search parameters used
+            matches: Search result (callers should treat it as immutable)
+        """
+        unit = self._unit(vector)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != unit.shape[0]:
+                self._matrix = np.zeros((self.max_entries, unit.shape[0]), dtype=np.float32)
+                self._reset()
+
+            if len(self._lru) < self.max_entries:
+                slot = int(np.flatnonzero(self._param_codes == -1)[0])
+            else:
+                slot, _ = self._lru.popitem(last=False)
+
+            self._matrix[slot] = unit
+            self._param_codes[slot] = self._codes.setdefault(params, len(self._codes))
+            self._inserted[slot] = time.monotonic()
+            self._matches[slot] = matches
+            self._lru[slot] = None
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. after speakers were added or deleted)."""
+        with self._lock:
+            self._reset()
+
+    def _reset(self) -> None:
+        """Mark every slot free; the caller holds the lock."""
+        self._param_codes[:] = -1
+        self._matches = [None] * self.max_entries
+        self._codes.clear()
+        self._lru.clear()
+
+    def __len__(self) -> int:
+        return len(self._lru)
@@ -0,0 +1,56 @@
+"""In-process LRU cache for results keyed by audio content hash."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class ResultCache:
+    """Thread-safe, size-bounded LRU cache.
+
+    Used to short-circuit repeated work on identical uploads (e.g. the same
+    meeting sent to /diarize, then /identify, then /transcribe-identified).
+    Keys are built by the callers from the upload hash and the parameters
+    that affect the result.
+    """
+
+    def __init__(self, max_entries: int):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept; least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to store (callers should treat it as immutable)
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
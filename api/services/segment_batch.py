@@ -0,0 +1,63 @@
+"""Columnar (struct-of-arrays) container for diarization segments."""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class SegmentBatch:
+    """Segments stored as parallel float32 arrays instead of one dict per segment.
+
+    Entry ``i`` of every array (and of ``speakers``) describes the ``i``-th
+    segment. Timings are narrowed to float32, which is plenty for
+    millisecond-rounded timestamps and halves memory versus Python floats.
+    Durations are not stored; they are derived from ``ends - starts``.
+    """
+
+    speakers: list[str]
+    starts: np.ndarray
+    ends: np.ndarray
+
+    @classmethod
+    def from_segments(cls, segments: list[dict]) -> "SegmentBatch":
+        """Build a batch from segment dictionaries.
+
+        Args:
+            segments: List of segment dicts with 'speaker', 'start', 'end'
+
+        Returns:
+            SegmentBatch holding the same segments
+        """
+        count = len(segments)
+        return cls(
+            speakers=[seg["speaker"] for seg in segments],
+            starts=np.fromiter((seg["start"] for seg in segments), dtype=np.float32, count=count),
+            ends=np.fromiter((seg["end"] for seg in segments), dtype=np.float32, count=count)
+        )
+
+    def __len__(self) -> int:
+        return len(self.speakers)
+
+    @property
+    def durations(self) -> np.ndarray:
+        """Duration of each segment in seconds."""
+        return self.ends - self.starts
+
+    def to_columnar(self, include_durations: bool = False) -> dict:
+        """Get the batch as a dict of columns, ready for orjson numpy serialization.
+
+        Args:
+            include_durations: Also emit a 'durations' column (derivable client-side)
+
+        Returns:
+            Dict mapping column names to lists/arrays
+        """
+        columns = {
+            "speakers": self.speakers,
+            "starts": self.starts,
+            "ends": self.ends
+        }
+        if include_durations:
+            columns["durations"] = np.round(self.durations, 3)
+        return columns
@@ -1,21 +1,102 @@
 """Speaker database service using Qdrant for vector storage."""
 
+import asyncio
 import logging
+import threading
+import time
 import uuid
-from datetime import datetime
-from typing import Optional
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Union
 
+import grpc
 import numpy as np
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http import models as qdrant_models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
 from config import Settings
+from .query_cache import QueryCache
 
 
 logger = logging.getLogger(__name__)
 
 
+# Points per upsert request when writing concurrently through the async client
+UPSERT_CHUNK_SIZE = 64
+
+# Payload fields needed to describe a speaker; listing and lookups fetch only
+# these (and never vectors) instead of the whole payload
+SPEAKER_PAYLOAD_FIELDS = ["speaker_id", "speaker_name", "created_at"]
+
+# Keyword payload indexes used by speaker filters and facets
+PAYLOAD_INDEX_FIELDS = ("speaker_name", "speaker_id")
+
+# int8 copies of the vectors kept in RAM: 4x smaller, SIMD-friendly search
+QUANTIZATION_CONFIG = qdrant_models.ScalarQuantization(
+    scalar=qdrant_models.ScalarQuantizationConfig(
+        type=qdrant_models.ScalarType.INT8,
+        quantile=0.99,
+        always_ram=True
+    )
+)
+
+# Searches run on the int8 quantized vectors, then rescore the oversampled
+# candidates with the original float32 vectors to keep recall
+SEARCH_PARAMS = qdrant_models.SearchParams(
+    quantization=qdrant_models.QuantizationSearchParams(
+        rescore=True,
+        oversampling=2.0
+    )
+)
+
+
+def _to_epoch(created_at: Optional[Union[int, str]]) -> Optional[int]:
+    """Normalize a stored created_at payload value to Unix epoch seconds.
+    
+    Points written before timestamps were stored as integers hold a naive
+    UTC ISO string.
+    """
+    if created_at is None or isinstance(created_at, int):
+        return created_at
+    parsed = datetime.fromisoformat(created_at)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _to_vector(embedding: np.ndarray) -> list[float]:
+    """Convert an embedding of any shape to the flat float list Qdrant expects.
+    
+    ``ravel`` returns a view for contiguous arrays, so unlike ``flatten`` no
+    intermediate copy is made before ``tolist``. A list is passed on rather
+    than the array itself: qdrant-client's models validate ndarrays element
+    by element, which is far slower than one ``tolist`` call.
+    """
+    return np.ravel(embedding).tolist()
+
+
+def _new_point_id() -> str:
+    """Generate a random point id.
+    
+    Qdrant accepts UUIDs in their 32-digit hex form, which skips the dashed
+    formatting of ``str(uuid)`` for every point of a batch. Speaker ids keep
+    the dashed form since they are returned to API clients.
+    """
+    return uuid.uuid4().hex
+
+
+def _to_matrix(embeddings: list[np.ndarray]) -> np.ndarray:
+    """Stack embeddings of any shape into one contiguous (N, D) float32 array.
+    
+    Gives a batch a single buffer to hand to ``upload_collection`` or to
+    convert with one ``tolist`` call, and fails early if the dimensions differ.
+    """
+    return np.ascontiguousarray(
+        np.stack([np.ravel(embedding) for embedding in embeddings]), dtype=np.float32
+    )
+
+
 class SpeakerDBService:
     """Service for managing speaker embeddings in Qdrant vector database."""
     
@@ -27,6 +108,18 @@ class SpeakerDBService:
         """
         self.settings = settings
         self.client: Optional[QdrantClient] = None
+        self.async_client: Optional[AsyncQdrantClient] = None
+        self._bulk_lock = threading.Lock()
+        # speaker_id -> {"speaker_name", "created_at"}, filled by listings and lookups
+        self._speaker_info: dict[str, dict] = {}
+        self.query_cache: Optional[QueryCache] = (
+            QueryCache(
+                settings.query_cache_size,
+                min_similarity=settings.query_cache_similarity,
+                ttl_seconds=settings.query_cache_ttl
+            )
+            if settings.query_cache_size > 0 else None
+        )
         self._initialized = False
         
     def initialize(self) -> None:
@@ -34,14 +127,27 @@ class SpeakerDBService:
         if self._initialized:
             return
             
-        logger.info(f"Connecting to Qdrant at {self.settings.qdrant_host}:{self.settings.qdrant_port}")
+        transport = "gRPC" if self.settings.qdrant_prefer_grpc else "REST"
+        port = self.settings.qdrant_grpc_port if self.settings.qdrant_prefer_grpc else self.settings.qdrant_port
+        logger.info(f"Connecting to Qdrant at {self.settings.qdrant_host}:{port} over {transport}")
+        
+        # gRPC sends vectors as packed protobuf floats instead of JSON
+        # number lists, which is most of the request size for searches
+        client_kwargs = {
+            "host": self.settings.qdrant_host,
+            "port": self.settings.qdrant_port,
+            "grpc_port": self.settings.qdrant_grpc_port,
+            "prefer_grpc": self.settings.qdrant_prefer_grpc,
+            "pool_size": self.settings.qdrant_pool_size,
+            "timeout": 30
+        }
         
         try:
-            self.client = QdrantClient(
-                host=self.settings.qdrant_host,
-                port=self.settings.qdrant_port,
-                timeout=30
-            )
+            self.client = QdrantClient(**client_kwargs)
+            
+            # Async client for the endpoint hot paths, so Qdrant round-trips
+            # don't hold the event loop
+            self.async_client = AsyncQdrantClient(**client_kwargs)
             
             # Check if collection exists, create if not
             self._ensure_collection_exists()
@@ -69,30 +175,50 @@ class SpeakerDBService:
                     vectors_config=qdrant_models.VectorParams(
                         size=self.settings.embedding_dimension,
                         distance=qdrant_models.Distance.COSINE
-                    )
+                    ),
+                    quantization_config=QUANTIZATION_CONFIG
                 )
                 
                 # Create payload index for efficient filtering
-                self.client.create_payload_index(
-                    collection_name=collection_name,
-                    field_name="speaker_name",
-                    field_schema=qdrant_models.PayloadSchemaType.KEYWORD
-                )
-                
-                self.client.create_payload_index(
-                    collection_name=collection_name,
-                    field_name="speaker_id",
-                    field_schema=qdrant_models.PayloadSchemaType.KEYWORD
-                )
+                self._ensure_payload_indexes(existing_indexes=set())
                 
                 logger.info(f"Collection {collection_name} created successfully")
             else:
                 logger.info(f"Collection {collection_name} already exists")
                 
+                # Collections created by older versions may lack some indexes
+                info = self.client.get_collection(collection_name)
+                self._ensure_payload_indexes(existing_indexes=set(info.payload_schema or {}))
+                
+                # ...or quantization; Qdrant builds the int8 copies in the background
+                if info.config.quantization_config is None:
+                    logger.info(f"Enabling int8 scalar quantization on {collection_name}")
+                    self.client.update_collection(
+                        collection_name=collection_name,
+                        quantization_config=QUANTIZATION_CONFIG
+                    )
+                
         except Exception as e:
             logger.error(f"Failed to ensure collection exists: {e}")
             raise
     
+    def _ensure_payload_indexes(self, existing_indexes: set[str]) -> None:
+        """Create the keyword payload indexes that are not there yet.
+        
+        Args:
+            existing_indexes: Names of payload fields already indexed
+        """
+        for field_name in PAYLOAD_INDEX_FIELDS:
+            if field_name in existing_indexes:
+                continue
+            
+            logger.info(f"Creating payload index on {field_name}")
+            self.client.create_payload_index(
+                collection_name=self.settings.collection_name,
+                field_name=field_name,
+                field_schema=qdrant_models.PayloadSchemaType.KEYWORD
+            )
+    
     @property
     def is_initialized(self) -> bool:
         """Check if the service is initialized."""
@@ -132,41 +258,43 @@ class SpeakerDBService:
         if not self._initialized:
             self.initialize()
         
-        # Generate IDs
-        point_id = str(uuid.uuid4())
         if speaker_id is None:
             speaker_id = str(uuid.uuid4())
         
-        # Build payload
-        payload = {
-            "speaker_name": speaker_name,
-            "speaker_id": speaker_id,
-            "created_at": datetime.utcnow().isoformat(),
-            "audio_source": audio_source or "unknown"
-        }
-        
-        if metadata:
-            payload["metadata"] = metadata
-        
-        # Flatten embedding if needed
-        vector = embedding.flatten().tolist()
-        
         # Add point to collection
         self.client.upsert(
             collection_name=self.settings.collection_name,
-            points=[
-                qdrant_models.PointStruct(
-                    id=point_id,
-                    vector=vector,
-                    payload=payload
-                )
-            ]
+            points=[self._speaker_point(speaker_name, embedding, speaker_id, audio_source, metadata)]
         )
         
-        logger.info(f"Added embedding for speaker '{speaker_name}' (id: {speaker_id})")
-        
+        self._speaker_added(speaker_name, speaker_id)
         return speaker_id
     
+    def _speaker_point(
+        self,
+        speaker_name: str,
+        embedding: np.ndarray,
+        speaker_id: str,
+        audio_source: Optional[str],
+        metadata: Optional[dict]
+    ) -> qdrant_models.PointStruct:
+        """Build the Qdrant point of a single speaker embedding."""
+        payload = self._point_payload(speaker_name, speaker_id, audio_source)
+        if metadata:
+            payload["metadata"] = metadata
+        
+        return qdrant_models.PointStruct(
+            id=_new_point_id(),
+            vector=_to_vector(embedding),
+            payload=payload
+        )
+    
+    def _speaker_added(self, speaker_name: str, speaker_id: str) -> None:
+        """Drop cached searches and speaker info after an embedding was added."""
+        self._invalidate_query_cache()
+        self._speaker_info.pop(speaker_id, None)
+        logger.info(f"Added embedding for speaker '{speaker_name}' (id: {speaker_id})")
+    
     def add_speaker_embeddings_batch(
         self,
         speaker_name: str,
@@ -191,37 +319,111 @@ class SpeakerDBService:
         if speaker_id is None:
             speaker_id = str(uuid.uuid4())
         
-        points = []
-        for embedding in embeddings:
-            point_id = str(uuid.uuid4())
-            
-            payload = {
-                "speaker_name": speaker_name,
-                "speaker_id": speaker_id,
-                "created_at": datetime.utcnow().isoformat(),
-                "audio_source": audio_source or "unknown"
-            }
-            
-            vector = embedding.flatten().tolist()
-            
-            points.append(
-                qdrant_models.PointStruct(
-                    id=point_id,
-                    vector=vector,
-                    payload=payload
-                )
+        if len(embeddings) > self.settings.bulk_upload_threshold:
+            self.upload_embeddings_parallel(
+                embeddings, self._point_payload(speaker_name, speaker_id, audio_source)
+            )
+        else:
+            # Batch upsert
+            self.client.upsert(
+                collection_name=self.settings.collection_name,
+                points=self._build_points(speaker_name, embeddings, speaker_id, audio_source)
             )
         
-        # Batch upsert
-        self.client.upsert(
-            collection_name=self.settings.collection_name,
-            points=points
-        )
-        
+        self._invalidate_query_cache()
+        self._speaker_info.pop(speaker_id, None)
         logger.info(f"Added {len(embeddings)} embeddings for speaker '{speaker_name}' (id: {speaker_id})")
         
         return speaker_id
     
+    def upload_embeddings_parallel(self, embeddings: list[np.ndarray], payload: dict) -> None:
+        """Bulk-load embeddings with parallel upload workers.
+        
+        The embeddings go to ``upload_collection`` as one float32 matrix,
+        which the client slices into batches itself, so no per-point
+        PointStruct or Python float list is built. HNSW indexing is paused
+        (indexing_threshold=0) for the duration of the load and restored
+        afterwards, to the collection's previous threshold or, when Qdrant
+        reports none or 0, to ``settings.indexing_threshold``. A 0 is never
+        written back: it is what a load that died before its restore, or
+        one running in another worker process (the lock only covers this
+        one), leaves behind, and restoring it would keep indexing off.
+        
+        Parallel workers are started with forkserver: forking this process
+        would copy its CUDA context, gRPC channels and event loop into the
+        children.
+        
+        Args:
+            embeddings: Embedding vectors to upload
+            payload: Payload stored with every point
+        """
+        collection_name = self.settings.collection_name
+        vectors = _to_matrix(embeddings)
+        
+        with self._bulk_lock:
+            info = self.client.get_collection(collection_name)
+            indexing_threshold = info.config.optimizer_config.indexing_threshold
+            if not indexing_threshold:
+                indexing_threshold = self.settings.indexing_threshold
+            
+            self.client.update_collection(
+                collection_name=collection_name,
+                optimizers_config=qdrant_models.OptimizersConfigDiff(indexing_threshold=0)
+            )
+            try:
+                # wait=True so the points are searchable (and counted) when this returns
+                self.client.upload_collection(
+                    collection_name=collection_name,
+                    vectors=vectors,
+                    payload=[payload] * len(vectors),
+                    ids=[_new_point_id() for _ in range(len(vectors))],
+                    batch_size=self.settings.bulk_upload_batch_size,
+                    parallel=self.settings.bulk_upload_parallel,
+                    method="forkserver",
+                    wait=True
+                )
+            finally:
+                self.client.update_collection(
+                    collection_name=collection_name,
+                    optimizers_config=qdrant_models.OptimizersConfigDiff(
+                        indexing_threshold=indexing_threshold
+                    )
+                )
+        
+        logger.info(f"Bulk-uploaded {len(vectors)} points")
+    
+    def _build_points(
+        self,
+        speaker_name: str,
+        embeddings: list[np.ndarray],
+        speaker_id: str,
+        audio_source: Optional[str]
+    ) -> list[qdrant_models.PointStruct]:
+        """Build one Qdrant point per embedding for a speaker."""
+        payload = self._point_payload(speaker_name, speaker_id, audio_source)
+        return [
+            qdrant_models.PointStruct(
+                id=_new_point_id(),
+                vector=vector,
+                payload=payload
+            )
+            for vector in _to_matrix(embeddings).tolist()
+        ]
+    
+    @staticmethod
+    def _point_payload(speaker_name: str, speaker_id: str, audio_source: Optional[str]) -> dict:
+        """Payload shared by every point of a batch.
+        
+        Built once per batch, so every point gets the same created_at and the
+        clock is read once instead of per embedding.
+        """
+        return {
+            "speaker_name": speaker_name,
+            "speaker_id": speaker_id,
+            "created_at": int(time.time()),
+            "audio_source": audio_source or "unknown"
+        }
+    
     def search_similar_speakers(
         self,
         embedding: np.ndarray,
@@ -241,31 +443,41 @@ class SpeakerDBService:
         if not self._initialized:
             self.initialize()
         
-        vector = embedding.flatten().tolist()
-        
         threshold = score_threshold or self.settings.similarity_threshold
         
+        if self.query_cache is not None:
+            cached = self.query_cache.get(embedding, (top_k, threshold))
+            if cached is not None:
+                return [match.copy() for match in cached]
+        
+        vector = _to_vector(embedding)
+        
         # Use query_points (new API) instead of search
         results = self.client.query_points(
             collection_name=self.settings.collection_name,
             query=vector,
             limit=top_k,
             score_threshold=threshold,
-            with_payload=True
+            with_payload=True,
+            search_params=SEARCH_PARAMS
         )
         
-        matches = []
-        for point in results.points:
-            matches.append({
-                "speaker_name": point.payload.get("speaker_name", "unknown"),
-                "speaker_id": point.payload.get("speaker_id"),
-                "score": point.score,
-                "audio_source": point.payload.get("audio_source"),
-                "created_at": point.payload.get("created_at")
-            })
-        
+        matches = [self._point_to_match(point) for point in results.points]
+        if self.query_cache is not None:
+            self.query_cache.put(embedding, (top_k, threshold), [match.copy() for match in matches])
         return matches
     
+    @staticmethod
+    def _point_to_match(point: qdrant_models.ScoredPoint) -> dict:
+        """Convert a scored Qdrant point into a match dictionary."""
+        return {
+            "speaker_name": point.payload.get("speaker_name", "unknown"),
+            "speaker_id": point.payload.get("speaker_id"),
+            "score": point.score,
+            "audio_source": point.payload.get("audio_source"),
+            "created_at": _to_epoch(point.payload.get("created_at"))
+        }
+    
     def identify_speaker(
         self,
         embedding: np.ndarray,
@@ -298,7 +510,8 @@ class SpeakerDBService:
         """Identify a speaker using multiple embeddings with voting.
         
         This aggregates results from multiple embeddings to make
-        a more robust identification.
+        a more robust identification. Embeddings are searched in at most two
+        ``query_batch_points`` round trips (see ``identify_speakers_batch``).
         
         Args:
             embeddings: List of speaker embedding vectors
@@ -310,17 +523,227 @@ class SpeakerDBService:
         if not embeddings:
             return None
         
+        return self.identify_speakers_batch({None: embeddings}, score_threshold)[None]
+    
+    def identify_speakers_batch(
+        self,
+        embeddings_per_speaker: dict[str, list[np.ndarray]],
+        score_threshold: Optional[float] = None,
+        top_k: int = 3
+    ) -> dict[str, Optional[dict]]:
+        """Identify several diarized speakers with batched Qdrant queries.
+        
+        The first ``voting_early_exit_chunk`` embeddings of every speaker are
+        sent in one ``query_batch_points`` request. The remaining embeddings
+        are sent in a second batch, and only for speakers whose leading
+        candidate is not yet clearly ahead. Voting then runs per speaker
+        exactly as in ``identify_speaker_by_voting``.
+        
+        Args:
+            embeddings_per_speaker: Dict mapping speaker labels to their embedding vectors
+            score_threshold: Minimum similarity score for a match
+            top_k: Number of neighbours fetched per embedding
+            
+        Returns:
+            Dict mapping each speaker label to its best match (or None)
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        threshold = score_threshold or self.settings.similarity_threshold
+        embeddings = [embedding for group in embeddings_per_speaker.values() for embedding in group]
+        matches, misses = self._cached_matches(embeddings, threshold, top_k)
+        first, deferred = self._split_early_exit(embeddings_per_speaker, misses)
+        
+        self._query_matches(matches, first, embeddings, threshold, top_k)
+        if deferred:
+            pending = self._undecided(embeddings_per_speaker, matches, deferred)
+            self._query_matches(matches, pending, embeddings, threshold, top_k)
+        
+        return self._vote_batch(embeddings_per_speaker, matches)
+    
+    def _query_matches(
+        self,
+        matches: list[Optional[list[dict]]],
+        indices: list[int],
+        embeddings: list[np.ndarray],
+        threshold: float,
+        top_k: int
+    ) -> None:
+        """Search the given embeddings in one batched query and fill their matches."""
+        if not indices:
+            return
+        
+        responses = self.client.query_batch_points(
+            collection_name=self.settings.collection_name,
+            requests=self._build_batch_requests([embeddings[i] for i in indices], threshold, top_k)
+        )
+        self._store_matches(matches, indices, embeddings, responses, threshold, top_k)
+    
+    def _split_early_exit(
+        self,
+        embeddings_per_speaker: dict[str, list[np.ndarray]],
+        misses: list[int]
+    ) -> tuple[list[int], list[int]]:
+        """Split uncached embeddings into the first search round and the deferred rest.
+        
+        Only the first ``voting_early_exit_chunk`` embeddings of each speaker
+        are searched up front; the rest are searched only for speakers the
+        first round left undecided (see ``_undecided``).
+        
+        Returns:
+            Tuple of (indices searched now, indices deferred)
+        """
+        chunk = self.settings.voting_early_exit_chunk
+        if chunk <= 0:
+            return misses, []
+        
+        # Position of every flattened embedding within its speaker's list
+        positions = [position for group in embeddings_per_speaker.values() for position in range(len(group))]
+        first = [i for i in misses if positions[i] < chunk]
+        deferred = [i for i in misses if positions[i] >= chunk]
+        return first, deferred
+    
+    def _undecided(
+        self,
+        embeddings_per_speaker: dict[str, list[np.ndarray]],
+        matches: list[Optional[list[dict]]],
+        deferred: list[int]
+    ) -> list[int]:
+        """Keep the deferred embeddings of speakers whose vote is not clear yet.
+        
+        A speaker is decided when its leading candidate averages at least
+        ``voting_early_exit_score`` over the matches found so far and leads
+        the runner-up by ``voting_early_exit_margin``.
+        """
+        pending = []
+        deferred_set = set(deferred)
+        offset = 0
+        for embeddings in embeddings_per_speaker.values():
+            indices = range(offset, offset + len(embeddings))
+            offset += len(embeddings)
+            
+            speaker_deferred = [i for i in indices if i in deferred_set]
+            if not speaker_deferred:
+                continue
+            
+            found = [matches[i] for i in indices if matches[i] is not None]
+            if not self._is_clear_vote(found):
+                pending.extend(speaker_deferred)
+        
+        return pending
+    
+    def _is_clear_vote(self, matches_per_embedding: list[list[dict]]) -> bool:
+        """Check whether the leading candidate is confidently ahead of the runner-up."""
+        speaker_scores = {}
+        for matches in matches_per_embedding:
+            for match in matches:
+                speaker_scores.setdefault(match["speaker_id"], []).append(match["score"])
+        
+        averages = sorted((sum(scores) / len(scores) for scores in speaker_scores.values()), reverse=True)
+        if not averages:
+            return False
+        
+        runner_up = averages[1] if len(averages) > 1 else 0.0
+        return (
+            averages[0] >= self.settings.voting_early_exit_score
+            and averages[0] - runner_up >= self.settings.voting_early_exit_margin
+        )
+    
+    def _build_batch_requests(
+        self,
+        embeddings: list[np.ndarray],
+        threshold: float,
+        top_k: int
+    ) -> list[qdrant_models.QueryRequest]:
+        """Build one batch query request per embedding, in order."""
+        return [
+            qdrant_models.QueryRequest(
+                query=_to_vector(embedding),
+                limit=top_k,
+                score_threshold=threshold,
+                with_payload=True,
+                params=SEARCH_PARAMS
+            )
+            for embedding in embeddings
+        ]
+    
+    def _cached_matches(
+        self,
+        embeddings: list[np.ndarray],
+        threshold: float,
+        top_k: int
+    ) -> tuple[list[Optional[list[dict]]], list[int]]:
+        """Look embeddings up in the query cache.
+        
+        Returns:
+            Tuple of (matches per embedding, None where not cached; indices of the misses)
+        """
+        if self.query_cache is None:
+            return [None] * len(embeddings), list(range(len(embeddings)))
+        
+        matches = [self.query_cache.get(embedding, (top_k, threshold)) for embedding in embeddings]
+        misses = [i for i, cached in enumerate(matches) if cached is None]
+        return matches, misses
+    
+    def _store_matches(
+        self,
+        matches: list[Optional[list[dict]]],
+        misses: list[int],
+        embeddings: list[np.ndarray],
+        responses: list[qdrant_models.QueryResponse],
+        threshold: float,
+        top_k: int
+    ) -> None:
+        """Fill the missed slots from batch responses (in miss order) and cache them."""
+        for i, response in zip(misses, responses):
+            matches[i] = [self._point_to_match(point) for point in response.points]
+            if self.query_cache is not None:
+                self.query_cache.put(embeddings[i], (top_k, threshold), matches[i])
+    
+    def _vote_batch(
+        self,
+        embeddings_per_speaker: dict[str, list[np.ndarray]],
+        matches: list[list[dict]]
+    ) -> dict[str, Optional[dict]]:
+        """Slice per-embedding matches (in request order) per speaker and vote on each.
+        
+        Embeddings skipped by an early exit have no matches (None) and don't vote.
+        """
+        results = {}
+        offset = 0
+        for speaker, embeddings in embeddings_per_speaker.items():
+            speaker_matches = [m for m in matches[offset:offset + len(embeddings)] if m is not None]
+            offset += len(embeddings)
+            
+            if not speaker_matches:
+                results[speaker] = None
+                continue
+            
+            results[speaker] = self._vote(speaker_matches)
+        
+        return results
+    
+    def _invalidate_query_cache(self) -> None:
+        """Drop cached search results after the collection changed."""
+        if self.query_cache is not None:
+            self.query_cache.clear()
+    
+    @staticmethod
+    def _vote(matches_per_embedding: Iterable[list[dict]]) -> Optional[dict]:
+        """Pick the speaker with the best average score across embeddings.
+        
+        Args:
+            matches_per_embedding: Search matches for each query embedding
+            
+        Returns:
+            Best matching speaker info with aggregated confidence, or None
+        """
         # Collect all matches
         speaker_scores = {}  # speaker_id -> list of scores
         speaker_info = {}    # speaker_id -> speaker info
         
-        for embedding in embeddings:
-            matches = self.search_similar_speakers(
-                embedding,
-                top_k=3,
-                score_threshold=score_threshold
-            )
-            
+        for matches in matches_per_embedding:
             for match in matches:
                 speaker_id = match["speaker_id"]
                 
@@ -354,47 +777,140 @@ class SpeakerDBService:
     def get_all_speakers(self) -> list[dict]:
         """Get list of all registered speakers.
         
+        Embedding counts come from an exact facet over the speaker_id
+        payload index, so no points are transferred for them. Names and
+        creation times are fetched once per speaker (one grouped query for
+        all unseen speakers) and cached. Falls back to scrolling every point
+        if the server can't facet.
+        
         Returns:
             List of speaker info dictionaries
         """
         if not self._initialized:
             self.initialize()
         
-        # Get all unique speaker_ids and their info
-        speakers = {}
+        collection_name = self.settings.collection_name
+        try:
+            total = self.client.count(collection_name=collection_name, exact=True).count
+            if total == 0:
+                return []
+            
+            facet = self.client.facet(
+                collection_name=collection_name,
+                key="speaker_id",
+                limit=total,
+                exact=True
+            )
+            missing = [hit.value for hit in facet.hits if hit.value not in self._speaker_info]
+            if missing:
+                groups = self.client.query_points_groups(
+                    collection_name=collection_name,
+                    group_by="speaker_id",
+                    group_size=1,
+                    limit=len(missing),
+                    query_filter=self._speakers_filter(missing),
+                    with_payload=SPEAKER_PAYLOAD_FIELDS
+                )
+                self._cache_speaker_info(groups.groups)
+        except (UnexpectedResponse, grpc.RpcError) as e:
+            logger.warning(f"Facet listing unavailable, scrolling all points: {e}")
+            return self._scroll_all_speakers()
+        
+        return self._speakers_from_facet(facet.hits)
+    
+    def _scroll_all_speakers(self) -> list[dict]:
+        """List speakers by scrolling every point (servers without facet support)."""
+        # Embedding counts and first-seen info per speaker_id
+        counts = Counter()
+        info = {}
         
         # Scroll through all points
         offset = None
         while True:
             results, offset = self.client.scroll(
                 collection_name=self.settings.collection_name,
-                limit=100,
+                limit=self.settings.scroll_batch_size,
                 offset=offset,
-                with_payload=True,
+                with_payload=SPEAKER_PAYLOAD_FIELDS,
                 with_vectors=False
             )
             
-            for point in results:
-                speaker_id = point.payload.get("speaker_id")
-                if speaker_id and speaker_id not in speakers:
-                    speakers[speaker_id] = {
-                        "speaker_id": speaker_id,
-                        "speaker_name": point.payload.get("speaker_name", "unknown"),
-                        "embeddings_count": 0,
-                        "created_at": point.payload.get("created_at")
-                    }
-                
-                if speaker_id:
-                    speakers[speaker_id]["embeddings_count"] += 1
+            self._accumulate_speakers(results, counts, info)
             
             if offset is None:
                 break
         
-        return list(speakers.values())
+        return self._speakers_from_counts(counts, info)
+    
+    @staticmethod
+    def _accumulate_speakers(
+        points: list[qdrant_models.Record],
+        counts: Counter,
+        info: dict[str, dict]
+    ) -> None:
+        """Fold a page of scrolled points into per-speaker counts and payloads.
+        
+        Only the first payload seen per speaker is kept; it is converted into
+        a speaker dict once, in ``_speakers_from_counts``.
+        """
+        payloads = [point.payload for point in points]
+        counts.update(payload.get("speaker_id") for payload in payloads)
+        for payload in payloads:
+            info.setdefault(payload.get("speaker_id"), payload)
+    
+    def _cache_speaker_info(self, groups: list[qdrant_models.PointGroup]) -> None:
+        """Remember name and creation time of speakers from a grouped query."""
+        for group in groups:
+            self._store_speaker_info(group.id, group.hits[0].payload)
+    
+    def _store_speaker_info(self, speaker_id: str, payload: dict) -> dict:
+        """Cache and return the name and creation time from a speaker's point payload."""
+        info = {
+            "speaker_name": payload.get("speaker_name", "unknown"),
+            "created_at": _to_epoch(payload.get("created_at"))
+        }
+        self._speaker_info[speaker_id] = info
+        return info
+    
+    def _speakers_from_facet(self, hits: list[qdrant_models.FacetValueHit]) -> list[dict]:
+        """Build speaker info dictionaries from facet counts and cached speaker info."""
+        return [
+            self._speaker_dict(hit.value, self._speaker_info[hit.value], hit.count)
+            for hit in hits
+            if hit.value in self._speaker_info
+        ]
+    
+    @staticmethod
+    def _speaker_dict(speaker_id: str, info: dict, embeddings_count: int) -> dict:
+        """Build the speaker info dictionary returned by listings and lookups."""
+        return {
+            "speaker_id": speaker_id,
+            "speaker_name": info["speaker_name"],
+            "embeddings_count": embeddings_count,
+            "created_at": info["created_at"]
+        }
+    
+    @staticmethod
+    def _speakers_from_counts(counts: Counter, info: dict[str, dict]) -> list[dict]:
+        """Build speaker info dictionaries, in first-seen order, from scroll aggregates."""
+        return [
+            {
+                "speaker_id": speaker_id,
+                "speaker_name": payload.get("speaker_name", "unknown"),
+                "embeddings_count": counts[speaker_id],
+                "created_at": _to_epoch(payload.get("created_at"))
+            }
+            for speaker_id, payload in info.items()
+            if speaker_id
+        ]
     
     def get_speaker_by_id(self, speaker_id: str) -> Optional[dict]:
         """Get speaker info by ID.
         
+        Counts the speaker's points first; the name and creation time are
+        only scrolled for when they are not cached yet, so repeated lookups
+        cost a single round trip.
+        
         Args:
             speaker_id: Speaker ID to look up
             
@@ -404,44 +920,66 @@ class SpeakerDBService:
         if not self._initialized:
             self.initialize()
         
-        # Search for points with this speaker_id
-        results, _ = self.client.scroll(
+        count = self.client.count(
             collection_name=self.settings.collection_name,
-            scroll_filter=qdrant_models.Filter(
-                must=[
-                    qdrant_models.FieldCondition(
-                        key="speaker_id",
-                        match=qdrant_models.MatchValue(value=speaker_id)
-                    )
-                ]
-            ),
-            limit=1,
-            with_payload=True,
-            with_vectors=False
-        )
+            count_filter=self._speaker_filter(speaker_id)
+        ).count
+        if not count:
+            self._speaker_info.pop(speaker_id, None)
+            return None
         
-        if results:
-            # Count total embeddings for this speaker
-            count_result = self.client.count(
+        info = self._speaker_info.get(speaker_id)
+        if info is None:
+            results, _ = self.client.scroll(
                 collection_name=self.settings.collection_name,
-                count_filter=qdrant_models.Filter(
-                    must=[
-                        qdrant_models.FieldCondition(
-                            key="speaker_id",
-                            match=qdrant_models.MatchValue(value=speaker_id)
-                        )
-                    ]
-                )
+                scroll_filter=self._speaker_filter(speaker_id),
+                limit=1,
+                with_payload=SPEAKER_PAYLOAD_FIELDS,
+                with_vectors=False
             )
-            
-            return {
-                "speaker_id": speaker_id,
-                "speaker_name": results[0].payload.get("speaker_name", "unknown"),
-                "embeddings_count": count_result.count,
-                "created_at": results[0].payload.get("created_at")
-            }
+            if not results:
+                return None
+            info = self._store_speaker_info(speaker_id, results[0].payload)
         
-        return None
+        return self._speaker_dict(speaker_id, info, count)
+    
+    def get_total_embeddings(self) -> int:
+        """Get the (approximate) number of stored embeddings across all speakers.
+        
+        Returns:
+            Point count of the collection, estimated by Qdrant without a scan
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        return self.client.count(
+            collection_name=self.settings.collection_name,
+            exact=False
+        ).count
+    
+    @staticmethod
+    def _speaker_filter(speaker_id: str) -> qdrant_models.Filter:
+        """Filter matching every point of one speaker."""
+        return qdrant_models.Filter(
+            must=[
+                qdrant_models.FieldCondition(
+                    key="speaker_id",
+                    match=qdrant_models.MatchValue(value=speaker_id)
+                )
+            ]
+        )
+    
+    @staticmethod
+    def _speakers_filter(speaker_ids: list[str]) -> qdrant_models.Filter:
+        """Filter matching every point of any of the given speakers."""
+        return qdrant_models.Filter(
+            must=[
+                qdrant_models.FieldCondition(
+                    key="speaker_id",
+                    match=qdrant_models.MatchAny(any=speaker_ids)
+                )
+            ]
+        )
     
     def delete_speaker(self, speaker_id: str) -> bool:
         """Delete a speaker and all their embeddings.
@@ -464,21 +1002,349 @@ class SpeakerDBService:
         self.client.delete(
             collection_name=self.settings.collection_name,
             points_selector=qdrant_models.FilterSelector(
-                filter=qdrant_models.Filter(
-                    must=[
-                        qdrant_models.FieldCondition(
-                            key="speaker_id",
-                            match=qdrant_models.MatchValue(value=speaker_id)
-                        )
-                    ]
-                )
+                filter=self._speaker_filter(speaker_id)
+            )
+        )
+        
+        self._invalidate_query_cache()
+        self._speaker_info.pop(speaker_id, None)
+        logger.info(f"Deleted speaker: {speaker['speaker_name']} (id: {speaker_id})")
+        
+        return True
+    
+    # ============== Async API ==============
+    
+    async def aadd_speaker_embedding(
+        self,
+        speaker_name: str,
+        embedding: np.ndarray,
+        speaker_id: Optional[str] = None,
+        audio_source: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ) -> str:
+        """Async variant of ``add_speaker_embedding``.
+        
+        Args:
+            speaker_name: Name/identifier for the speaker
+            embedding: Embedding vector as numpy array
+            speaker_id: Optional existing speaker ID (for adding more embeddings)
+            audio_source: Optional source file name
+            metadata: Optional additional metadata
+            
+        Returns:
+            Speaker ID the embedding was added to
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        if speaker_id is None:
+            speaker_id = str(uuid.uuid4())
+        
+        await self.async_client.upsert(
+            collection_name=self.settings.collection_name,
+            points=[self._speaker_point(speaker_name, embedding, speaker_id, audio_source, metadata)]
+        )
+        
+        self._speaker_added(speaker_name, speaker_id)
+        return speaker_id
+    
+    async def adelete_speaker(self, speaker_id: str) -> bool:
+        """Async variant of ``delete_speaker``.
+        
+        Args:
+            speaker_id: Speaker ID to delete
+            
+        Returns:
+            True if deleted, False if not found
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        speaker = await self.aget_speaker_by_id(speaker_id)
+        if not speaker:
+            return False
+        
+        await self.async_client.delete(
+            collection_name=self.settings.collection_name,
+            points_selector=qdrant_models.FilterSelector(
+                filter=self._speaker_filter(speaker_id)
             )
         )
         
+        self._invalidate_query_cache()
+        self._speaker_info.pop(speaker_id, None)
         logger.info(f"Deleted speaker: {speaker['speaker_name']} (id: {speaker_id})")
         
         return True
     
+    async def aadd_speaker_embeddings_batch(
+        self,
+        speaker_name: str,
+        embeddings: list[np.ndarray],
+        speaker_id: Optional[str] = None,
+        audio_source: Optional[str] = None
+    ) -> str:
+        """Async variant of ``add_speaker_embeddings_batch``.
+        
+        Points are split into UPSERT_CHUNK_SIZE chunks that are upserted
+        concurrently; bulk batches go through ``upload_embeddings_parallel``.
+        
+        Args:
+            speaker_name: Name/identifier for the speaker
+            embeddings: List of embedding vectors
+            speaker_id: Optional existing speaker ID
+            audio_source: Optional source file name
+            
+        Returns:
+            Speaker ID for the added embeddings
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        if speaker_id is None:
+            speaker_id = str(uuid.uuid4())
+        
+        if len(embeddings) > self.settings.bulk_upload_threshold:
+            await asyncio.to_thread(
+                self.upload_embeddings_parallel,
+                embeddings,
+                self._point_payload(speaker_name, speaker_id, audio_source)
+            )
+        else:
+            points = self._build_points(speaker_name, embeddings, speaker_id, audio_source)
+            await asyncio.gather(*(
+                self.async_client.upsert(
+                    collection_name=self.settings.collection_name,
+                    points=points[i:i + UPSERT_CHUNK_SIZE]
+                )
+                for i in range(0, len(points), UPSERT_CHUNK_SIZE)
+            ))
+        
+        self._invalidate_query_cache()
+        self._speaker_info.pop(speaker_id, None)
+        logger.info(f"Added {len(embeddings)} embeddings for speaker '{speaker_name}' (id: {speaker_id})")
+        
+        return speaker_id
+    
+    async def aidentify_speaker_by_voting(
+        self,
+        embeddings: list[np.ndarray],
+        score_threshold: Optional[float] = None
+    ) -> Optional[dict]:
+        """Async variant of ``identify_speaker_by_voting``.
+        
+        Args:
+            embeddings: List of speaker embedding vectors
+            score_threshold: Minimum similarity score for a match
+            
+        Returns:
+            Best matching speaker info with aggregated confidence
+        """
+        if not embeddings:
+            return None
+        
+        return (await self.aidentify_speakers_batch({None: embeddings}, score_threshold))[None]
+    
+    async def aidentify_speakers_batch(
+        self,
+        embeddings_per_speaker: dict[str, list[np.ndarray]],
+        score_threshold: Optional[float] = None,
+        top_k: int = 3
+    ) -> dict[str, Optional[dict]]:
+        """Async variant of ``identify_speakers_batch``.
+        
+        Args:
+            embeddings_per_speaker: Dict mapping speaker labels to their embedding vectors
+            score_threshold: Minimum similarity score for a match
+            top_k: Number of neighbours fetched per embedding
+            
+        Returns:
+            Dict mapping each speaker label to its best match (or None)
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        threshold = score_threshold or self.settings.similarity_threshold
+        embeddings = [embedding for group in embeddings_per_speaker.values() for embedding in group]
+        matches, misses = self._cached_matches(embeddings, threshold, top_k)
+        first, deferred = self._split_early_exit(embeddings_per_speaker, misses)
+        
+        await self._aquery_matches(matches, first, embeddings, threshold, top_k)
+        if deferred:
+            pending = self._undecided(embeddings_per_speaker, matches, deferred)
+            await self._aquery_matches(matches, pending, embeddings, threshold, top_k)
+        
+        return self._vote_batch(embeddings_per_speaker, matches)
+    
+    async def _aquery_matches(
+        self,
+        matches: list[Optional[list[dict]]],
+        indices: list[int],
+        embeddings: list[np.ndarray],
+        threshold: float,
+        top_k: int
+    ) -> None:
+        """Async variant of ``_query_matches``."""
+        if not indices:
+            return
+        
+        responses = await self.async_client.query_batch_points(
+            collection_name=self.settings.collection_name,
+            requests=self._build_batch_requests([embeddings[i] for i in indices], threshold, top_k)
+        )
+        self._store_matches(matches, indices, embeddings, responses, threshold, top_k)
+    
+    async def aget_all_speakers(self) -> list[dict]:
+        """Async variant of ``get_all_speakers``.
+        
+        Returns:
+            List of speaker info dictionaries
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        collection_name = self.settings.collection_name
+        try:
+            total = (await self.async_client.count(collection_name=collection_name, exact=True)).count
+            if total == 0:
+                return []
+            
+            facet = await self.async_client.facet(
+                collection_name=collection_name,
+                key="speaker_id",
+                limit=total,
+                exact=True
+            )
+            missing = [hit.value for hit in facet.hits if hit.value not in self._speaker_info]
+            if missing:
+                groups = await self.async_client.query_points_groups(
+                    collection_name=collection_name,
+                    group_by="speaker_id",
+                    group_size=1,
+                    limit=len(missing),
+                    query_filter=self._speakers_filter(missing),
+                    with_payload=SPEAKER_PAYLOAD_FIELDS
+                )
+                self._cache_speaker_info(groups.groups)
+        except (UnexpectedResponse, grpc.RpcError) as e:
+            logger.warning(f"Facet listing unavailable, scrolling all points: {e}")
+            return await self._ascroll_all_speakers()
+        
+        return self._speakers_from_facet(facet.hits)
+    
+    async def _ascroll_all_speakers(self) -> list[dict]:
+        """Async variant of ``_scroll_all_speakers``."""
+        counts = Counter()
+        info = {}
+        
+        offset = None
+        while True:
+            results, offset = await self.async_client.scroll(
+                collection_name=self.settings.collection_name,
+                limit=self.settings.scroll_batch_size,
+                offset=offset,
+                with_payload=SPEAKER_PAYLOAD_FIELDS,
+                with_vectors=False
+            )
+            
+            self._accumulate_speakers(results, counts, info)
+            
+            if offset is None:
+                break
+        
+        return self._speakers_from_counts(counts, info)
+    
+    async def aget_speaker_by_id(self, speaker_id: str) -> Optional[dict]:
+        """Async variant of ``get_speaker_by_id``.
+        
+        On a cache miss the payload lookup runs concurrently with the count.
+        
+        Args:
+            speaker_id: Speaker ID to look up
+            
+        Returns:
+            Speaker info or None if not found
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        count_request = self.async_client.count(
+            collection_name=self.settings.collection_name,
+            count_filter=self._speaker_filter(speaker_id)
+        )
+        
+        info = self._speaker_info.get(speaker_id)
+        if info is not None:
+            count = (await count_request).count
+        else:
+            (results, _), count_result = await asyncio.gather(
+                self.async_client.scroll(
+                    collection_name=self.settings.collection_name,
+                    scroll_filter=self._speaker_filter(speaker_id),
+                    limit=1,
+                    with_payload=SPEAKER_PAYLOAD_FIELDS,
+                    with_vectors=False
+                ),
+                count_request
+            )
+            count = count_result.count
+            if results:
+                info = self._store_speaker_info(speaker_id, results[0].payload)
+        
+        if not count or info is None:
+            self._speaker_info.pop(speaker_id, None)
+            return None
+        
+        return self._speaker_dict(speaker_id, info, count)
+    
+    async def aget_total_embeddings(self) -> int:
+        """Async variant of ``get_total_embeddings``.
+        
+        Returns:
+            Approximate point count of the collection
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        result = await self.async_client.count(
+            collection_name=self.settings.collection_name,
+            exact=False
+        )
+        return result.count
+    
+    async def aget_speaker_count(self) -> int:
+        """Count registered speakers from the speaker_id payload index.
+        
+        Uses an exact facet over the indexed speaker_id field, so no point
+        payloads are transferred. Every speaker has at least one embedding,
+        so an exact point count bounds the number of distinct values and is
+        used as the facet hit limit (an estimate could undershoot it and
+        truncate the facet).
+        
+        Returns:
+            Number of distinct speaker IDs
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        collection_name = self.settings.collection_name
+        total = (await self.async_client.count(collection_name=collection_name, exact=True)).count
+        if total == 0:
+            return 0
+        
+        result = await self.async_client.facet(
+            collection_name=collection_name,
+            key="speaker_id",
+            limit=total,
+            exact=True
+        )
+        return len(result.hits)
+    
+    async def aclose(self) -> None:
+        """Close the async client's connections."""
+        if self.async_client is not None:
+            await self.async_client.close()
+    
     def get_collection_stats(self) -> dict:
         """Get statistics about the speaker embeddings collection.
         
@@ -489,17 +1355,37 @@ class SpeakerDBService:
             self.initialize()
         
         try:
-            info = self.client.get_collection(self.settings.collection_name)
-            
-            return {
-                "collection_name": self.settings.collection_name,
-                "vectors_count": info.vectors_count,
-                "points_count": info.points_count,
-                "status": info.status.name
-            }
+            return self._collection_stats(self.client.get_collection(self.settings.collection_name))
         except Exception as e:
-            logger.error(f"Failed to get collection stats: {e}")
-            return {
-                "collection_name": self.settings.collection_name,
-                "error": str(e)
-            }
+            return self._collection_stats_error(e)
+    
+    async def aget_collection_stats(self) -> dict:
+        """Async variant of ``get_collection_stats``.
+        
+        Returns:
+            Dictionary with collection statistics
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        try:
+            return self._collection_stats(await self.async_client.get_collection(self.settings.collection_name))
+        except Exception as e:
+            return self._collection_stats_error(e)
+    
+    def _collection_stats(self, info: qdrant_models.CollectionInfo) -> dict:
+        """Build the statistics dict of a collection."""
+        return {
+            "collection_name": self.settings.collection_name,
+            "vectors_count": info.vectors_count,
+            "points_count": info.points_count,
+            "status": info.status.name
+        }
+    
+    def _collection_stats_error(self, error: Exception) -> dict:
+        """Build the statistics dict reported when the collection can't be read."""
+        logger.error(f"Failed to get collection stats: {error}")
+        return {
+            "collection_name": self.settings.collection_name,
+            "error": str(error)
+        }
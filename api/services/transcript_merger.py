@@ -1,7 +1,9 @@
 """Transcript merger - aligns Whisper transcription with diarization segments."""
 
 import logging
-from typing import Optional
+from typing import Iterator, Optional
+
+import numpy as np
 
 
 logger = logging.getLogger(__name__)
@@ -32,13 +34,7 @@ class TranscriptMerger:
             Merged result with speaker-attributed segments
         """
         # Get words from Whisper (prefer word-level, fallback to segment-level)
-        words = whisper_result.get("words", [])
-        
-        if not words:
-            # Try to extract from segments
-            for seg in whisper_result.get("segments", []):
-                if "words" in seg:
-                    words.extend(seg["words"])
+        words = self._collect_words(whisper_result)
         
         if not words:
             # Fall back to segment-level alignment
@@ -59,6 +55,7 @@ class TranscriptMerger:
                     "confidence": speaker_confidences.get("SPEAKER_00") if speaker_confidences else None,
                     "start": 0,
                     "end": whisper_result.get("duration", 0),
+                    "duration": round(whisper_result.get("duration", 0), 3),
                     "text": whisper_result.get("text", "")
                 }],
                 "words": words,
@@ -66,98 +63,294 @@ class TranscriptMerger:
                 "duration": whisper_result.get("duration", 0)
             }
         
-        # Assign each word to a speaker
-        word_assignments = self._assign_words_to_speakers(words, diar_segments)
-        
-        # Group consecutive words by speaker into turns
-        speaker_turns = self._group_words_into_turns(word_assignments)
+        # Assign each word to a speaker and group consecutive words into turns
+        speaker_turns = list(self._words_to_turns(words, self._build_diar_index(diar_segments)))
         
         # Apply speaker mapping if provided
-        if speaker_mapping:
-            for turn in speaker_turns:
-                original_speaker = turn["speaker"]
-                turn["identified_as"] = speaker_mapping.get(original_speaker)
-                if speaker_confidences:
-                    turn["confidence"] = speaker_confidences.get(original_speaker)
+        for turn in speaker_turns:
+            self._apply_speaker_mapping(turn, speaker_mapping, speaker_confidences)
         
-        # Build full text
-        full_text = whisper_result.get("text", "")
-        if not full_text:
-            full_text = " ".join(w.get("word", "") for w in words)
+        # Only count turn speakers when diarization didn't report a count
+        if "num_speakers" in diarization_result:
+            num_speakers = diarization_result["num_speakers"]
+        else:
+            num_speakers = len({turn["speaker"] for turn in speaker_turns})
         
         return {
-            "text": full_text,
+            "text": self._full_text(whisper_result, words),
             "segments": speaker_turns,
-            "num_speakers": diarization_result.get("num_speakers", len(set(t["speaker"] for t in speaker_turns))),
+            "num_speakers": num_speakers,
             "duration": whisper_result.get("duration", diarization_result.get("audio_duration", 0)),
             "language": whisper_result.get("language")
         }
     
-    def _assign_words_to_speakers(
+    def iter_merge_transcription_with_diarization(
+        self,
+        whisper_result: dict,
+        diarization_result: dict,
+        speaker_mapping: Optional[dict] = None,
+        speaker_confidences: Optional[dict] = None
+    ) -> Iterator[dict]:
+        """Streaming variant of merge_transcription_with_diarization.
+        
+        Speaker turns are yielded as soon as each one is complete, so callers
+        can start sending them before the whole transcript has been merged.
+        
+        Args:
+            whisper_result: Whisper API response with 'text', 'segments', 'words'
+            diarization_result: Diarization result with 'segments'
+            speaker_mapping: Optional dict mapping speaker labels to names
+            speaker_confidences: Optional dict with confidence scores per speaker
+            
+        Yields:
+            {"segment": {...}} for each speaker turn, then one final
+            {"summary": {...}} with 'text', 'num_speakers', 'duration', 'language'
+        """
+        words = self._collect_words(whisper_result)
+        diar_segments = diarization_result.get("segments", [])
+        
+        if not words or not diar_segments:
+            # Fallbacks produce few segments, so just stream the batch result
+            merged = self.merge_transcription_with_diarization(
+                whisper_result, diarization_result, speaker_mapping, speaker_confidences
+            )
+            for segment in merged["segments"]:
+                yield {"segment": segment}
+            yield {"summary": {
+                "text": merged["text"],
+                "num_speakers": merged["num_speakers"],
+                "duration": merged["duration"],
+                "language": merged.get("language")
+            }}
+            return
+        
+        # Insertion-ordered dict keys as a set of turn speakers
+        speakers: dict[str, None] = {}
+        for turn in self._words_to_turns(words, self._build_diar_index(diar_segments)):
+            self._apply_speaker_mapping(turn, speaker_mapping, speaker_confidences)
+            speakers[turn["speaker"]] = None
+            yield {"segment": turn}
+        
+        yield {"summary": {
+            "text": self._full_text(whisper_result, words),
+            "num_speakers": diarization_result.get("num_speakers", len(speakers)),
+            "duration": whisper_result.get("duration", diarization_result.get("audio_duration", 0)),
+            "language": whisper_result.get("language")
+        }}
+    
+    def _collect_words(self, whisper_result: dict) -> list[dict]:
+        """Get word timestamps from a Whisper result.
+        
+        Prefers the top-level 'words' list and falls back to the words nested
+        in each segment.
+        """
+        words = whisper_result.get("words", [])
+        
+        if not words:
+            # Try to extract from segments
+            for seg in whisper_result.get("segments", []):
+                if "words" in seg:
+                    words.extend(seg["words"])
+        
+        return words
+    
+    def _full_text(self, whisper_result: dict, words: list[dict]) -> str:
+        """Get the full transcript text, rebuilding it from words if missing."""
+        full_text = whisper_result.get("text", "")
+        if not full_text:
+            full_text = " ".join(w.get("word", "") for w in words)
+        return full_text
+    
+    def _apply_speaker_mapping(
+        self,
+        turn: dict,
+        speaker_mapping: Optional[dict],
+        speaker_confidences: Optional[dict]
+    ) -> None:
+        """Add 'identified_as' and 'confidence' to a turn when a mapping is given."""
+        if speaker_mapping:
+            original_speaker = turn["speaker"]
+            turn["identified_as"] = speaker_mapping.get(original_speaker)
+            if speaker_confidences:
+                turn["confidence"] = speaker_confidences.get(original_speaker)
+    
+    def _speaker_codes(
         self,
         words: list[dict],
-        diar_segments: list[dict]
-    ) -> list[dict]:
-        """Assign each word to a speaker based on timestamp overlap.
+        diar_index: tuple[np.ndarray, np.ndarray, np.ndarray, list[str]]
+    ) -> tuple[np.ndarray, list[str]]:
+        """Find the speaker of every word as a small-int code.
+        
+        Speaker labels are mapped to codes once, so turn grouping can compare
+        integers in numpy instead of strings in Python.
         
         Args:
             words: List of words with 'start', 'end', 'word' keys
-            diar_segments: List of diarization segments with 'start', 'end', 'speaker'
+            diar_index: Index from _build_diar_index
             
         Returns:
-            List of words with added 'speaker' key
+            Tuple of (codes, labels) where labels[codes[i]] is the speaker
+            of words[i] ("SPEAKER_UNKNOWN" if no segment is close enough)
         """
-        assigned = []
+        starts, _, reach, speakers = diar_index
+        label_codes = {label: code for code, label in enumerate(dict.fromkeys(speakers))}
+        unknown = label_codes.setdefault("SPEAKER_UNKNOWN", len(label_codes))
+        segment_codes = np.fromiter(
+            (label_codes[speaker] for speaker in speakers), dtype=np.int64, count=len(speakers)
+        )
+        
+        word_starts = np.fromiter((w.get("start", 0) for w in words), dtype=np.float64, count=len(words))
+        word_ends = np.fromiter(
+            (w.get("end", w.get("start", 0)) for w in words), dtype=np.float64, count=len(words)
+        )
+        mids = (word_starts + word_ends) / 2
+        
+        # Containing segment for every midpoint at once (see _find_speaker_at_time)
+        last_started = np.searchsorted(starts, mids, side="right") - 1
+        first_reaching = np.searchsorted(reach, mids, side="left")
+        contained = (last_started >= 0) & (first_reaching <= last_started)
         
-        for word in words:
-            word_start = word.get("start", 0)
-            word_end = word.get("end", word_start)
-            word_mid = (word_start + word_end) / 2
+        codes = np.full(len(words), unknown, dtype=np.int64)
+        codes[contained] = segment_codes[first_reaching[contained]]
+        
+        # Words outside every segment fall back to the nearest one within
+        # 0.5s, vectorized the same way as _find_speaker_at_time: the closest
+        # earlier segment is the first to reach reach[last_started], the
+        # closest later one is the next to start; the earlier wins ties
+        outside = np.flatnonzero(~contained)
+        if len(outside) and len(speakers):
+            mid, last = mids[outside], last_started[outside]
+            has_prev = last >= 0
+            prev_reach = reach[np.maximum(last, 0)]
+            prev_distance = np.where(has_prev, mid - prev_reach, np.inf)
+            prev_segment = np.searchsorted(reach, prev_reach, side="left")
             
-            # Find the speaker for this word's midpoint
-            speaker = self._find_speaker_at_time(word_mid, diar_segments)
+            has_next = last + 1 < len(speakers)
+            next_segment = np.minimum(last + 1, len(speakers) - 1)
+            next_distance = np.where(has_next, starts[next_segment] - mid, np.inf)
             
-            assigned.append({
-                **word,
-                "speaker": speaker or "SPEAKER_UNKNOWN"
-            })
+            use_next = next_distance < prev_distance
+            distance = np.where(use_next, next_distance, prev_distance)
+            nearest = np.where(use_next, next_segment, prev_segment)
+            close = distance < 0.5
+            codes[outside[close]] = segment_codes[nearest[close]]
+        
+        return codes, list(label_codes)
+    
+    def _words_to_turns(
+        self,
+        words: list[dict],
+        diar_index: tuple[np.ndarray, np.ndarray, np.ndarray, list[str]]
+    ) -> Iterator[dict]:
+        """Assign words to speakers and yield speaker turns in one pass.
+        
+        Turn boundaries are the positions where the speaker code changes
+        between consecutive non-empty words, found with one vectorized
+        comparison. Words are never copied into per-word speaker dicts;
+        each turn is built straight from its slice of ``words`` and yielded
+        as soon as it is complete, so streaming callers share this path.
+        
+        Args:
+            words: List of words with 'start', 'end', 'word' keys
+            diar_index: Index from _build_diar_index
+            
+        Yields:
+            Speaker turns with aggregated text and duration
+        """
+        texts = [w.get("word", "").strip() for w in words]
+        kept = [i for i, text in enumerate(texts) if text]
+        if not kept:
+            return
+        
+        codes, labels = self._speaker_codes([words[i] for i in kept], diar_index)
+        changes = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        firsts = [0, *changes.tolist()]
+        lasts = [*changes.tolist(), len(kept)]
+        
+        for first, last in zip(firsts, lasts):
+            indices = kept[first:last]
+            start = words[indices[0]].get("start", 0)
+            end = self._turn_end(words, indices)
+            yield {
+                "speaker": labels[int(codes[first])],
+                "start": start,
+                "end": end,
+                "text": " ".join(texts[i] for i in indices),
+                "duration": round(end - start, 3)
+            }
+    
+    def _turn_end(self, words: list[dict], indices: list[int]) -> float:
+        """End of a turn: the last word end, skipping words without one."""
+        for i in reversed(indices):
+            if "end" in words[i]:
+                return words[i]["end"]
+        return 0
+    
+    def _build_diar_index(
+        self,
+        diar_segments: list[dict]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, list[str]]:
+        """Build a sorted struct-of-arrays index of diarization segments for lookups.
         
-        return assigned
+        Args:
+            diar_segments: List of diarization segments with 'start', 'end', 'speaker'
+            
+        Returns:
+            Tuple of (starts, ends, reach, speakers) sorted by start, where
+            reach[i] is the latest end among segments 0..i
+        """
+        diar_segments = sorted(diar_segments, key=lambda seg: seg["start"])
+        count = len(diar_segments)
+        starts = np.fromiter((seg["start"] for seg in diar_segments), dtype=np.float64, count=count)
+        ends = np.fromiter((seg["end"] for seg in diar_segments), dtype=np.float64, count=count)
+        reach = np.maximum.accumulate(ends) if count else ends
+        speakers = [seg["speaker"] for seg in diar_segments]
+        return starts, ends, reach, speakers
     
     def _find_speaker_at_time(
         self,
         timestamp: float,
-        diar_segments: list[dict]
+        diar_index: tuple[np.ndarray, np.ndarray, np.ndarray, list[str]]
     ) -> Optional[str]:
         """Find which speaker was talking at a given timestamp.
         
+        A segment containing the timestamp wins (the earliest-starting one
+        if several overlap); otherwise the nearest segment within 0.5s.
+        Both are found by binary search instead of scanning every segment.
+        
         Args:
             timestamp: Time in seconds
-            diar_segments: List of diarization segments
+            diar_index: Index from _build_diar_index
             
         Returns:
             Speaker label or None if no speaker found
         """
-        for seg in diar_segments:
-            if seg["start"] <= timestamp <= seg["end"]:
-                return seg["speaker"]
+        starts, ends, reach, speakers = diar_index
+        if not speakers:
+            return None
+        
+        # Last segment starting at or before the timestamp
+        last_started = int(np.searchsorted(starts, timestamp, side="right")) - 1
         
-        # If exact match not found, find nearest segment
         min_distance = float("inf")
         nearest_speaker = None
         
-        for seg in diar_segments:
-            # Distance to segment
-            if timestamp < seg["start"]:
-                distance = seg["start"] - timestamp
-            elif timestamp > seg["end"]:
-                distance = timestamp - seg["end"]
-            else:
-                distance = 0
+        if last_started >= 0:
+            # First segment whose end reaches the timestamp; every one before it ends earlier
+            first_reaching = int(np.searchsorted(reach, timestamp, side="left"))
+            if first_reaching <= last_started:
+                return speakers[first_reaching]
             
+            # None contains it; the closest earlier segment is the one ending last
+            min_distance = timestamp - reach[last_started]
+            nearest_speaker = speakers[int(np.searchsorted(reach, reach[last_started], side="left"))]
+        
+        if last_started + 1 < len(speakers):
+            # The closest later segment is the next one to start
+            distance = starts[last_started + 1] - timestamp
             if distance < min_distance:
                 min_distance = distance
-                nearest_speaker = seg["speaker"]
+                nearest_speaker = speakers[last_started + 1]
         
         # Only assign if within 0.5 second of a segment
         if min_distance < 0.5:
@@ -165,60 +358,6 @@ class TranscriptMerger:
         
         return None
     
-    def _group_words_into_turns(
-        self,
-        words: list[dict]
-    ) -> list[dict]:
-        """Group consecutive words by speaker into turns.
-        
-        Args:
-            words: List of words with 'speaker' assignments
-            
-        Returns:
-            List of speaker turns with aggregated text
-        """
-        if not words:
-            return []
-        
-        turns = []
-        current_turn = None
-        
-        for word in words:
-            speaker = word.get("speaker", "SPEAKER_UNKNOWN")
-            word_text = word.get("word", "").strip()
-            
-            if not word_text:
-                continue
-            
-            if current_turn is None or current_turn["speaker"] != speaker:
-                # Start new turn
-                if current_turn is not None:
-                    turns.append(current_turn)
-                
-                current_turn = {
-                    "speaker": speaker,
-                    "start": word.get("start", 0),
-                    "end": word.get("end", 0),
-                    "text": word_text,
-                    "words": [word]
-                }
-            else:
-                # Continue current turn
-                current_turn["end"] = word.get("end", current_turn["end"])
-                current_turn["text"] += " " + word_text
-                current_turn["words"].append(word)
-        
-        # Add final turn
-        if current_turn is not None:
-            turns.append(current_turn)
-        
-        # Clean up turns (remove words list, add duration)
-        for turn in turns:
-            turn["duration"] = round(turn["end"] - turn["start"], 3)
-            del turn["words"]  # Remove word-level detail from segment
-        
-        return turns
-    
     def _merge_segment_level(
         self,
         whisper_result: dict,
@@ -231,7 +370,7 @@ class TranscriptMerger:
         Aligns Whisper segments with diarization segments based on overlap.
         """
         whisper_segments = whisper_result.get("segments", [])
-        diar_segments = diarization_result.get("segments", [])
+        diar_index = self._build_diar_index(diarization_result.get("segments", []))
         
         merged_segments = []
         
@@ -241,7 +380,7 @@ class TranscriptMerger:
             seg_mid = (seg_start + seg_end) / 2
             
             # Find speaker
-            speaker = self._find_speaker_at_time(seg_mid, diar_segments) or "SPEAKER_UNKNOWN"
+            speaker = self._find_speaker_at_time(seg_mid, diar_index) or "SPEAKER_UNKNOWN"
             
             merged_seg = {
                 "speaker": speaker,
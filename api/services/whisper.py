@@ -1,16 +1,270 @@
 """Whisper STT service client for OpenAI-compatible API."""
 
+import asyncio
+import hashlib
+import importlib.util
+import io
 import logging
+import os
+import random
+import secrets
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Awaitable, Callable, Optional
 
+import anyio
 import httpx
+import numpy as np
+import orjson
+import soundfile
 
 from config import Settings
+from .audio import MODEL_SAMPLE_RATE, EncodedAudioSource, describe_source
+from .result_cache import ResultCache
 
 
 logger = logging.getLogger(__name__)
 
+# Bytes read from the audio file per step of the streamed upload
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Chunk boundaries move to the quietest 20ms frame within this many seconds
+# of the nominal cut, so chunks are not split mid-word
+CHUNK_SEARCH_SECONDS = 2.0
+CHUNK_FRAME_SECONDS = 0.02
+
+# Seconds a successful availability check (or transcription) is trusted
+HEALTH_TTL = 10.0
+
+# On-disk transcriptions are zstd-compressed when zstandard (an httpx extra) is installed
+DISK_CACHE_SUFFIX = ".json.zst" if importlib.util.find_spec("zstandard") else ".json"
+
+# Seconds transcriptions fail fast after the backend was found down
+CIRCUIT_OPEN_SECONDS = 10.0
+
+# Response formats whose body is plain text rather than JSON
+TEXT_RESPONSE_FORMATS = frozenset({"text", "srt", "vtt"})
+
+# Transient failures retried by _post_upload, and its backoff bounds in seconds
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadError, httpx.RemoteProtocolError)
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 10.0
+
+# Content type of the uploaded file part, by filename suffix. Declaring the
+# real container keeps ffmpeg-based backends from probing or re-encoding.
+AUDIO_CONTENT_TYPES = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".flac": "audio/flac",
+    ".ogg": "audio/ogg",
+    ".opus": "audio/ogg",
+    ".m4a": "audio/mp4",
+    ".webm": "audio/webm"
+}
+
+# soundfile (format, subtype) and filename suffix for each whisper_upload_format.
+# Opus at libsndfile's default ~24 kbps is transparent for speech.
+UPLOAD_FORMATS = {
+    "opus": ("OGG", "OPUS", ".opus"),
+    "flac": ("FLAC", "PCM_16", ".flac"),
+    "wav": ("WAV", "PCM_16", ".wav")
+}
+
+# Uploads already in a lossy codec are never re-encoded: a second lossy pass
+# would change what Whisper hears
+LOSSY_SUFFIXES = {".mp3", ".ogg", ".opus", ".m4a", ".webm"}
+
+
+class WhisperError(RuntimeError):
+    """Base class of Whisper API failures; ``status_code`` is the HTTP status to report."""
+    
+    status_code = 502
+
+
+class WhisperTimeoutError(WhisperError):
+    """The Whisper API did not answer within ``whisper_timeout``."""
+    
+    status_code = 504
+
+
+class WhisperBackendError(WhisperError):
+    """The Whisper backend is unreachable or failing (5xx), or known to be down."""
+    
+    status_code = 503
+
+
+class WhisperClientError(WhisperError):
+    """The Whisper API rejected the request (4xx)."""
+    
+    status_code = 502
+
+
+def _accept_encoding() -> str:
+    """Build the Accept-Encoding header from the decoders httpx can use.
+
+    httpx decodes brotli and zstd responses itself once the optional
+    ``brotli``/``zstandard`` packages are installed, so only those codings
+    are advertised. Large verbose_json word lists compress 5-10x.
+    """
+    encodings = ["gzip", "deflate"]
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        encodings.append("br")
+    if importlib.util.find_spec("zstandard"):
+        encodings.append("zstd")
+    return ", ".join(encodings)
+
+
+@asynccontextmanager
+async def _open_source(audio_path: EncodedAudioSource) -> AsyncIterator[anyio.AsyncFile]:
+    """Open a path for async reading, or rewind and wrap an already open file.
+    
+    Opening, reading and closing run in worker threads so slow disks never
+    stall the event loop; an already open file is left open for its owner.
+    """
+    if isinstance(audio_path, str):
+        async with await anyio.open_file(audio_path, "rb") as f:
+            yield f
+    else:
+        audio_file = anyio.wrap_file(audio_path)
+        await audio_file.seek(0)
+        yield audio_file
+
+
+async def _multipart_upload(
+    fields: list[tuple[str, str]],
+    filename: str,
+    audio_file: anyio.AsyncFile,
+    content_type: str = "application/octet-stream"
+) -> tuple[AsyncIterator[bytes], dict[str, str]]:
+    """Build a streamed multipart/form-data body with the audio file as its last part.
+    
+    The file is read asynchronously in UPLOAD_CHUNK_SIZE pieces while the
+    body is sent, so neither the whole file nor the encoded body is held in
+    memory and disk reads don't block the event loop. The file is measured
+    up front so the request carries a Content-Length instead of being chunked.
+    
+    Args:
+        fields: Form fields sent before the file, as (name, value) pairs
+        filename: Filename of the file part
+        audio_file: Async binary file (see _open_source), read from its current position
+        content_type: Content type of the file part
+        
+    Returns:
+        Tuple of (body chunks, request headers)
+    """
+    boundary = secrets.token_hex(16)
+    safe_filename = filename.replace("\\", "\\\\").replace('"', "%22")
+    
+    head = b"".join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in fields
+    ) + (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{safe_filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    
+    position = await audio_file.tell()
+    file_size = await audio_file.seek(0, os.SEEK_END) - position
+    await audio_file.seek(position)
+    
+    async def body() -> AsyncIterator[bytes]:
+        yield head
+        while chunk := await audio_file.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
+        yield tail
+    
+    headers = {
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Length": str(len(head) + file_size + len(tail))
+    }
+    return body(), headers
+
+
+def _mono_samples(decoded: dict) -> np.ndarray:
+    """Get the samples of decoded audio as a mono 1-D array."""
+    waveform = decoded["waveform"]
+    return np.asarray(waveform).reshape(-1, waveform.shape[-1]).mean(axis=0)
+
+
+def _encode_samples(samples: np.ndarray, sample_rate: int, upload_format: str) -> io.BytesIO:
+    """Encode mono samples in memory in one of the UPLOAD_FORMATS."""
+    audio_format, subtype, _ = UPLOAD_FORMATS[upload_format]
+    buffer = io.BytesIO()
+    soundfile.write(buffer, samples, sample_rate, format=audio_format, subtype=subtype)
+    buffer.seek(0)
+    return buffer
+
+
+def _worth_reencoding(audio_path: EncodedAudioSource, filename: Optional[str]) -> bool:
+    """Check whether re-encoding an upload as 16 kHz mono can only shrink it.
+    
+    Lossy uploads are sent as they are, and so are lossless ones that are
+    already at most 16 kHz mono (only their header is read). Uploads
+    libsndfile can't identify are re-encoded.
+    """
+    if Path(filename or "").suffix.lower() in LOSSY_SUFFIXES:
+        return False
+    try:
+        if not isinstance(audio_path, str):
+            audio_path.seek(0)
+        info = soundfile.info(audio_path)
+    except Exception:
+        return True
+    finally:
+        if not isinstance(audio_path, str):
+            audio_path.seek(0)
+    return info.samplerate > MODEL_SAMPLE_RATE or info.channels > 1
+
+
+def _chunk_bounds(samples: np.ndarray, sample_rate: int, chunk_seconds: float) -> list[tuple[int, int]]:
+    """Split a mono signal into chunks of about ``chunk_seconds``, cutting in quiet frames.
+    
+    Args:
+        samples: Mono samples
+        sample_rate: Sample rate of the samples
+        chunk_seconds: Nominal chunk length
+        
+    Returns:
+        List of (start, end) sample indices covering the whole signal
+    """
+    chunk = int(chunk_seconds * sample_rate)
+    frame = max(1, int(CHUNK_FRAME_SECONDS * sample_rate))
+    search = int(CHUNK_SEARCH_SECONDS * sample_rate)
+    
+    cuts = [0]
+    while len(samples) - cuts[-1] > chunk:
+        nominal = cuts[-1] + chunk
+        window_start = max(cuts[-1] + frame, nominal - search)
+        window = samples[window_start:min(len(samples), nominal + search)]
+        frames = len(window) // frame
+        if frames:
+            # Cut at the start of the lowest-energy frame in the window
+            energy = np.square(window[:frames * frame].reshape(frames, frame)).mean(axis=1)
+            cuts.append(window_start + int(energy.argmin()) * frame)
+        else:
+            cuts.append(nominal)
+    cuts.append(len(samples))
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def _shift_times(items: list[dict], offset: float) -> list[dict]:
+    """Copy segments or words with their start/end (and nested words) shifted by offset."""
+    shifted = []
+    for item in items:
+        item = dict(item)
+        for key in ("start", "end"):
+            if key in item:
+                item[key] = round(item[key] + offset, 3)
+        if "words" in item:
+            item["words"] = _shift_times(item["words"], offset)
+        shifted.append(item)
+    return shifted
+
 
 class WhisperService:
     """Service for calling OpenAI-compatible Whisper API for transcription."""
@@ -22,142 +276,546 @@ class WhisperService:
             settings: Application settings
         """
         self.settings = settings
+        self.transcription_cache: Optional[ResultCache] = (
+            ResultCache(settings.transcription_cache_size) if settings.transcription_cache_size > 0 else None
+        )
+        # Durable cache of transcriptions, kept across restarts
+        self.disk_cache_dir: Optional[Path] = (
+            Path(settings.transcription_cache_dir) if settings.transcription_cache_dir else None
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        # time.monotonic() of the last response proving the API is up
+        self._last_ok: Optional[float] = None
+        # time.monotonic() until which transcriptions fail fast (backend down)
+        self._down_until: Optional[float] = None
+        # Cache key -> task of the Whisper call in progress for that audio
+        self._in_flight: dict[str, asyncio.Task] = {}
         self._initialized = False
         
     def initialize(self) -> None:
-        """Initialize the Whisper service."""
+        """Initialize the Whisper service.
+        
+        Creates one pooled client reused by every request, so connections
+        (and TLS sessions) to the Whisper API are kept alive instead of being
+        set up per call. HTTP/2 is used when the ``h2`` package is installed,
+        letting concurrent uploads share a connection, and compressed
+        responses are requested with every coding httpx can decode.
+        """
         if self._initialized:
             return
-            
+        
+        headers = {"Accept-Encoding": _accept_encoding()}
+        if self.settings.whisper_api_key:
+            headers["Authorization"] = f"Bearer {self.settings.whisper_api_key}"
+        
+        max_connections = self.settings.whisper_max_connections
+        self._client = httpx.AsyncClient(
+            base_url=self.settings.whisper_api_url,
+            headers=headers,
+            timeout=self.settings.whisper_timeout,
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max(1, max_connections // 2)
+            )
+        )
+        
         logger.info(f"Whisper service configured for: {self.settings.whisper_api_url}")
         self._initialized = True
     
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._initialized = False
+    
     @property
     def is_initialized(self) -> bool:
         """Check if the service is initialized."""
         return self._initialized
     
-    def transcribe(
+    async def transcribe(
         self,
-        audio_path: str,
+        audio_path: EncodedAudioSource,
         language: Optional[str] = None,
-        response_format: str = "verbose_json",
-        timestamp_granularities: list[str] = None
+        response_format: str = "json",
+        timestamp_granularities: list[str] = None,
+        filename: Optional[str] = None
     ) -> dict:
         """Transcribe audio file using the Whisper API.
         
+        The request is awaited on the event loop, so many transcriptions can
+        be in flight against the Whisper backend at once.
+        
         Args:
-            audio_path: Path to the audio file
+            audio_path: Path to the audio file or an open binary file-like object
             language: Language code (e.g., 'en', 'es'). None for auto-detect
-            response_format: 'json', 'text', 'srt', 'verbose_json', 'vtt'
-            timestamp_granularities: List of granularities: ['word', 'segment']
+            response_format: 'json', 'text', 'srt', 'verbose_json', 'vtt'. Plain
+                'json' (text only) is the default; request 'verbose_json' only
+                when timestamps are needed, its responses are many times larger
+            timestamp_granularities: List of granularities: ['word', 'segment'];
+                only sent with 'verbose_json'
+            filename: Filename sent to the API (defaults to the path's name)
             
         Returns:
-            Transcription result from Whisper API
+            Transcription result from Whisper API ({"text": ...} for the
+            'text', 'srt' and 'vtt' formats)
         """
         if not self._initialized:
             self.initialize()
         
-        if timestamp_granularities is None:
-            timestamp_granularities = ["word", "segment"]
+        if self._down_until is not None and time.monotonic() < self._down_until:
+            # Skip the whole upload while the backend is known to be down
+            raise WhisperBackendError("Whisper API unavailable (recent failures), retry shortly")
         
-        url = f"{self.settings.whisper_api_url}/audio/transcriptions"
+        logger.info(f"Transcribing audio: {describe_source(audio_path)}")
         
-        logger.info(f"Transcribing audio: {audio_path}")
+        if filename is None:
+            filename = Path(audio_path).name if isinstance(audio_path, str) else "audio"
         
-        # Prepare the multipart form data
-        with open(audio_path, "rb") as audio_file:
-            files = {
-                "file": (Path(audio_path).name, audio_file, "audio/mpeg")
-            }
-            
-            data = {
-                "model": self.settings.whisper_model,
-                "response_format": response_format,
-            }
-            
-            # Add language if specified
-            if language:
-                data["language"] = language
-            elif self.settings.whisper_language:
-                data["language"] = self.settings.whisper_language
-            
-            # Add timestamp granularities for verbose_json
-            if response_format == "verbose_json":
-                data["timestamp_granularities[]"] = timestamp_granularities
-            
-            headers = {}
-            if self.settings.whisper_api_key:
-                headers["Authorization"] = f"Bearer {self.settings.whisper_api_key}"
-            
+        # Prepare the multipart form fields
+        fields = [
+            ("model", self.settings.whisper_model),
+            ("response_format", response_format)
+        ]
+        
+        # Add language if specified
+        if language:
+            fields.append(("language", language))
+        elif self.settings.whisper_language:
+            fields.append(("language", self.settings.whisper_language))
+        
+        # Add timestamp granularities for verbose_json
+        if response_format == "verbose_json":
+            fields.extend(
+                ("timestamp_granularities[]", granularity)
+                for granularity in timestamp_granularities or ("word", "segment")
+            )
+        
+        content_type = AUDIO_CONTENT_TYPES.get(Path(filename).suffix.lower(), "application/octet-stream")
+        
+        async with _open_source(audio_path) as audio_file:
             try:
-                with httpx.Client(timeout=self.settings.whisper_timeout) as client:
-                    response = client.post(
-                        url,
-                        files=files,
-                        data=data,
-                        headers=headers
-                    )
-                    response.raise_for_status()
-                    
-                    result = response.json()
-                    
-                    logger.info(f"Transcription complete: {len(result.get('text', ''))} chars")
-                    
-                    return result
-                    
+                response = await self._post_upload(fields, filename, audio_file, content_type)
+                response.raise_for_status()
+                self._mark_up()
+                
+                if response_format in TEXT_RESPONSE_FORMATS:
+                    # Plain text bodies are returned as they are, never JSON-decoded
+                    result = {"text": response.text}
+                else:
+                    # orjson parses large verbose_json word lists several times faster
+                    result = orjson.loads(response.content)
+                
+                logger.info(f"Transcription complete: {len(result.get('text', ''))} chars")
+                
+                return result
+                
             except httpx.TimeoutException:
                 logger.error("Whisper API request timed out")
-                raise RuntimeError(f"Whisper API timeout after {self.settings.whisper_timeout}s")
+                raise WhisperTimeoutError(f"Whisper API timeout after {self.settings.whisper_timeout}s")
             except httpx.HTTPStatusError as e:
-                logger.error(f"Whisper API error: {e.response.status_code} - {e.response.text}")
-                raise RuntimeError(f"Whisper API error: {e.response.status_code}")
+                status_code = e.response.status_code
+                logger.error(f"Whisper API error: {status_code} - {e.response.text}")
+                if status_code < 500:
+                    raise WhisperClientError(f"Whisper API error: {status_code}")
+                self._mark_down()
+                raise WhisperBackendError(f"Whisper API error: {status_code}")
+            except httpx.TransportError as e:
+                logger.error(f"Whisper API unreachable: {e!r}")
+                self._mark_down()
+                raise WhisperBackendError(f"Whisper API unreachable: {type(e).__name__}")
             except Exception as e:
                 logger.error(f"Whisper transcription failed: {e}")
                 raise
     
-    def transcribe_with_words(
+    def _mark_up(self) -> None:
+        """Record a response proving the API is up, closing the circuit."""
+        self._last_ok = time.monotonic()
+        self._down_until = None
+    
+    def _mark_down(self) -> None:
+        """Fail transcriptions fast for CIRCUIT_OPEN_SECONDS after the backend failed.
+        
+        Only reached once _post_upload's retries are exhausted, so a single
+        blip doesn't open the circuit. The first call after it elapses goes
+        through and either closes it again or re-opens it.
+        """
+        self._last_ok = None
+        self._down_until = time.monotonic() + CIRCUIT_OPEN_SECONDS
+    
+    async def _post_upload(
         self,
-        audio_path: str,
-        language: Optional[str] = None
+        fields: list[tuple[str, str]],
+        filename: str,
+        audio_file: anyio.AsyncFile,
+        content_type: str
+    ) -> httpx.Response:
+        """POST a transcription request, retrying transient failures.
+        
+        Connection errors and 429/5xx gateway responses (an overloaded or
+        restarting GPU worker) are retried up to ``whisper_max_retries`` times
+        with jittered exponential backoff, honouring a numeric Retry-After.
+        The file is re-streamed from its start for every attempt. Read
+        timeouts are not retried: they already waited ``whisper_timeout``.
+        
+        Args:
+            fields: Form fields sent before the file
+            filename: Filename of the file part
+            audio_file: Async binary file to upload, read from its current position
+            content_type: Content type of the file part
+            
+        Returns:
+            The last response (possibly an error status, for the caller to raise)
+        """
+        max_retries = self.settings.whisper_max_retries
+        start = await audio_file.tell()
+        
+        for attempt in range(max_retries + 1):
+            await audio_file.seek(start)
+            # The file is streamed into the request body instead of buffered
+            content, headers = await _multipart_upload(fields, filename, audio_file, content_type)
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) * random.uniform(0.5, 1.0)
+            
+            try:
+                response = await self._client.post("/audio/transcriptions", content=content, headers=headers)
+            except RETRY_EXCEPTIONS as e:
+                if attempt == max_retries:
+                    raise
+                reason = type(e).__name__
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                    return response
+                reason = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = min(RETRY_MAX_DELAY, float(retry_after))
+            
+            logger.warning(
+                f"Whisper request failed ({reason}), retry {attempt + 1}/{max_retries} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+    
+    def _cache_key(self, audio_hash: Optional[str], language: Optional[str], mode: str) -> Optional[str]:
+        """Build the transcription cache key, or None when caching doesn't apply."""
+        if not audio_hash or (self.transcription_cache is None and self.disk_cache_dir is None):
+            return None
+        language = language or self.settings.whisper_language
+        return f"whisper:{audio_hash}:{self.settings.whisper_model}:{language}:{mode}"
+    
+    def _cache_get(self, cache_key: Optional[str]) -> Optional[dict]:
+        """Get a transcription from the in-memory cache as a fresh dict."""
+        if cache_key is None or self.transcription_cache is None:
+            return None
+        cached = self.transcription_cache.get(cache_key)
+        if cached is None:
+            return None
+        logger.info("Transcription cache hit")
+        return orjson.loads(cached)
+    
+    async def _transcribe_once(
+        self,
+        cache_key: Optional[str],
+        transcribe: Callable[[], Awaitable[dict]],
+        owns_input: bool = True
+    ) -> dict:
+        """Get a transcription from the cache, or make it once for all concurrent callers.
+        
+        A burst of requests for the same audio (retries, several clients
+        uploading one clip) shares a single in-flight Whisper call instead of
+        each uploading it again. Only calls that own their input (audio the
+        service decoded or encoded itself) are shared: a call reading the
+        request's upload would fail for everyone once that request ends and
+        Starlette closes or deletes the file, so it runs unshared, though it
+        still joins an owned call already in flight. Memory misses fall back to the disk cache
+        (``transcription_cache_dir``) before calling Whisper. The result is
+        cached serialized, so every caller gets its own copy to mutate.
+        
+        Args:
+            cache_key: Key from _cache_key; None transcribes without caching or sharing
+            transcribe: Coroutine function making the Whisper request(s)
+            owns_input: Whether ``transcribe`` only reads data it holds itself
+            
+        Returns:
+            Transcription result
+        """
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        if cache_key is None:
+            return await transcribe()
+        
+        task = self._in_flight.get(cache_key)
+        if task is None and not owns_input:
+            return orjson.loads(await self._transcribe_and_store(cache_key, transcribe))
+        if task is None:
+            task = asyncio.ensure_future(self._transcribe_and_store(cache_key, transcribe))
+            self._in_flight[cache_key] = task
+            task.add_done_callback(partial(self._forget_in_flight, cache_key))
+        else:
+            logger.info("Joining in-flight transcription of the same audio")
+        
+        # Shielded so one caller disconnecting doesn't cancel the others' call
+        return orjson.loads(await asyncio.shield(task))
+    
+    async def _transcribe_and_store(self, cache_key: str, transcribe: Callable[[], Awaitable[dict]]) -> bytes:
+        """Load a transcription from the disk cache or transcribe, and cache the serialized result."""
+        serialized = None
+        if self.disk_cache_dir is not None:
+            serialized = await asyncio.to_thread(self._disk_cache_get, cache_key)
+        
+        if serialized is None:
+            serialized = orjson.dumps(await transcribe())
+            if self.disk_cache_dir is not None:
+                await asyncio.to_thread(self._disk_cache_put, cache_key, serialized)
+        
+        if self.transcription_cache is not None:
+            self.transcription_cache.put(cache_key, serialized)
+        return serialized
+    
+    def _disk_cache_path(self, cache_key: str) -> Path:
+        """Get the file of a cache key, fanned out over 256 subdirectories."""
+        digest = hashlib.blake2b(cache_key.encode(), digest_size=16).hexdigest()
+        return self.disk_cache_dir / digest[:2] / f"{digest[2:]}{DISK_CACHE_SUFFIX}"
+    
+    def _disk_cache_get(self, cache_key: str) -> Optional[bytes]:
+        """Read a serialized transcription from the disk cache, or None on a miss."""
+        cache_path = self._disk_cache_path(cache_key)
+        try:
+            data = cache_path.read_bytes()
+            if cache_path.suffix == ".zst":
+                import zstandard
+                data = zstandard.ZstdDecompressor().decompress(data)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable transcription cache file {cache_path}: {e}")
+            return None
+        
+        logger.info("Transcription disk cache hit")
+        return data
+    
+    def _disk_cache_put(self, cache_key: str, serialized: bytes) -> None:
+        """Write a serialized transcription to the disk cache; failures are only logged."""
+        cache_path = self._disk_cache_path(cache_key)
+        try:
+            if cache_path.suffix == ".zst":
+                import zstandard
+                serialized = zstandard.ZstdCompressor().compress(serialized)
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so concurrent readers never see a partial file
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(serialized)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to write transcription cache file {cache_path}: {e}")
+    
+    def _forget_in_flight(self, cache_key: str, task: asyncio.Task) -> None:
+        """Drop a finished call from the in-flight table."""
+        self._in_flight.pop(cache_key, None)
+        if not task.cancelled():
+            # Retrieve the exception so it isn't reported as unhandled when no caller is left
+            task.exception()
+    
+    def should_chunk(self, decoded: dict) -> bool:
+        """Check whether decoded audio is long enough to be transcribed in chunks."""
+        chunk_seconds = self.settings.whisper_chunk_seconds
+        if chunk_seconds <= 0:
+            return False
+        return decoded["waveform"].shape[-1] / decoded["sample_rate"] > chunk_seconds
+    
+    async def transcribe_chunked(
+        self,
+        decoded: dict,
+        language: Optional[str] = None,
+        filename: Optional[str] = None,
+        audio_hash: Optional[str] = None
+    ) -> dict:
+        """Transcribe long decoded audio as concurrent chunk requests.
+        
+        The waveform is cut about every ``whisper_chunk_seconds`` at the
+        quietest nearby frame, each chunk is encoded in ``whisper_upload_format``
+        (WAV when unset) and sent with at most ``whisper_chunk_concurrency``
+        requests in flight, and the results are stitched back together with
+        their timestamps offset by the chunk start.
+        
+        Args:
+            decoded: Decoded audio dict with 'waveform' (1, time) and 'sample_rate'
+            language: Language code (e.g., 'en'). None for auto-detect
+            filename: Original filename, used to name the chunk uploads
+            audio_hash: Content hash of the upload; enables the transcription cache
+            
+        Returns:
+            Dictionary with 'text', 'segments', 'words', 'duration' and 'language' keys
+        """
+        return await self._transcribe_once(
+            self._cache_key(audio_hash, language, f"chunked:{self.settings.whisper_chunk_seconds}"),
+            partial(self._transcribe_chunks, decoded, language, filename)
+        )
+    
+    async def _transcribe_chunks(self, decoded: dict, language: Optional[str], filename: Optional[str]) -> dict:
+        """Run the chunk requests of transcribe_chunked and stitch their results."""
+        sample_rate = decoded["sample_rate"]
+        samples = _mono_samples(decoded)
+        upload_format = self.settings.whisper_upload_format or "wav"
+        bounds = _chunk_bounds(samples, sample_rate, self.settings.whisper_chunk_seconds)
+        stem = Path(filename).stem if filename else "audio"
+        semaphore = asyncio.Semaphore(self.settings.whisper_chunk_concurrency)
+        
+        logger.info(f"Transcribing {len(samples) / sample_rate:.0f}s of audio in {len(bounds)} chunks")
+        
+        async def transcribe_chunk(index: int, start: int, end: int) -> dict:
+            async with semaphore:
+                buffer = await asyncio.to_thread(_encode_samples, samples[start:end], sample_rate, upload_format)
+                return await self._transcribe_words(
+                    buffer, language, f"{stem}_{index:03d}{UPLOAD_FORMATS[upload_format][2]}"
+                )
+        
+        results = await asyncio.gather(*(
+            transcribe_chunk(index, start, end) for index, (start, end) in enumerate(bounds)
+        ))
+        
+        segments = []
+        words = []
+        for (start, _), result in zip(bounds, results):
+            offset = start / sample_rate
+            segments.extend(_shift_times(result.get("segments", []), offset))
+            words.extend(_shift_times(result.get("words", []), offset))
+        for index, segment in enumerate(segments):
+            if "id" in segment:
+                segment["id"] = index
+        
+        return {
+            "text": " ".join(text for result in results if (text := result.get("text", "").strip())),
+            "segments": segments,
+            "words": words,
+            "duration": len(samples) / sample_rate,
+            "language": next((result["language"] for result in results if result.get("language")), None)
+        }
+    
+    async def transcribe_upload(
+        self,
+        audio_path: EncodedAudioSource,
+        decoded: dict,
+        language: Optional[str] = None,
+        filename: Optional[str] = None,
+        audio_hash: Optional[str] = None
+    ) -> dict:
+        """Transcribe an upload with word timestamps, picking what is sent.
+        
+        Long audio goes through transcribe_chunked. Otherwise, when
+        ``whisper_upload_format`` is set, lossless uploads above 16 kHz or
+        with several channels are replaced by the decoded 16 kHz mono
+        waveform re-encoded in that format: Whisper resamples to 16 kHz mono
+        anyway, so a 48 kHz stereo WAV shrinks about 6x as FLAC. Lossy and
+        already small uploads are sent as they are.
+        
+        Args:
+            audio_path: The original upload (path or open binary file-like object)
+            decoded: Decoded audio dict with 'waveform' (1, time) and 'sample_rate'
+            language: Language code (e.g., 'en'). None for auto-detect
+            filename: Original filename
+            audio_hash: Content hash of the upload; enables the transcription cache
+            
+        Returns:
+            Dictionary with 'text', 'segments', and 'words' keys
+        """
+        if self.should_chunk(decoded):
+            return await self.transcribe_chunked(
+                decoded, language=language, filename=filename, audio_hash=audio_hash
+            )
+        
+        upload_format = self.settings.whisper_upload_format
+        if not upload_format or not await asyncio.to_thread(_worth_reencoding, audio_path, filename):
+            return await self.transcribe_with_words(
+                audio_path=audio_path,
+                language=language,
+                filename=filename,
+                audio_hash=audio_hash
+            )
+        
+        async def transcribe_encoded() -> dict:
+            # Encoded only on a cache miss, by the one request that makes the call
+            buffer = await asyncio.to_thread(
+                _encode_samples, _mono_samples(decoded), decoded["sample_rate"], upload_format
+            )
+            stem = Path(filename).stem if filename else "audio"
+            return await self._transcribe_words(buffer, language, f"{stem}{UPLOAD_FORMATS[upload_format][2]}")
+        
+        return await self._transcribe_once(self._cache_key(audio_hash, language, "words"), transcribe_encoded)
+    
+    async def transcribe_with_words(
+        self,
+        audio_path: EncodedAudioSource,
+        language: Optional[str] = None,
+        filename: Optional[str] = None,
+        audio_hash: Optional[str] = None
     ) -> dict:
         """Transcribe audio and return word-level timestamps.
         
         Args:
-            audio_path: Path to the audio file
+            audio_path: Path to the audio file or an open binary file-like object
             language: Language code (e.g., 'en'). None for auto-detect
+            filename: Filename sent to the API (defaults to the path's name)
+            audio_hash: Content hash of the upload; enables the transcription cache
             
         Returns:
             Dictionary with 'text', 'segments', and 'words' keys
         """
-        result = self.transcribe(
+        return await self._transcribe_once(
+            self._cache_key(audio_hash, language, "words"),
+            partial(self._transcribe_words, audio_path, language, filename),
+            owns_input=False
+        )
+    
+    async def _transcribe_words(
+        self,
+        audio_path: EncodedAudioSource,
+        language: Optional[str],
+        filename: Optional[str]
+    ) -> dict:
+        """Request a verbose_json transcription and make sure it has top-level words."""
+        result = await self.transcribe(
             audio_path=audio_path,
             language=language,
             response_format="verbose_json",
-            timestamp_granularities=["word", "segment"]
+            timestamp_granularities=["word", "segment"],
+            filename=filename
         )
         
         # Ensure we have the expected structure
         if "words" not in result and "segments" in result:
             # Extract words from segments if words not at top level
-            words = []
-            for segment in result.get("segments", []):
-                if "words" in segment:
-                    words.extend(segment["words"])
-            result["words"] = words
+            result["words"] = list(chain.from_iterable(
+                segment.get("words", ()) for segment in result["segments"]
+            ))
         
         return result
     
-    def is_available(self) -> bool:
+    async def is_available(self) -> bool:
         """Check if the Whisper API is available.
         
+        A success within the last HEALTH_TTL seconds (a probe or a completed
+        transcription) is trusted without another request; failures are
+        never cached, so an outage is re-probed on the next call. A
+        successful probe also ends the fail-fast period after an outage.
+        
         Returns:
             True if API is reachable
         """
+        if not self._initialized:
+            self.initialize()
+        
+        if self._last_ok is not None and time.monotonic() - self._last_ok < HEALTH_TTL:
+            return True
+        
         try:
-            url = f"{self.settings.whisper_api_url}/models"
-            with httpx.Client(timeout=5) as client:
-                response = client.get(url)
-                return response.status_code == 200
+            response = await self._client.get("/models", timeout=5)
         except Exception:
             return False
+        
+        if response.status_code != 200:
+            return False
+        self._mark_up()
+        return True
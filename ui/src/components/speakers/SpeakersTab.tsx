@@ -108,8 +108,8 @@ export function SpeakersTab() {
     setDeleteDialogOpen(true)
   }
 
-  const formatDate = (dateString: string) => {
-    return new Date(dateString).toLocaleDateString(undefined, {
+  const formatDate = (epochSeconds: number) => {
+    return new Date(epochSeconds * 1000).toLocaleDateString(undefined, {
       year: "numeric",
       month: "short",
       day: "numeric",
@@ -7,7 +7,7 @@ export interface Speaker {
   speaker_id: string
   speaker_name: string
   embeddings_count: number
-  created_at: string
+  created_at: number  // Unix epoch seconds
 }
 
 export interface SpeakerListResponse {